@@ -0,0 +1 @@
+# Scripts de benchmark (executar da raiz: python -m benchmarks.<nome>)
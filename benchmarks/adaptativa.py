@@ -0,0 +1,78 @@
+"""Árvore adaptativa contra AVL e Rubro-Negra fixas, com a carga mudando.
+
+Sobre `quantidade` chaves pré-carregadas, roda fases alternadas de
+leitura (98% buscas) e de escrita (90% inserções/remoções, metade cada),
+com `por_fase` operações por fase, e mede o tempo de cada fase e o total.
+A mesma sequência de operações é usada por todas as árvores.
+
+Uso: python -m benchmarks.adaptativa [quantidade] [por_fase] [fases]
+"""
+
+import random
+import sys
+import time
+
+from src.adaptativa import ArvoreAdaptativa
+from src.arvore_avl import ArvoreAVL
+from src.arvore_rn import ArvoreRubroNegra
+
+FASES = {"leitura": 0.98, "escrita": 0.10}  # fração de buscas
+BUSCAR, INSERIR, REMOVER = 0, 1, 2
+
+
+def gerar_fase(n, por_fase, leituras, rng):
+    """Códigos e chaves de uma fase sobre as chaves de [0, 2n)"""
+    codigos = []
+    chaves = []
+    for _ in range(por_fase):
+        sorteio = rng.random()
+        codigos.append(BUSCAR if sorteio < leituras else
+                       INSERIR if sorteio < (1 + leituras) / 2 else REMOVER)
+        chaves.append(rng.randrange(2 * n))
+    return codigos, chaves
+
+
+def executar(arvore, fases):
+    """Retorna os segundos de cada fase.
+
+    Os métodos são buscados na árvore a cada operação, em todas as árvores:
+    a adaptativa troca os seus a cada migração.
+    """
+    tempos = []
+    for codigos, chaves in fases:
+        inicio = time.perf_counter()
+        for codigo, chave in zip(codigos, chaves):
+            if codigo == BUSCAR:
+                arvore.buscar(chave)
+            elif codigo == INSERIR:
+                arvore.inserir(chave)
+            else:
+                arvore.remover(chave)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    por_fase = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    quantidade_fases = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    rng = random.Random(0)
+    nomes = [("leitura", "escrita")[i % 2] for i in range(quantidade_fases)]
+    fases = [gerar_fase(n, por_fase, FASES[nome], rng) for nome in nomes]
+    pre_carga = range(0, 2 * n, 2)
+    print(f"{n} chaves, {quantidade_fases} fases de {por_fase} operações")
+    print(f"{'árvore':<18}" + "".join(f"{nome:>10}" for nome in nomes) + f"{'total s':>10}")
+    casos = [("ArvoreAVL", lambda: ArvoreAVL.from_sorted(pre_carga)),
+             ("ArvoreRubroNegra", lambda: ArvoreRubroNegra.from_sorted(pre_carga)),
+             ("ArvoreAdaptativa", lambda: ArvoreAdaptativa.from_sorted(pre_carga))]
+    for nome, criar in casos:
+        arvore = criar()
+        tempos = executar(arvore, fases)
+        linha = f"{nome:<18}" + "".join(f"{t:>10.3f}" for t in tempos) + f"{sum(tempos):>10.3f}"
+        if isinstance(arvore, ArvoreAdaptativa):
+            linha += f"  ({arvore.migracoes} migrações, termina em {arvore.motor.__name__})"
+        print(linha)
+
+
+if __name__ == "__main__":
+    main()
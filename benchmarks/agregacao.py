@@ -0,0 +1,70 @@
+"""Agregados de intervalo: árvore agregada contra varredura com `items`.
+
+Para cada monoide embutido (soma, mínimo, máximo, contagem) e cada árvore
+(AVL e Rubro-Negra), associa `n` chaves embaralhadas a dados aleatórios
+com `put`, responde consultas `agregado(lo, hi)` sobre janelas de `n/10`
+chaves e compara com a varredura de `items(lo, hi)` que era feita antes.
+Depois remove 10% das chaves. A árvore comum dá a referência do custo de
+`put` e da remoção sem a manutenção dos agregados.
+
+Uso: python -m benchmarks.agregacao [n]
+"""
+
+import random
+import sys
+import time
+from functools import reduce
+
+from src.agregacao import (ArvoreAVLAgregada, ArvoreRubroNegraAgregada,
+                           CONTAGEM, MAXIMO, MINIMO, SOMA)
+from src.arvore_avl import ArvoreAVL
+from src.arvore_rn import ArvoreRubroNegra
+
+CONSULTAS = 1000
+VARREDURAS = 50  # cada varredura percorre n/10 chaves
+MONOIDES = (("soma", SOMA), ("mínimo", MINIMO), ("máximo", MAXIMO), ("contagem", CONTAGEM))
+ARVORES = ((ArvoreAVL, ArvoreAVLAgregada), (ArvoreRubroNegra, ArvoreRubroNegraAgregada))
+
+
+def varrer(arvore, monoide, lo, hi):
+    """A consulta antiga: percorre o intervalo combinando as medidas"""
+    medir = monoide.medir
+    return reduce(monoide.combinar, (medir(chave, dado) for chave, dado in arvore.items(lo, hi)),
+                  monoide.identidade)
+
+
+def por_operacao(funcao, argumentos):
+    inicio = time.perf_counter()
+    for args in argumentos:
+        funcao(*args)
+    return (time.perf_counter() - inicio) / len(argumentos) * 1e6
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(0)
+    pares = [(chave, rng.randrange(10 ** 6)) for chave in rng.sample(range(n), n)]
+    largura = n // 10
+    janelas = [(lo, lo + largura) for lo in (rng.randrange(n - largura) for _ in range(CONSULTAS))]
+    removidas = [(chave,) for chave, _ in rng.sample(pares, n // 10)]
+    print(f"{n} chaves, janelas de {largura} chaves (µs por operação)")
+    print(f"{'árvore':<26}{'monoide':<10}{'put':>8}{'remoção':>9}{'agregado':>10}{'varredura':>11}")
+    for tipo_comum, tipo_agregado in ARVORES:
+        comum = tipo_comum()
+        put = por_operacao(comum.put, pares)
+        remocao = por_operacao(comum.remover, removidas)
+        print(f"{tipo_comum.__name__:<26}{'-':<10}{put:>8.2f}{remocao:>9.2f}{'-':>10}{'-':>11}")
+        for nome, monoide in MONOIDES:
+            arvore = tipo_agregado(monoide=monoide)
+            put = por_operacao(arvore.put, pares)
+            agregado = por_operacao(arvore.agregado, janelas)
+            varredura = por_operacao(lambda lo, hi: varrer(arvore, monoide, lo, hi), janelas[:VARREDURAS])
+            for lo, hi in janelas[:VARREDURAS]:
+                assert arvore.agregado(lo, hi) == varrer(arvore, monoide, lo, hi)
+            remocao = por_operacao(arvore.remover, removidas)
+            print(f"{tipo_agregado.__name__:<26}{nome:<10}{put:>8.2f}{remocao:>9.2f}"
+                  f"{agregado:>10.2f}{varredura:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Árvore B+ (várias ordens) contra AVL e Rubro-Negra.
+
+Mede inserções, buscas e remoções por segundo com chaves embaralhadas,
+o tempo de um percurso completo em ordem e a memória por chave
+(tracemalloc, numa passada separada).
+
+Uso: python -m benchmarks.arvore_b [quantidade] [ordens...]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from functools import partial
+
+from src.arvore_avl import ArvoreAVL
+from src.arvore_b import ArvoreB
+from src.arvore_rn import ArvoreRubroNegra
+
+ORDENS = [16, 64, 256, 1024]
+
+
+def construir(criar, chaves):
+    arvore = criar()
+    for chave in chaves:
+        arvore.inserir(chave)
+    return arvore
+
+
+def medir(criar, chaves):
+    """Retorna (bytes/chave, inserções/s, buscas/s, remoções/s, ms do percurso)"""
+    tracemalloc.start()
+    arvore = construir(criar, chaves)
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del arvore
+
+    n = len(chaves)
+    inicio = time.perf_counter()
+    arvore = construir(criar, chaves)
+    insercoes = n / (time.perf_counter() - inicio)
+    buscar = arvore.buscar
+    inicio = time.perf_counter()
+    for chave in chaves:
+        buscar(chave)
+    buscas = n / (time.perf_counter() - inicio)
+    inicio = time.perf_counter()
+    for _ in arvore:
+        pass
+    percurso = (time.perf_counter() - inicio) * 1e3
+    remover = arvore.remover
+    inicio = time.perf_counter()
+    for chave in chaves:
+        remover(chave)
+    remocoes = n / (time.perf_counter() - inicio)
+    return memoria / n, insercoes, buscas, remocoes, percurso
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    ordens = [int(o) for o in sys.argv[2:]] or ORDENS
+    # As chaves são criadas antes da medição: só a estrutura é contabilizada
+    chaves = list(range(n))
+    random.Random(0).shuffle(chaves)
+    print(f"{n} chaves inteiras embaralhadas")
+    print(f"{'implementação':<18}{'bytes/chave':>12}{'inserções/s':>13}{'buscas/s':>12}"
+          f"{'remoções/s':>12}{'percurso ms':>13}")
+    casos = [("ArvoreAVL", ArvoreAVL), ("ArvoreRubroNegra", ArvoreRubroNegra)]
+    casos += [(f"ArvoreB({ordem})", partial(ArvoreB, ordem)) for ordem in ordens]
+    for nome, criar in casos:
+        por_chave, insercoes, buscas, remocoes, percurso = medir(criar, chaves)
+        print(f"{nome:<18}{por_chave:>12.1f}{insercoes:>13,.0f}{buscas:>12,.0f}"
+              f"{remocoes:>12,.0f}{percurso:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
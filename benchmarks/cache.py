@@ -0,0 +1,72 @@
+"""Cache de buscas (LRU e TinyLFU) sob cargas com popularidade Zipf.
+
+Sobre `quantidade` chaves pré-carregadas, faz buscas com popularidade
+Zipf de expoente s (com 5% de chaves ausentes e, na variante "+escrita",
+5% de inserções e remoções nas mesmas chaves) e compara a árvore sem
+cache com o LRU e o TinyLFU, cada um com `capacidade` entradas.
+
+Uso: python -m benchmarks.cache [quantidade] [capacidade] [operacoes]
+"""
+
+import random
+import sys
+import time
+from itertools import accumulate
+
+from src.arvore_avl import ArvoreAVL
+from src.arvore_rn import ArvoreRubroNegra
+
+EXPOENTES = [0.8, 1.1, 1.3]
+POLITICAS = [None, "lru", "tinylfu"]
+BUSCAR, INSERIR, REMOVER = 0, 1, 2
+REPETICOES = 3  # vale a passada mais rápida
+
+
+def gerar(n, operacoes, s, escritas, rng):
+    """Códigos e chaves: as chaves pares existem, as ímpares não"""
+    populares = list(range(2 * n))
+    rng.shuffle(populares)  # a popularidade não segue a ordem das chaves
+    pesos = list(accumulate(1 / posto ** s for posto in range(1, 2 * n + 1)))
+    chaves = rng.choices(populares, cum_weights=pesos, k=operacoes)
+    codigos = []
+    for _ in range(operacoes):
+        sorteio = rng.random()
+        codigos.append(BUSCAR if sorteio >= escritas else
+                       INSERIR if sorteio < escritas / 2 else REMOVER)
+    return codigos, chaves
+
+
+def medir(tipo_arvore, n, politica, capacidade, codigos, chaves):
+    """Retorna (ops/s da passada mais rápida, taxa de acertos)"""
+    melhor = float("inf")
+    for _ in range(REPETICOES):
+        arvore = tipo_arvore.from_sorted(range(0, 2 * n, 2))
+        cache = None if politica is None else arvore.ativar_cache(capacidade, politica)
+        metodos = (arvore.buscar, arvore.inserir, arvore.remover)
+        inicio = time.perf_counter()
+        for codigo, chave in zip(codigos, chaves):
+            metodos[codigo](chave)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return len(codigos) / melhor, (None if cache is None else cache.taxa_acertos())
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    capacidade = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+    operacoes = int(sys.argv[3]) if len(sys.argv) > 3 else 500_000
+    print(f"{n} chaves, cache de {capacidade} entradas, {operacoes} operações por carga")
+    print(f"{'árvore':<18}{'carga':<18}{'cache':<9}{'ops/s':>12}{'acertos':>9}")
+    for s in EXPOENTES:
+        for escritas in (0.0, 0.05):
+            codigos, chaves = gerar(n, operacoes, s, escritas, random.Random(0))
+            carga = f"zipf {s}" + (" +escrita" if escritas else "")
+            for tipo_arvore in (ArvoreAVL, ArvoreRubroNegra):
+                for politica in POLITICAS:
+                    vazao, acertos = medir(tipo_arvore, n, politica, capacidade, codigos, chaves)
+                    taxa = "-" if acertos is None else f"{acertos:.1%}"
+                    print(f"{tipo_arvore.__name__:<18}{carga:<18}{politica or 'sem':<9}"
+                          f"{vazao:>12,.0f}{taxa:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Conta comparações de chaves no modo mapa e no contorno com tuplas.
+
+O contorno antigo guardava pares (chave, dado) como valores, o que faz cada
+nível comparar tuplas (== e < nos elementos). O modo mapa compara só a
+chave, com uma comparação por nível.
+
+Uso: python -m benchmarks.comparacoes_mapa [quantidade]
+"""
+
+import random
+import sys
+import time
+
+from src.arvore_avl import ArvoreAVL
+from src.arvore_rn import ArvoreRubroNegra
+
+comparacoes = 0
+
+
+class ChaveContada(str):
+    """String que conta cada comparação rica feita com ela"""
+
+    __slots__ = ()
+    __hash__ = str.__hash__
+
+    def __lt__(self, outra):
+        global comparacoes
+        comparacoes += 1
+        return str.__lt__(self, outra)
+
+    def __gt__(self, outra):
+        global comparacoes
+        comparacoes += 1
+        return str.__gt__(self, outra)
+
+    def __le__(self, outra):
+        global comparacoes
+        comparacoes += 1
+        return str.__le__(self, outra)
+
+    def __ge__(self, outra):
+        global comparacoes
+        comparacoes += 1
+        return str.__ge__(self, outra)
+
+    def __eq__(self, outra):
+        global comparacoes
+        comparacoes += 1
+        return str.__eq__(self, outra)
+
+
+def operacoes_mapa(arvore, chaves, ausentes):
+    yield "put", lambda: [arvore.put(c, i) for i, c in enumerate(chaves)]
+    yield "get (presente)", lambda: [arvore.get(c) for c in chaves]
+    yield "get (ausente)", lambda: [arvore.get(c) for c in ausentes]
+    yield "pop", lambda: [arvore.pop(c) for c in chaves]
+
+
+def operacoes_tuplas(arvore, chaves, ausentes):
+    # Buscar pelo par exige conhecer o dado; a consulta usa teto((chave,))
+    def get(c):
+        par = arvore.teto((c,))
+        return par[1] if par is not None and par[0] == c else None
+
+    yield "put", lambda: [arvore.inserir((c, i)) for i, c in enumerate(chaves)]
+    yield "get (presente)", lambda: [get(c) for c in chaves]
+    yield "get (ausente)", lambda: [get(c) for c in ausentes]
+    yield "pop", lambda: [arvore.remover((c, i)) for i, c in enumerate(chaves)]
+
+
+def medir(operacoes, n, contar):
+    """Executa as operações em ordem; retorna [(nome, comparações/op, s)]"""
+    global comparacoes
+    resultados = []
+    for nome, executar in operacoes:
+        comparacoes = 0
+        inicio = time.perf_counter()
+        executar()
+        tempo = time.perf_counter() - inicio
+        resultados.append((nome, comparacoes / n if contar else None, tempo))
+    return resultados
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rng = random.Random(0)
+    # Prefixo comum longo: o custo de cada comparação é o de strings reais
+    sorteio = rng.sample(range(10 * n), 2 * n)
+    textos = [f"cliente:{numero:012d}" for numero in sorteio]
+    print(f"{n} chaves string (prefixo comum de 8 caracteres)")
+    print(f"{'árvore':<18}{'modo':<8}{'operação':<16}{'comp./op':>10}{'tempo (s)':>11}")
+    for tipo in (ArvoreAVL, ArvoreRubroNegra):
+        for modo, operacoes in (("mapa", operacoes_mapa), ("tuplas", operacoes_tuplas)):
+            # Uma passada com chaves contadas e outra com str puro para o tempo
+            contadas = [ChaveContada(t) for t in textos]
+            contagem = medir(operacoes(tipo(), contadas[:n], contadas[n:]), n, True)
+            tempos = medir(operacoes(tipo(), textos[:n], textos[n:]), n, False)
+            for (nome, por_op, _), (_, _, tempo) in zip(contagem, tempos):
+                print(f"{tipo.__name__:<18}{modo:<8}{nome:<16}{por_op:>10.1f}{tempo:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Vazão de uma árvore compartilhada entre threads: trava global x leitores/escritor.
+
+Carga: 95% buscas, 5% inserções/remoções, chaves aleatórias. Com a AVL
+persistente, a fachada responde as buscas pela versão publicada, sem
+trava. No fim, mede
+quanto tempo a trava de leitura fica presa para começar uma iteração:
+uma cópia O(n) nas árvores comuns, uma versão O(1) na AVL persistente.
+
+Uso: python -m benchmarks.concorrencia [segundos por cenário] [quantidade]
+"""
+
+import random
+import sys
+import threading
+import time
+
+from src.arvore_avl import ArvoreAVL, ArvoreAVLPersistente
+from src.arvore_rn import ArvoreRubroNegra
+from src.concorrente import ArvoreConcorrente
+
+THREADS = [1, 2, 4, 8, 16, 32]
+LEITURAS = 0.95
+
+
+class ArvoreTravaGlobal:
+    """Referência: toda chamada passa pela mesma trava"""
+
+    def __init__(self, arvore):
+        self._arvore = arvore
+        self._trava = threading.Lock()
+
+    def buscar(self, valor):
+        with self._trava:
+            return self._arvore.buscar(valor)
+
+    def inserir(self, valor):
+        with self._trava:
+            return self._arvore.inserir(valor)
+
+    def remover(self, valor):
+        with self._trava:
+            return self._arvore.remover(valor)
+
+
+def operacoes_por_segundo(arvore, n_threads, duracao, universo):
+    contagens = [0] * n_threads
+    barreira = threading.Barrier(n_threads + 1)
+    parar = threading.Event()
+
+    def trabalhador(indice):
+        rng = random.Random(indice)
+        buscar, inserir, remover = arvore.buscar, arvore.inserir, arvore.remover
+        feitas = 0
+        barreira.wait()
+        while not parar.is_set():
+            for _ in range(100):
+                chave = rng.randrange(universo)
+                sorteio = rng.random()
+                if sorteio < LEITURAS:
+                    buscar(chave)
+                elif sorteio < (1 + LEITURAS) / 2:
+                    inserir(chave)
+                else:
+                    remover(chave)
+            feitas += 100
+        contagens[indice] = feitas
+
+    threads = [threading.Thread(target=trabalhador, args=(i,)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    barreira.wait()
+    inicio = time.perf_counter()
+    time.sleep(duracao)
+    parar.set()
+    for thread in threads:
+        thread.join()
+    return sum(contagens) / (time.perf_counter() - inicio)
+
+
+def main():
+    duracao = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'ativo' if gil else 'desativado'}; "
+          f"{n} chaves, {LEITURAS:.0%} leituras")
+    print(f"{'árvore':<22}{'threads':>8}{'trava global':>15}{'leit./escr.':>15}")
+    for tipo in (ArvoreAVL, ArvoreRubroNegra, ArvoreAVLPersistente):
+        for n_threads in THREADS:
+            taxas = []
+            for fachada in (ArvoreTravaGlobal, ArvoreConcorrente):
+                arvore = fachada(tipo.from_sorted(range(0, 2 * n, 2)))
+                taxas.append(operacoes_por_segundo(arvore, n_threads, duracao, 2 * n))
+            print(f"{tipo.__name__:<22}{n_threads:>8}{taxas[0]:>15,.0f}{taxas[1]:>15,.0f}")
+    print("início de uma iteração (instantâneo da fachada)")
+    for tipo in (ArvoreAVL, ArvoreRubroNegra, ArvoreAVLPersistente):
+        arvore = ArvoreConcorrente(tipo.from_sorted(range(0, 2 * n, 2)))
+        inicio = time.perf_counter()
+        next(iter(arvore))
+        print(f"{tipo.__name__:<22}{(time.perf_counter() - inicio) * 1e3:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
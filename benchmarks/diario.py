@@ -0,0 +1,56 @@
+"""Mede escritas sustentadas por segundo sob cada política de durabilidade.
+
+Uso: python -m benchmarks.diario [segundos por cenário]
+"""
+
+import random
+import sys
+import tempfile
+import time
+
+from src.arvore_avl import ArvoreAVL
+from src.arvore_rn import ArvoreRubroNegra
+
+POLITICAS = [
+    ("sem diário", None),
+    ("fsync a cada op", {"a_cada": 1}),
+    ("fsync a cada 10", {"a_cada": 10}),
+    ("fsync a cada 100", {"a_cada": 100}),
+    ("fsync a cada 1000", {"a_cada": 1000}),
+    ("fsync a cada 10 ms", {"a_cada": None, "intervalo_ms": 10}),
+    ("fsync a cada 100 ms", {"a_cada": None, "intervalo_ms": 100}),
+]
+
+
+def escritas_por_segundo(arvore, duracao):
+    """Alterna inserções e remoções aleatórias durante `duracao` segundos.
+
+    Conta as tentativas; remoções de chaves ausentes não geram registro.
+    """
+    rng = random.Random(0)
+    operacoes = 0
+    fim = time.perf_counter() + duracao
+    while time.perf_counter() < fim:
+        for _ in range(100):
+            chave = rng.randrange(1_000_000)
+            arvore.inserir(chave)
+            arvore.remover(rng.randrange(1_000_000))
+        operacoes += 200
+    arvore.sincronizar()
+    return operacoes / duracao
+
+
+def main():
+    duracao = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    print(f"{'árvore':<18}{'política':<22}{'escritas/s':>12}")
+    for tipo in (ArvoreAVL, ArvoreRubroNegra):
+        for nome, politica in POLITICAS:
+            with tempfile.TemporaryDirectory() as pasta:
+                arvore = tipo() if politica is None else tipo.recuperar(pasta, **politica)
+                taxa = escritas_por_segundo(arvore, duracao)
+                arvore.fechar_diario()
+            print(f"{tipo.__name__:<18}{nome:<22}{taxa:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Vazão de lotes na árvore fragmentada conforme o número de processos.
+
+Insere `quantidade` chaves aleatórias em lotes e depois consulta o mesmo
+número de chaves com `buscar_muitos`; compara com uma árvore única no
+próprio processo.
+
+Uso: python -m benchmarks.fragmentos [quantidade] [tamanho do lote]
+"""
+
+import os
+import random
+import sys
+import time
+
+from src.arvore_rn import ArvoreRubroNegra
+from src.fragmentada import ArvoreFragmentada
+
+PROCESSOS = [1, 2, 4, 8]
+
+
+def medir(arvore, lotes_insercao, lotes_busca):
+    """Retorna (inserções/s, buscas/s) processando os lotes em sequência"""
+    n = sum(len(lote) for lote in lotes_insercao)
+    inicio = time.perf_counter()
+    for lote in lotes_insercao:
+        arvore.inserir_muitos(lote)
+    tempo_insercao = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for lote in lotes_busca:
+        arvore.buscar_muitos(lote)
+    tempo_busca = time.perf_counter() - inicio
+    return n / tempo_insercao, n / tempo_busca
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tamanho_lote = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    rng = random.Random(0)
+    chaves = [rng.randrange(1 << 40) for _ in range(2 * n)]
+    lotes_insercao = [chaves[i:i + tamanho_lote] for i in range(0, n, tamanho_lote)]
+    lotes_busca = [chaves[i:i + tamanho_lote] for i in range(n // 2, n + n // 2, tamanho_lote)]
+    # Limites pelos quantis de uma amostra: os fragmentos já nascem equilibrados
+    amostra = sorted(rng.sample(chaves[:n], 10_000))
+
+    print(f"{n} chaves em lotes de {tamanho_lote}; {os.cpu_count()} CPUs")
+    print(f"{'configuração':<22}{'inserções/s':>14}{'buscas/s':>14}")
+    taxas = medir(ArvoreRubroNegra(), lotes_insercao, lotes_busca)
+    print(f"{'árvore única':<22}{taxas[0]:>14,.0f}{taxas[1]:>14,.0f}")
+    for processos in PROCESSOS:
+        limites = [amostra[len(amostra) * i // processos] for i in range(1, processos)]
+        with ArvoreFragmentada(processos, limites=limites) as arvore:
+            taxas = medir(arvore, lotes_insercao, lotes_busca)
+        print(f"{f'{processos} processos':<22}{taxas[0]:>14,.0f}{taxas[1]:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Árvore de intervalos contra varredura linear e contra a Rubro-Negra comum.
+
+Monta `n` intervalos aleatórios (início uniforme em [0, 10⁹), comprimento
+exponencial de média `comprimento`) com `from_sorted` e mede:
+- consultas de ponto (`contendo`) e de sobreposição (`sobrepostos`) na
+  árvore e numa varredura da lista ordenada, com o total de respostas;
+- inserções e remoções na árvore de intervalos e na Rubro-Negra comum
+  com as mesmas chaves, o custo de manter o máximo.
+
+Uso: python -m benchmarks.intervalos [n] [comprimento]
+"""
+
+import random
+import sys
+import time
+
+from src.arvore_intervalos import ArvoreIntervalos
+from src.arvore_rn import ArvoreRubroNegra
+
+LIMITE = 10 ** 9
+CONSULTAS = 10_000
+VARREDURAS = 5       # a varredura é O(n) por consulta
+ATUALIZACOES = 100_000
+
+
+def gerar(rng, n, comprimento):
+    intervalos = []
+    for _ in range(n):
+        inicio = rng.randrange(LIMITE)
+        intervalos.append((inicio, inicio + int(rng.expovariate(1 / comprimento))))
+    return intervalos
+
+
+def varrer(intervalos, inicio, fim):
+    return [v for v in intervalos if v[0] <= fim and inicio <= v[1]]
+
+
+def medir(funcao, consultas):
+    """Segundos por consulta e total de respostas"""
+    respostas = 0
+    comeco = time.perf_counter()
+    for inicio, fim in consultas:
+        for _ in funcao(inicio, fim):
+            respostas += 1
+    return (time.perf_counter() - comeco) / len(consultas), respostas
+
+
+def atualizar(arvore, novos, removidos):
+    comeco = time.perf_counter()
+    for intervalo in novos:
+        arvore.inserir(intervalo)
+    meio = time.perf_counter()
+    for intervalo in removidos:
+        arvore.remover(intervalo)
+    fim = time.perf_counter()
+    return (meio - comeco) / len(novos), (fim - meio) / len(removidos)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    comprimento = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rng = random.Random(0)
+    intervalos = sorted(gerar(rng, n, comprimento))
+
+    comeco = time.perf_counter()
+    arvore = ArvoreIntervalos.from_sorted(intervalos)
+    construcao = time.perf_counter() - comeco
+    comeco = time.perf_counter()
+    comum = ArvoreRubroNegra.from_sorted(intervalos)
+    construcao_comum = time.perf_counter() - comeco
+    print(f"{n} intervalos (comprimento médio {comprimento}), altura {arvore.altura()}")
+    print(f"from_sorted: intervalos {construcao:.2f} s, Rubro-Negra comum {construcao_comum:.2f} s")
+
+    pontos = [(p, p) for p in (rng.randrange(LIMITE) for _ in range(CONSULTAS))]
+    janelas = [(a, a + 100 * comprimento) for a in (rng.randrange(LIMITE) for _ in range(CONSULTAS))]
+    print(f"{'consulta':<24}{'árvore µs':>12}{'varredura µs':>14}{'respostas/consulta':>20}")
+    for nome, consultas in (("ponto", pontos), ("janela 100×comprimento", janelas)):
+        por_consulta, respostas = medir(arvore.sobrepostos, consultas)
+        varredura, _ = medir(lambda a, b: varrer(intervalos, a, b), consultas[:VARREDURAS])
+        print(f"{nome:<24}{por_consulta * 1e6:>12.1f}{varredura * 1e6:>14.0f}"
+              f"{respostas / len(consultas):>20.1f}")
+
+    novos = gerar(rng, ATUALIZACOES, comprimento)
+    removidos = rng.sample(intervalos, ATUALIZACOES)
+    print(f"{'atualização µs':<24}{'inserção':>12}{'remoção':>14}")
+    for nome, alvo in (("intervalos", arvore), ("Rubro-Negra comum", comum)):
+        insercao, remocao = atualizar(alvo, novos, removidos)
+        print(f"{nome:<24}{insercao * 1e6:>12.2f}{remocao * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Compara memória por chave e vazão das duas Árvores Rubro-Negras.
+
+Uso: python -m benchmarks.memoria_rn [quantidade]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from src.arvore_rn import ArvoreRubroNegra
+from src.arvore_rn_compacta import ArvoreRubroNegraCompacta
+
+
+def construir(tipo_arvore, chaves):
+    arvore = tipo_arvore()
+    for chave in chaves:
+        arvore.inserir(chave)
+    return arvore
+
+
+def medir(tipo_arvore, chaves):
+    """Retorna (bytes por chave, inserções/s, buscas/s) para uma implementação"""
+    # Memória e tempo em passadas separadas: o tracemalloc distorce o tempo
+    tracemalloc.start()
+    arvore = construir(tipo_arvore, chaves)
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del arvore
+
+    inicio = time.perf_counter()
+    arvore = construir(tipo_arvore, chaves)
+    tempo_insercao = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for chave in chaves:
+        arvore.buscar(chave)
+    tempo_busca = time.perf_counter() - inicio
+    n = len(chaves)
+    return memoria / n, n / tempo_insercao, n / tempo_busca
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    # As chaves são criadas antes da medição: só a estrutura é contabilizada
+    chaves = list(range(n))
+    random.Random(0).shuffle(chaves)
+    print(f"{n} chaves inteiras embaralhadas")
+    print(f"{'implementação':<28}{'bytes/chave':>12}{'inserções/s':>14}{'buscas/s':>12}")
+    for tipo in (ArvoreRubroNegra, ArvoreRubroNegraCompacta):
+        por_chave, insercoes, buscas = medir(tipo, chaves)
+        print(f"{tipo.__name__:<28}{por_chave:>12.1f}{insercoes:>14,.0f}{buscas:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
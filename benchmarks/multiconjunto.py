@@ -0,0 +1,95 @@
+"""Multiconjunto na árvore contra árvore + dicionário de contagens.
+
+Processa um fluxo de `eventos` chaves (popularidade Zipf s=1,1 sobre
+`distintas` chaves) de duas formas: a árvore em modo multiconjunto e a
+árvore comum com um dict de contagens ao lado (inserindo só chaves novas
+e removendo quando a contagem zera); o multiconjunto também com o cache
+de buscas ligado. Depois retira 20% dos eventos.
+Mede o tempo das duas fases e o pico de memória (tracemalloc, numa
+passada separada).
+
+Uso: python -m benchmarks.multiconjunto [eventos] [distintas]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from itertools import accumulate
+
+from src.arvore_avl import ArvoreAVL, ArvoreAVLMulticonjunto
+from src.arvore_rn import ArvoreRubroNegra, ArvoreRubroNegraMulticonjunto
+
+CAPACIDADE_CACHE = 1024  # veja `ativar_cache`
+
+
+class ArvoreComDicionario:
+    """O arranjo anterior: a árvore guarda as chaves e um dict, as contagens"""
+
+    def __init__(self, tipo_arvore):
+        self.arvore = tipo_arvore()
+        self.contagens = {}
+
+    def inserir(self, valor):
+        n = self.contagens.get(valor, 0)
+        if not n:
+            self.arvore.inserir(valor)
+        self.contagens[valor] = n + 1
+
+    def remover(self, valor):
+        n = self.contagens.get(valor, 0)
+        if n == 1:
+            del self.contagens[valor]
+            self.arvore.remover(valor)
+        elif n:
+            self.contagens[valor] = n - 1
+        return n > 0
+
+
+def com_cache(arvore):
+    arvore.ativar_cache(CAPACIDADE_CACHE)
+    return arvore
+
+
+def executar(criar, eventos, retiradas):
+    arvore = criar()
+    inicio = time.perf_counter()
+    for valor in eventos:
+        arvore.inserir(valor)
+    meio = time.perf_counter()
+    for valor in retiradas:
+        arvore.remover(valor)
+    return arvore, meio - inicio, time.perf_counter() - meio
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    distintas = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    rng = random.Random(0)
+    chaves = list(range(distintas))
+    rng.shuffle(chaves)
+    pesos = list(accumulate(1 / posto ** 1.1 for posto in range(1, distintas + 1)))
+    eventos = rng.choices(chaves, cum_weights=pesos, k=quantidade)
+    retiradas = rng.sample(eventos, quantidade // 5)
+    casos = [
+        ("AVL + dict", lambda: ArvoreComDicionario(ArvoreAVL)),
+        ("AVL multiconjunto", ArvoreAVLMulticonjunto),
+        ("RN + dict", lambda: ArvoreComDicionario(ArvoreRubroNegra)),
+        ("RN multiconjunto", ArvoreRubroNegraMulticonjunto),
+        ("AVL multi + cache", lambda: com_cache(ArvoreAVLMulticonjunto())),
+        ("RN multi + cache", lambda: com_cache(ArvoreRubroNegraMulticonjunto())),
+    ]
+    print(f"{quantidade} eventos sobre {distintas} chaves")
+    print(f"{'estrutura':<20}{'inserção s':>12}{'remoção s':>12}{'pico MB':>10}")
+    for nome, criar in casos:
+        tempos = min((executar(criar, eventos, retiradas)[1:] for _ in range(3)), key=sum)
+        tracemalloc.start()
+        arvore = executar(criar, eventos, retiradas)[0]
+        pico = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+        del arvore
+        print(f"{nome:<20}{tempos[0]:>12.3f}{tempos[1]:>12.3f}{pico:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
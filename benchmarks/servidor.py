@@ -0,0 +1,129 @@
+"""Gerador de carga para o servidor de árvores (`servidor.py` na raiz).
+
+Sobe o servidor num subprocesso em 127.0.0.1 (porta livre), carrega `n`
+chaves com IM e, em cada cenário, mantém `conexões × em voo` pedidos
+pendentes durante `segundos`: 95% buscas, 5% inserções/remoções. A
+latência de cada pedido vai do envio à resposta, medida no cliente. O
+cenário em lote manda BM com 100 chaves por pedido (a vazão conta chaves).
+No fim, um RANGE que transmite 10% das chaves.
+
+Cliente e servidor dividem a máquina: com poucos núcleos, os números medem
+os dois processos juntos.
+
+Uso: python -m benchmarks.servidor [n] [segundos] [avl|rn]
+"""
+
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+from src.cliente import PoolConexoes
+
+SERVIDOR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "servidor.py")
+LEITURAS = 0.95
+CARGA_POR_PEDIDO = 10_000
+# (nome, conexões, pedidos em voo por conexão, chaves por pedido BM ou 0)
+CENARIOS = [
+    ("sem pipeline", 1, 1, 0),
+    ("sem pipeline", 8, 1, 0),
+    ("pipeline", 1, 16, 0),
+    ("pipeline", 8, 16, 0),
+    ("lote BM 100", 4, 4, 100),
+]
+
+
+def _percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def iniciar_servidor(tipo):
+    """Sobe o servidor com --porta 0 e lê a porta da primeira linha da saída de erro"""
+    processo = subprocess.Popen([sys.executable, SERVIDOR, "--tipo", tipo, "--porta", "0"],
+                                stderr=subprocess.PIPE, text=True)
+    linha = processo.stderr.readline()
+    if not linha.startswith("ouvindo em "):
+        processo.kill()
+        raise RuntimeError(f"o servidor não subiu: {linha!r}")
+    return processo, int(linha.rsplit(":", 1)[1])
+
+
+async def trabalhador(conexao, rng, universo, lote, ate, latencias):
+    relogio = time.perf_counter
+    while relogio() < ate:
+        antes = relogio()
+        if lote:
+            await conexao.buscar_muitos([rng.randrange(universo) for _ in range(lote)])
+        else:
+            chave = rng.randrange(universo)
+            sorteio = rng.random()
+            if sorteio < LEITURAS:
+                await conexao.buscar(chave)
+            elif sorteio < (1 + LEITURAS) / 2:
+                await conexao.inserir(chave)
+            else:
+                await conexao.remover(chave)
+        latencias.append(relogio() - antes)
+
+
+async def cenario(pool, n_conexoes, em_voo, lote, duracao, universo):
+    conexoes = [await pool.adquirir() for _ in range(n_conexoes)]
+    latencias = []
+    ate = time.perf_counter() + duracao
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador(conexao, random.Random(i * em_voo + j), universo, lote,
+                                       ate, latencias)
+                           for i, conexao in enumerate(conexoes) for j in range(em_voo)))
+    decorrido = time.perf_counter() - inicio
+    for conexao in conexoes:
+        pool.liberar(conexao)
+    latencias.sort()
+    return len(latencias) * max(lote, 1) / decorrido, [_percentil(latencias, p) * 1e6
+                                                       for p in (50, 99, 99.9)]
+
+
+async def carregar(n, duracao, porta):
+    async with PoolConexoes(max(c for _, c, _, _ in CENARIOS), porta=porta) as pool:
+        async with pool.conexao() as conexao:
+            inicio = time.perf_counter()
+            for base in range(0, 2 * n, 2 * CARGA_POR_PEDIDO):
+                await conexao.inserir_muitos(range(base, min(base + 2 * CARGA_POR_PEDIDO, 2 * n), 2))
+            print(f"carga: {n} chaves com IM em {time.perf_counter() - inicio:.2f} s")
+        print(f"{'cenário':<16}{'conexões':>9}{'em voo':>8}{'ops/s':>12}"
+              f"{'p50 µs':>10}{'p99 µs':>10}{'p99.9 µs':>10}")
+        for nome, n_conexoes, em_voo, lote in CENARIOS:
+            vazao, (p50, p99, p999) = await cenario(pool, n_conexoes, em_voo, lote, duracao, 2 * n)
+            print(f"{nome:<16}{n_conexoes:>9}{em_voo:>8}{vazao:>12,.0f}"
+                  f"{p50:>10.0f}{p99:>10.0f}{p999:>10.0f}")
+        async with pool.conexao() as conexao:
+            lo = n // 2
+            inicio = time.perf_counter()
+            primeiro = None
+            quantidade = 0
+            async for _ in conexao.intervalo(lo, lo + n // 5):
+                if primeiro is None:
+                    primeiro = time.perf_counter() - inicio
+                quantidade += 1
+            total = time.perf_counter() - inicio
+            print(f"RANGE: {quantidade} valores em {total * 1e3:.1f} ms "
+                  f"({quantidade / total:,.0f}/s), primeiro bloco em {primeiro * 1e3:.2f} ms")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    duracao = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    tipo = sys.argv[3] if len(sys.argv) > 3 else "rn"
+    processo, porta = iniciar_servidor(tipo)
+    try:
+        print(f"servidor {tipo} em 127.0.0.1:{porta}; {os.cpu_count()} CPU(s); "
+              f"{LEITURAS:.0%} buscas, {duracao} s por cenário")
+        asyncio.run(carregar(n, duracao, porta))
+    finally:
+        processo.terminate()
+        print("servidor:", processo.communicate(timeout=10)[1].strip())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Compara o tempo de partida: inserções uma a uma x snapshot binário.
+
+Uso: python -m benchmarks.snapshot [quantidade]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from src.arvore_avl import ArvoreAVL
+from src.arvore_rn import ArvoreRubroNegra
+
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+
+def inserir_todas(tipo_arvore, chaves):
+    arvore = tipo_arvore()
+    for chave in chaves:
+        arvore.inserir(chave)
+    return arvore
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(0)
+    cenarios = {
+        "int": rng.sample(range(10 * n), n),
+        "str": [f"usuario:{numero:010d}" for numero in rng.sample(range(10 * n), n)],
+    }
+    print(f"{n} chaves embaralhadas")
+    print(f"{'árvore':<18}{'chave':<7}{'inserir (s)':>12}{'salvar (s)':>12}"
+          f"{'carregar (s)':>14}{'arquivo (MB)':>14}")
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "arvore.snap")
+        for tipo in (ArvoreAVL, ArvoreRubroNegra):
+            for nome, chaves in cenarios.items():
+                arvore, t_inserir = cronometrar(lambda: inserir_todas(tipo, chaves))
+                _, t_salvar = cronometrar(lambda: arvore.salvar(caminho))
+                del arvore
+                _, t_carregar = cronometrar(lambda: tipo.carregar(caminho))
+                tamanho = os.path.getsize(caminho) / 1e6
+                print(f"{tipo.__name__:<18}{nome:<7}{t_inserir:>12.2f}{t_salvar:>12.2f}"
+                      f"{t_carregar:>14.2f}{tamanho:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
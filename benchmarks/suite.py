@@ -0,0 +1,225 @@
+"""Suíte de desempenho: AVL x Rubro-Negra x B+ sob cargas realistas.
+
+Para cada árvore, carga e tamanho mede vazão (ops/s), latência p50/p99,
+pico de memória (tracemalloc, numa passada separada) e altura final. Os
+resultados podem ser gravados em JSON e comparados com uma linha de base.
+
+Cargas:
+  sequencial  insere 0..n-1 em ordem numa árvore vazia
+  aleatoria   insere n chaves embaralhadas numa árvore vazia
+  zipf        n buscas com popularidade Zipf (s=1,1) sobre n chaves
+  leitura     95% buscas, 5% inserções/remoções sobre n chaves
+  escrita     90% inserções/remoções, 10% buscas sobre n chaves
+  remocao     remove todas as n chaves em ordem aleatória
+
+Uso:
+  python -m benchmarks.suite [--tamanhos 1000 10000 100000] [--cargas ...]
+                             [--saida resultados.json]
+                             [--comparar base.json] [--tolerancia 0.10]
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from itertools import accumulate
+
+from src.arvore_avl import ArvoreAVL
+from src.arvore_b import ArvoreB
+from src.arvore_rn import ArvoreRubroNegra
+
+ARVORES = {"avl": ArvoreAVL, "rubro_negra": ArvoreRubroNegra, "b": ArvoreB}
+INSERIR, REMOVER, BUSCAR = 0, 1, 2
+TEMPO_MINIMO = 0.2  # segundos medidos por caso, no mínimo
+
+
+# --- Geração das cargas: (chaves pré-carregadas, códigos, chaves) ---
+def _misturada(n, rng, leituras):
+    """Sobre as chaves pares de [0, 2n): buscas e, no resto, metade inserções"""
+    codigos = []
+    chaves = []
+    for _ in range(n):
+        sorteio = rng.random()
+        codigos.append(BUSCAR if sorteio < leituras else
+                       INSERIR if sorteio < (1 + leituras) / 2 else REMOVER)
+        chaves.append(rng.randrange(2 * n))
+    return range(0, 2 * n, 2), codigos, chaves
+
+
+def carga_sequencial(n, rng):
+    return None, [INSERIR] * n, list(range(n))
+
+
+def carga_aleatoria(n, rng):
+    chaves = list(range(n))
+    rng.shuffle(chaves)
+    return None, [INSERIR] * n, chaves
+
+
+def carga_zipf(n, rng, s=1.1):
+    populares = list(range(0, 2 * n, 2))
+    rng.shuffle(populares)  # a popularidade não segue a ordem das chaves
+    pesos = accumulate(1 / posto ** s for posto in range(1, n + 1))
+    return range(0, 2 * n, 2), [BUSCAR] * n, rng.choices(populares, cum_weights=list(pesos), k=n)
+
+
+def carga_leitura(n, rng):
+    return _misturada(n, rng, 0.95)
+
+
+def carga_escrita(n, rng):
+    return _misturada(n, rng, 0.10)
+
+
+def carga_remocao(n, rng):
+    chaves = list(range(0, 2 * n, 2))
+    rng.shuffle(chaves)
+    return range(0, 2 * n, 2), [REMOVER] * n, chaves
+
+
+CARGAS = {
+    "sequencial": carga_sequencial,
+    "aleatoria": carga_aleatoria,
+    "zipf": carga_zipf,
+    "leitura": carga_leitura,
+    "escrita": carga_escrita,
+    "remocao": carga_remocao,
+}
+
+
+# --- Medição ---
+def _executar(tipo_arvore, pre_carga, codigos, chaves, cronometrar):
+    """Roda a carga; retorna (árvore, segundos, latências em ns ou None)"""
+    arvore = tipo_arvore() if pre_carga is None else tipo_arvore.from_sorted(pre_carga)
+    metodos = (arvore.inserir, arvore.remover, arvore.buscar)
+    relogio = time.perf_counter_ns
+    inicio = time.perf_counter()
+    if cronometrar:
+        latencias = []
+        registrar = latencias.append
+        for codigo, chave in zip(codigos, chaves):
+            antes = relogio()
+            metodos[codigo](chave)
+            registrar(relogio() - antes)
+    else:
+        latencias = None
+        for codigo, chave in zip(codigos, chaves):
+            metodos[codigo](chave)
+    return arvore, time.perf_counter() - inicio, latencias
+
+
+def _percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def medir(nome_arvore, nome_carga, n, memoria=True, semente=0):
+    """Mede um caso; retorna o dicionário gravado no JSON.
+
+    A vazão e as latências vêm das mesmas passadas (o relógio por operação
+    acrescenta ~2% ao tempo), repetidas até somar TEMPO_MINIMO: vale a
+    passada mais rápida e as latências de todas. O pico de memória vem de
+    uma passada separada sob tracemalloc, que distorceria o tempo.
+    """
+    tipo_arvore = ARVORES[nome_arvore]
+    pre_carga, codigos, chaves = CARGAS[nome_carga](n, random.Random(semente))
+    segundos = float("inf")
+    latencias = []
+    total = 0.0
+    while total < TEMPO_MINIMO:
+        arvore, passada, medidas = _executar(tipo_arvore, pre_carga, codigos, chaves, True)
+        segundos = min(segundos, passada)
+        latencias += medidas
+        total += passada
+    latencias.sort()
+    resultado = {
+        "arvore": nome_arvore,
+        "carga": nome_carga,
+        "n": n,
+        "ops": len(codigos),
+        "ops_por_s": len(codigos) / segundos,
+        "p50_us": _percentil(latencias, 50) / 1000,
+        "p99_us": _percentil(latencias, 99) / 1000,
+        "pico_mb": None,
+        "altura": arvore.altura(),
+    }
+    del arvore, latencias
+    if memoria:
+        tracemalloc.start()
+        arvore = _executar(tipo_arvore, pre_carga, codigos, chaves, False)[0]
+        resultado["pico_mb"] = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+        del arvore
+    return resultado
+
+
+# --- Comparação com a linha de base ---
+def comparar(atuais, base, tolerancia, tolerancia_latencia):
+    """Retorna as linhas de regressão (vazão, p99 ou memória) entre os casos comuns"""
+    indice = {(r["arvore"], r["carga"], r["n"]): r for r in base["resultados"]}
+    regressoes = []
+    for atual in atuais:
+        anterior = indice.get((atual["arvore"], atual["carga"], atual["n"]))
+        if anterior is None:
+            continue
+        caso = f"{atual['arvore']}/{atual['carga']}/{atual['n']}"
+        if atual["ops_por_s"] < anterior["ops_por_s"] * (1 - tolerancia):
+            regressoes.append(f"{caso}: ops/s {anterior['ops_por_s']:,.0f} -> {atual['ops_por_s']:,.0f}")
+        if atual["p99_us"] > anterior["p99_us"] * (1 + tolerancia_latencia):
+            regressoes.append(f"{caso}: p99 {anterior['p99_us']:.2f} -> {atual['p99_us']:.2f} µs")
+        if (atual["pico_mb"] is not None and anterior.get("pico_mb") is not None
+                and atual["pico_mb"] > anterior["pico_mb"] * (1 + tolerancia)):
+            regressoes.append(f"{caso}: memória {anterior['pico_mb']:.1f} -> {atual['pico_mb']:.1f} MB")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="quantidades de chaves (até 10**7; acima de 10**6 leva minutos)")
+    parser.add_argument("--cargas", nargs="+", choices=list(CARGAS), default=list(CARGAS))
+    parser.add_argument("--arvores", nargs="+", choices=list(ARVORES), default=list(ARVORES))
+    parser.add_argument("--sem-memoria", action="store_true",
+                        help="pula a passada de memória (tracemalloc)")
+    parser.add_argument("--saida", help="grava os resultados neste arquivo JSON")
+    parser.add_argument("--comparar", metavar="BASE", help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.10,
+                        help="queda de vazão / aumento de memória aceitos (padrão 10%%)")
+    parser.add_argument("--tolerancia-latencia", type=float, default=0.25,
+                        help="aumento de p99 aceito (padrão 25%%)")
+    args = parser.parse_args()
+
+    print(f"{'árvore':<13}{'carga':<12}{'n':>9}{'ops/s':>12}{'p50 µs':>9}{'p99 µs':>9}"
+          f"{'pico MB':>9}{'altura':>8}")
+    # Aquecimento: o primeiro caso medido sairia penalizado
+    medir(args.arvores[0], args.cargas[0], min(args.tamanhos), memoria=False)
+    resultados = []
+    for n in args.tamanhos:
+        for nome_carga in args.cargas:
+            for nome_arvore in args.arvores:
+                r = medir(nome_arvore, nome_carga, n, memoria=not args.sem_memoria)
+                resultados.append(r)
+                pico = "-" if r["pico_mb"] is None else f"{r['pico_mb']:.1f}"
+                print(f"{nome_arvore:<13}{nome_carga:<12}{n:>9}{r['ops_por_s']:>12,.0f}"
+                      f"{r['p50_us']:>9.2f}{r['p99_us']:>9.2f}{pico:>9}{r['altura']:>8}")
+
+    if args.saida:
+        meta = {"python": sys.version.split()[0], "plataforma": platform.platform(),
+                "data": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump({"meta": meta, "resultados": resultados}, arquivo, indent=2)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+        regressoes = comparar(resultados, base, args.tolerancia, args.tolerancia_latencia)
+        for linha in regressoes:
+            print(f"REGRESSÃO {linha}")
+        if regressoes:
+            sys.exit(1)
+        print("sem regressões em relação à linha de base")
+
+
+if __name__ == "__main__":
+    main()
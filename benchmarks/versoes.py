@@ -0,0 +1,69 @@
+"""Memória para manter muitas versões de uma AVL persistente.
+
+Constrói a árvore base, guarda `versoes` versões separadas por
+`atualizacoes` inserções/remoções aleatórias cada e mede, com tracemalloc,
+quanto as versões custam além da base. Copiar a árvore inteira por versão
+custaria `versoes` vezes a base.
+
+Uso: python -m benchmarks.versoes [quantidade] [versoes]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from src.arvore_avl import ArvoreAVL, ArvoreAVLPersistente
+
+
+def atualizar(arvore, rng, n, atualizacoes):
+    """Insere chaves ímpares e remove chaves pares, sorteadas em [0, 2n)"""
+    for _ in range(atualizacoes):
+        chave = rng.randrange(2 * n)
+        if chave % 2:
+            arvore.inserir(chave)
+        else:
+            arvore.remover(chave)
+
+
+def medir_memoria(n, versoes, atualizacoes):
+    """Retorna (MB da base, MB extra das versões guardadas)"""
+    rng = random.Random(0)
+    tracemalloc.start()
+    arvore = ArvoreAVLPersistente.from_sorted(range(0, 2 * n, 2))
+    base, _ = tracemalloc.get_traced_memory()
+    guardadas = []
+    for _ in range(versoes):
+        atualizar(arvore, rng, n, atualizacoes)
+        guardadas.append(arvore.versao())
+    total, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return base / 1e6, (total - base) / 1e6
+
+
+def medir_tempo(tipo_arvore, n, atualizacoes):
+    """µs por atualização (sem tracemalloc, que distorce o tempo)"""
+    rng = random.Random(0)
+    arvore = tipo_arvore.from_sorted(range(0, 2 * n, 2))
+    inicio = time.perf_counter()
+    atualizar(arvore, rng, n, atualizacoes)
+    return (time.perf_counter() - inicio) / atualizacoes * 1e6
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    versoes = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    print(f"{n} chaves, {versoes} versões guardadas")
+    print(f"{'atualiz./versão':>16}{'base (MB)':>12}{'versões (MB)':>14}"
+          f"{'KB/versão':>11}{'cópias (MB)':>13}")
+    for atualizacoes in (1, 10, 100):
+        base, extra = medir_memoria(n, versoes, atualizacoes)
+        print(f"{atualizacoes:>16}{base:>12.1f}{extra:>14.1f}{extra / versoes * 1e3:>11.1f}"
+              f"{base * versoes:>13,.0f}")
+    print()
+    for tipo in (ArvoreAVL, ArvoreAVLPersistente):
+        print(f"{tipo.__name__:<22}{medir_tempo(tipo, n, 100_000):>8.1f} µs/atualização")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
+import argparse
 import os
 import sys
+import time
+from itertools import islice
 
 # Adiciona o diretório raiz ao path para permitir importações diretas de 'src'
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
 from src.arvore_avl import ArvoreAVL
+from src.arvore_b import ArvoreB
 from src.arvore_rn import ArvoreRubroNegra
 
 
@@ -22,16 +26,16 @@ class TerminalUI:
 
     @staticmethod
     def limpar_tela():
-        """Limpa a tela do terminal"""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        """Limpa a tela do terminal com sequências ANSI (sem abrir um shell)"""
+        print("\033[H\033[2J\033[3J", end="", flush=True)
 
     @staticmethod
     def header(texto: str):
         """Exibe um cabeçalho formatado"""
         TerminalUI.limpar_tela()
-        print(f"{TerminalUI.AZUL}{TerminalUI.BOLD}╔{"═" * (len(texto) + 2)}╗{TerminalUI.RESET}")
+        print(f"{TerminalUI.AZUL}{TerminalUI.BOLD}╔{'═' * (len(texto) + 2)}╗{TerminalUI.RESET}")
         print(f"{TerminalUI.AZUL}{TerminalUI.BOLD}║ {texto} ║{TerminalUI.RESET}")
-        print(f"{TerminalUI.AZUL}{TerminalUI.BOLD}╚{"═" * (len(texto) + 2)}╝{TerminalUI.RESET}")
+        print(f"{TerminalUI.AZUL}{TerminalUI.BOLD}╚{'═' * (len(texto) + 2)}╝{TerminalUI.RESET}")
 
     @staticmethod
     def prompt(texto: str) -> str:
@@ -82,29 +86,122 @@ def buscar_elemento(arvore):
         else:
             TerminalUI.erro(f"Valor {valor} não encontrado")
 
+# Árvores com mais nós que isto são desenhadas truncadas por padrão
+LIMITE_DESENHO = 63
+PROFUNDIDADE_PADRAO = 5
+NIVEIS_ACIMA = 2  # contexto acima do nó ao centralizar numa chave
+
 def mostrar_arvore(arvore, tipo_nome):
-    """Exibe a estrutura da árvore de forma mais estética"""
+    """Exibe a estrutura da árvore; árvores grandes saem truncadas"""
     TerminalUI.header(f"ESTRUTURA DA {tipo_nome}")
-    arvore.imprimir()
+    tamanho = arvore.obter_tamanho()
+    if tamanho <= LIMITE_DESENHO:
+        arvore.imprimir()
+    else:
+        print(f"A árvore tem {tamanho} nós; o desenho será truncado.")
+        resposta = TerminalUI.prompt("Centralizar em qual valor? (Enter = raiz): ").strip()
+        chave = None
+        if resposta:
+            try:
+                chave = int(resposta)
+            except ValueError:
+                TerminalUI.erro("Valor inválido; desenhando a partir da raiz")
+        resposta = TerminalUI.prompt(
+            f"Quantos níveis abaixo do topo? (Enter = {PROFUNDIDADE_PADRAO}, * = todos): ").strip()
+        if resposta == "*":
+            profundidade = None
+        elif resposta.isdigit():
+            profundidade = int(resposta)
+        else:
+            profundidade = PROFUNDIDADE_PADRAO
+        print()
+        arvore.imprimir(profundidade=profundidade, chave=chave, acima=NIVEIS_ACIMA)
     input(f"\n{TerminalUI.AMARELO}Pressione Enter para continuar...{TerminalUI.RESET}")
 
+FORMATOS_EXPORTACAO = {".dot": "exportar_dot", ".gv": "exportar_dot", ".json": "exportar_json"}
+
+def metodo_exportacao(caminho):
+    """Nome do método de exportação para a extensão de `caminho`"""
+    metodo = FORMATOS_EXPORTACAO.get(os.path.splitext(caminho)[1].lower())
+    if metodo is None:
+        raise ValueError(f"extensão não suportada: {caminho!r} (use .dot, .gv ou .json)")
+    return metodo
+
+def exportar(arvore, caminho):
+    """Grava a árvore em DOT (.dot/.gv) ou JSON (.json), pela extensão"""
+    metodo = getattr(arvore, metodo_exportacao(caminho), None)
+    if metodo is None:
+        raise ValueError(f"{type(arvore).__name__} não exporta para {caminho!r}")
+    metodo(caminho)
+
+def exportar_arvore(arvore):
+    """Lida com a exportação da árvore para um arquivo"""
+    caminho = TerminalUI.prompt("Arquivo de destino (.dot ou .json): ").strip()
+    try:
+        exportar(arvore, caminho)
+    except (ValueError, OSError) as erro:
+        TerminalUI.erro(str(erro))
+    else:
+        TerminalUI.sucesso(f"Árvore exportada para {caminho}")
+
+# Quantidade máxima de elementos listados na tela de informações
+LIMITE_ELEMENTOS = 100
+
+def mostrar_estatisticas(arvore):
+    """Exibe os contadores da instrumentação (veja `instrumentar`)"""
+    estatisticas = arvore.estatisticas()
+    print(f"- Altura: {estatisticas['altura']}")
+    if "motor" in estatisticas:
+        print(f"- Motor atual: {estatisticas['motor']} ({estatisticas['migracoes']} migrações)")
+    if not estatisticas["instrumentada"]:
+        return
+    print(f"- Operações medidas: {estatisticas['operacoes']}")
+    print(f"- Comparações por operação: {estatisticas['comparacoes_por_operacao']:.2f}")
+    print(f"- Caminho médio / máximo: {estatisticas['caminho_medio']:.2f} / {estatisticas['caminho_maximo']}")
+    print(f"- Rotações: {estatisticas['rotacoes']}")
+    if "rotacoes_simples" in estatisticas:
+        print(f"  (simples: {estatisticas['rotacoes_simples']}, duplas: {estatisticas['rotacoes_duplas']})")
+    if "recoloracoes" in estatisticas:
+        print(f"- Recolorações: {estatisticas['recoloracoes']}")
+        print(f"- Iterações da fixação: {estatisticas['iteracoes_fixacao']}")
+
 def mostrar_informacoes(arvore):
     """Exibe informações detalhadas sobre a árvore"""
     TerminalUI.header("INFORMAÇÕES DA ÁRVORE")
     tamanho = arvore.obter_tamanho()
     print(f"- Quantidade de nós: {tamanho}")
     print(f"- Árvore está vazia: {'Sim' if tamanho == 0 else 'Não'}")
+    mostrar_estatisticas(arvore)
     if tamanho > 0:
-        elementos = arvore.em_ordem()
-        print(f"- Elementos (em ordem): {elementos}")
+        print(f"- Menor elemento: {next(iter(arvore))}")
+        print(f"- Maior elemento: {next(reversed(arvore))}")
+        # Percorre só o necessário, sem materializar a lista completa
+        elementos = ", ".join(str(v) for v in islice(arvore, LIMITE_ELEMENTOS))
+        if tamanho > LIMITE_ELEMENTOS:
+            elementos += f", ... (+{tamanho - LIMITE_ELEMENTOS})"
+        print(f"- Elementos (em ordem): [{elementos}]")
     input(f"\n{TerminalUI.AMARELO}Pressione Enter para continuar...{TerminalUI.RESET}")
 
+# Opção do menu -> (classe, nome exibido)
+TIPOS_ARVORE = {
+    "1": (ArvoreAVL, "ÁRVORE AVL"),
+    "2": (ArvoreRubroNegra, "ÁRVORE RUBRO-NEGRA"),
+    "3": (ArvoreB, "ÁRVORE B"),
+}
+
+def criar_arvore(tipo):
+    """Cria uma árvore vazia do tipo escolhido, com a instrumentação ligada se houver"""
+    arvore = TIPOS_ARVORE[tipo][0]()
+    if hasattr(arvore, "instrumentar"):
+        arvore.instrumentar()
+    return arvore
+
 def limpar_arvore(arvore, tipo):
     """Recria a árvore, efetivamente limpando-a"""
     confirmacao = TerminalUI.prompt("Tem certeza que deseja limpar a árvore? (s/n): ").lower()
     if confirmacao == 's':
         TerminalUI.sucesso("Árvore limpa")
-        return ArvoreAVL() if tipo == "1" else ArvoreRubroNegra()
+        return criar_arvore(tipo)
     else:
         TerminalUI.erro("Operação cancelada")
         return arvore
@@ -114,16 +211,120 @@ def escolher_arvore():
     TerminalUI.header("IMPLEMENTAÇÃO DE ÁRVORES BALANCEADAS")
     print("1. Árvore AVL")
     print("2. Árvore Rubro-Negra")
+    print("3. Árvore B")
     
     while True:
-        tipo = TerminalUI.prompt("Escolha o tipo de árvore (1 ou 2): ")
-        if tipo in ["1", "2"]:
-            return (ArvoreAVL(), "ÁRVORE AVL") if tipo == "1" else (ArvoreRubroNegra(), "ÁRVORE RUBRO-NEGRA")
+        tipo = TerminalUI.prompt("Escolha o tipo de árvore (1 a 3): ")
+        if tipo in TIPOS_ARVORE:
+            return criar_arvore(tipo), TIPOS_ARVORE[tipo][1], tipo
         TerminalUI.erro("Opção inválida! Tente novamente")
 
+# --- Modo em lote ---
+LINHAS_POR_DESCARGA = 4096  # linhas de saída acumuladas antes de escrever
+VALORES_POR_BLOCO = 4096    # valores de um RANGE lidos por vez
+
+def executar_script(arvore, entrada, saida, erros=sys.stderr):
+    """Executa os comandos de `entrada`, um por linha, em memória constante.
+
+    Comandos: `I x` (inserir), `R x` (remover), `B x` (buscar; escreve 1
+    ou 0), `RANGE a b` (escreve os valores de [a, b] numa linha). Linhas
+    vazias e começadas por `#` são ignoradas; linhas inválidas são
+    relatadas em `erros` e puladas. A saída é acumulada e escrita em
+    blocos. Retorna um dicionário com as contagens por comando e de erros.
+    """
+    contagens = {"I": 0, "R": 0, "B": 0, "RANGE": 0, "erros": 0}
+    partes = []
+    inserir, remover, buscar = arvore.inserir, arvore.remover, arvore.buscar
+
+    def descarregar():
+        saida.write("".join(partes))
+        partes.clear()
+
+    for numero, linha in enumerate(entrada, 1):
+        campos = linha.split()
+        if not campos or campos[0].startswith("#"):
+            continue
+        comando = campos[0].upper()
+        try:
+            if comando == "I" and len(campos) == 2:
+                inserir(int(campos[1]))
+            elif comando == "R" and len(campos) == 2:
+                remover(int(campos[1]))
+            elif comando == "B" and len(campos) == 2:
+                partes.append("1\n" if buscar(int(campos[1])) is not None else "0\n")
+            elif comando == "RANGE" and len(campos) == 3:
+                valores = arvore.intervalo(int(campos[1]), int(campos[2]))
+                separador = ""
+                while True:
+                    bloco = list(islice(valores, VALORES_POR_BLOCO))
+                    if not bloco:
+                        break
+                    partes.append(separador + " ".join(map(str, bloco)))
+                    separador = " "
+                    if len(partes) >= LINHAS_POR_DESCARGA:
+                        descarregar()
+                partes.append("\n")
+            else:
+                raise ValueError
+        except ValueError:
+            contagens["erros"] += 1
+            erros.write(f"linha {numero}: comando inválido: {linha.strip()}\n")
+            continue
+        contagens[comando] += 1
+        if len(partes) >= LINHAS_POR_DESCARGA:
+            descarregar()
+    descarregar()
+    return contagens
+
+TIPOS_LOTE = {"avl": ArvoreAVL, "rn": ArvoreRubroNegra, "b": ArvoreB}
+
+def modo_lote(tipo, caminho, destino=None):
+    """Executa um script de comandos (ou a entrada padrão) e resume o tempo.
+
+    Com `destino`, exporta a árvore final (veja `exportar`).
+    """
+    arvore = TIPOS_LOTE[tipo]()
+    entrada = sys.stdin if caminho in (None, "-") else open(caminho, encoding="utf-8")
+    inicio = time.perf_counter()
+    try:
+        contagens = executar_script(arvore, entrada, sys.stdout)
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+    sys.stdout.flush()
+    decorrido = time.perf_counter() - inicio
+    if destino is not None:
+        exportar(arvore, destino)
+    operacoes = sum(contagens[c] for c in ("I", "R", "B", "RANGE"))
+    taxa = operacoes / decorrido if decorrido > 0 else 0.0
+    sys.stderr.write(
+        f"{operacoes} operações em {decorrido:.3f} s ({taxa:,.0f} ops/s); "
+        f"I={contagens['I']} R={contagens['R']} B={contagens['B']} "
+        f"RANGE={contagens['RANGE']} erros={contagens['erros']}; "
+        f"tamanho final {arvore.obter_tamanho()}, altura {arvore.altura()}\n")
+    return 1 if contagens["erros"] else 0
+
+def analisar_argumentos(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Árvores AVL, Rubro-Negra e B. Sem argumentos, abre o menu interativo.")
+    parser.add_argument("--tipo", choices=list(TIPOS_LOTE),
+                        help="executa em lote com este tipo de árvore")
+    parser.add_argument("--script", metavar="ARQUIVO",
+                        help="arquivo de comandos (I x, R x, B x, RANGE a b); '-' ou "
+                             "ausente lê da entrada padrão")
+    parser.add_argument("--exportar", metavar="ARQUIVO",
+                        help="no modo em lote, grava a árvore final em .dot/.gv ou .json")
+    argumentos = parser.parse_args(argv)
+    if argumentos.exportar is not None:
+        try:
+            metodo_exportacao(argumentos.exportar)
+        except ValueError as erro:
+            parser.error(str(erro))
+    return argumentos
+
 def main():
     """Função principal que gerencia o menu e a interação com o usuário"""
-    arvore, tipo_nome = escolher_arvore()
+    arvore, tipo_nome, tipo = escolher_arvore()
     
     # Mapeamento de opções para funções
     acoes = {
@@ -132,6 +333,7 @@ def main():
         "3": lambda: buscar_elemento(arvore),
         "4": lambda: mostrar_arvore(arvore, tipo_nome),
         "5": lambda: mostrar_informacoes(arvore),
+        "7": lambda: exportar_arvore(arvore),
     }
 
     while True:
@@ -142,6 +344,7 @@ def main():
         print("4. Mostrar árvore")
         print("5. Mostrar informações")
         print("6. Limpar árvore")
+        print("7. Exportar árvore (DOT/JSON)")
         print("0. Sair")
         
         opcao = TerminalUI.prompt("Escolha uma opção: ")
@@ -154,14 +357,17 @@ def main():
         if acao:
             acao()
         elif opcao == "6":
-            arvore = limpar_arvore(arvore, "1" if isinstance(arvore, ArvoreAVL) else "2")
+            arvore = limpar_arvore(arvore, tipo)
         else:
             TerminalUI.erro("Opção inválida!")
         
-        if opcao in ["1", "2", "3", "6"]:
+        if opcao in ["1", "2", "3", "6", "7"]:
             input(f"\n{TerminalUI.AMARELO}Pressione Enter para continuar...{TerminalUI.RESET}")
 
 if __name__ == "__main__":
+    argumentos = analisar_argumentos()
+    if argumentos.tipo or argumentos.script or argumentos.exportar:
+        sys.exit(modo_lote(argumentos.tipo or "avl", argumentos.script, argumentos.exportar))
     try:
         main()
     except KeyboardInterrupt:
@@ -0,0 +1,232 @@
+"""Servidor asyncio que expõe uma árvore AVL ou Rubro-Negra por TCP ou socket Unix.
+
+Um único processo guarda a árvore e atende muitas conexões; como tudo roda
+no laço de eventos, cada comando é atômico. O protocolo é de linhas, com os
+comandos do modo em lote do `main.py` e mais alguns:
+
+    I x / R x / B x       inserir, remover, buscar       -> =1 ou =0
+    IM x y ... / RM ...   inserir_muitos, remover_muitos -> =quantidade
+    BM x y ...            buscar_muitos                  -> =1011... (um dígito por valor)
+    RANGE a b             valores em [a, b]              -> linhas "+v v ..." e um "."
+    N / PING              tamanho / teste                -> =n / =PONG
+
+Respostas de erro começam com "-". Cada pedido recebe sua resposta na
+ordem de chegada, então o cliente pode mandar vários sem esperar
+(pipelining); as respostas dos pedidos lidos de uma vez saem numa única
+escrita. O RANGE é transmitido em blocos, cada um lido da árvore de uma
+vez a partir do último valor enviado: entre os blocos o servidor atende
+as outras conexões, e as mutações feitas nesse meio-tempo aparecem (ou
+não) nos blocos seguintes, sem invalidar a varredura.
+
+Uso: python servidor.py --tipo rn --porta 7070   (ou --unix /tmp/arvore.sock)
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import sys
+from itertools import islice
+
+from src.arvore_avl import ArvoreAVL
+from src.arvore_rn import ArvoreRubroNegra
+
+TIPOS = {"avl": ArvoreAVL, "rn": ArvoreRubroNegra}
+PORTA = 7070
+LEITURA = 1 << 16            # bytes lidos do socket por vez
+LIMITE_LINHA = 1 << 22       # linha sem fim maior que isto encerra a conexão
+VALORES_POR_BLOCO = 1024     # valores por linha "+" de um RANGE
+INVALIDO = "-comando inválido: ".encode()
+
+
+class ServidorArvore:
+    """Atende as conexões com uma árvore compartilhada"""
+
+    def __init__(self, arvore):
+        self.arvore = arvore
+        self.conexoes = 0
+        self.requisicoes = 0
+        self._servidor = None
+        self._escritores = {}  # conexões abertas -> tarefa que as atende
+        self._comandos = {
+            b"I": self._inserir, b"R": self._remover, b"B": self._buscar,
+            b"IM": self._inserir_muitos, b"RM": self._remover_muitos,
+            b"BM": self._buscar_muitos, b"N": self._tamanho, b"PING": self._ping,
+        }
+
+    async def iniciar(self, host="127.0.0.1", porta=PORTA, unix=None):
+        """Abre o socket (Unix, se `unix` for dado) e retorna o `asyncio.Server`"""
+        if unix is not None:
+            self._servidor = await asyncio.start_unix_server(self.atender, unix)
+        else:
+            self._servidor = await asyncio.start_server(self.atender, host, porta)
+        return self._servidor
+
+    async def fechar(self):
+        """Para de aceitar conexões e encerra as abertas"""
+        self._servidor.close()
+        for escritor in list(self._escritores):
+            escritor.close()
+        await asyncio.gather(*self._escritores.values(), return_exceptions=True)
+        await self._servidor.wait_closed()
+
+    async def atender(self, leitor, escritor):
+        self.conexoes += 1
+        self._escritores[escritor] = asyncio.current_task()
+        resto = b""
+        try:
+            while True:
+                dados = await leitor.read(LEITURA)
+                if not dados:
+                    break
+                linhas = (resto + dados).split(b"\n")
+                resto = linhas.pop()
+                if len(resto) > LIMITE_LINHA:
+                    escritor.write(b"-linha longa demais\n")
+                    break
+                respostas = []
+                for linha in linhas:
+                    campos = linha.split()
+                    if not campos:
+                        continue
+                    self.requisicoes += 1
+                    if campos[0].upper() == b"RANGE":
+                        # As respostas anteriores saem antes dos blocos
+                        escritor.write(b"".join(respostas))
+                        respostas.clear()
+                        await self._transmitir_intervalo(escritor, campos)
+                    else:
+                        respostas.append(self._executar(campos))
+                escritor.write(b"".join(respostas))
+                await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            del self._escritores[escritor]
+            escritor.close()
+            try:
+                await escritor.wait_closed()
+            except ConnectionError:
+                pass
+
+    def _executar(self, campos):
+        comando = self._comandos.get(campos[0].upper())
+        try:
+            if comando is None:
+                raise ValueError
+            return comando(campos[1:])
+        except (ValueError, TypeError):
+            return INVALIDO + b" ".join(campos)[:200] + b"\n"
+
+    # --- Comandos ---
+    @staticmethod
+    def _um(argumentos):
+        if len(argumentos) != 1:
+            raise ValueError
+        return int(argumentos[0])
+
+    def _inserir(self, argumentos):
+        valor = self._um(argumentos)
+        antes = self.arvore.obter_tamanho()
+        self.arvore.inserir(valor)
+        return b"=1\n" if self.arvore.obter_tamanho() != antes else b"=0\n"
+
+    def _remover(self, argumentos):
+        return b"=1\n" if self.arvore.remover(self._um(argumentos)) else b"=0\n"
+
+    def _buscar(self, argumentos):
+        return b"=1\n" if self.arvore.buscar(self._um(argumentos)) is not None else b"=0\n"
+
+    def _inserir_muitos(self, argumentos):
+        return b"=%d\n" % self.arvore.inserir_muitos([int(v) for v in argumentos])
+
+    def _remover_muitos(self, argumentos):
+        return b"=%d\n" % self.arvore.remover_muitos([int(v) for v in argumentos])
+
+    def _buscar_muitos(self, argumentos):
+        mascara = self.arvore.buscar_muitos([int(v) for v in argumentos])
+        return b"=" + bytes(48 + presente for presente in mascara) + b"\n"
+
+    def _tamanho(self, argumentos):
+        if argumentos:
+            raise ValueError
+        return b"=%d\n" % self.arvore.obter_tamanho()
+
+    def _ping(self, argumentos):
+        return b"=PONG\n"
+
+    async def _transmitir_intervalo(self, escritor, campos):
+        try:
+            if len(campos) != 3:
+                raise ValueError
+            lo, hi = int(campos[1]), int(campos[2])
+        except ValueError:
+            escritor.write(INVALIDO + b" ".join(campos)[:200] + b"\n")
+            return
+        ultimo = None
+        while True:
+            # Nenhum iterador atravessa o await: cada bloco recomeça do
+            # último valor enviado, que pode ter sido removido nesse meio-tempo
+            valores = self.arvore.iterar(desde=lo if ultimo is None else ultimo, ate=hi)
+            bloco = list(islice(valores, VALORES_POR_BLOCO + 1))
+            if ultimo is not None and bloco and not (ultimo < bloco[0]):
+                del bloco[0]
+            del bloco[VALORES_POR_BLOCO:]
+            if bloco:
+                escritor.write(b"+" + " ".join(map(str, bloco)).encode() + b"\n")
+                ultimo = bloco[-1]
+            if len(bloco) < VALORES_POR_BLOCO:
+                break
+            await escritor.drain()  # espera o cliente se o buffer encheu
+            await asyncio.sleep(0)  # e dá a vez às outras conexões
+        escritor.write(b".\n")
+
+
+def analisar_argumentos(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Serve uma árvore AVL ou Rubro-Negra por TCP ou socket Unix.")
+    parser.add_argument("--tipo", choices=list(TIPOS), default="rn")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=PORTA,
+                        help="porta TCP (0 escolhe uma livre)")
+    parser.add_argument("--unix", metavar="CAMINHO", help="usa um socket Unix em vez de TCP")
+    return parser.parse_args(argv)
+
+
+async def servir(argumentos):
+    servidor = ServidorArvore(TIPOS[argumentos.tipo]())
+    socket_servidor = await servidor.iniciar(argumentos.host, argumentos.porta, argumentos.unix)
+    if argumentos.unix is not None:
+        endereco = argumentos.unix
+    else:
+        host, porta = socket_servidor.sockets[0].getsockname()[:2]
+        endereco = f"{host}:{porta}"
+    # A primeira linha na saída de erro anuncia o endereço (útil com --porta 0)
+    sys.stderr.write(f"ouvindo em {endereco}\n")
+    sys.stderr.flush()
+    parar = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sinal, parar.set)
+        except (NotImplementedError, RuntimeError):  # Windows: só Ctrl+C
+            pass
+    try:
+        await parar.wait()
+    finally:
+        await servidor.fechar()
+        if argumentos.unix is not None and os.path.exists(argumentos.unix):
+            os.unlink(argumentos.unix)
+        sys.stderr.write(f"{servidor.requisicoes} requisições em {servidor.conexoes} conexões; "
+                         f"tamanho final {servidor.arvore.obter_tamanho()}\n")
+
+
+def main(argv=None):
+    try:
+        asyncio.run(servir(analisar_argumentos(argv)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,12 @@
 # Expose public modules if desired
 __all__ = [
     'arvore_rn',
+    'arvore_rn_compacta',
     'arvore_avl',
+    'arvore_b',
+    'arvore_intervalos',
     'interface_arvore',
+    'adaptativa',
+    'agregacao',
+    'cliente',
 ]
@@ -0,0 +1,187 @@
+"""Árvore adaptativa: troca entre AVL e Rubro-Negra conforme a carga observada.
+
+A AVL é mais baixa e busca um pouco mais rápido; a Rubro-Negra rebalanceia
+menos e insere e, sobretudo, remove mais rápido. A árvore adaptativa mede a
+mistura de operações por amostragem, estima o custo dela em cada motor com
+uma tabela de custos por operação e migra em O(n) (via `from_sorted`)
+quando o custo extra acumulado por ficar no motor atual passa do custo da
+migração — a regra do aluguel de esquis, que nunca gasta mais que o dobro
+da melhor escolha feita com antecedência.
+"""
+
+from . import instrumentacao
+from .arvore_avl import ArvoreAVL
+from .arvore_rn import ArvoreRubroNegra
+from .interface_arvore import InterfaceArvore
+
+# µs por (busca, inserção, remoção, elemento migrado), medidos com 10**5
+# chaves inteiras (melhor de 7 passadas). Só as razões importam.
+CUSTOS = {
+    ArvoreAVL: (1.40, 3.71, 3.55, 1.4),
+    ArvoreRubroNegra: (1.55, 3.61, 2.24, 1.4),
+}
+JANELA = 4096       # operações contadas em cada amostra
+INTERVALO = 1024    # escritas entre o fim de uma amostra e o início da próxima
+SUAVIZACAO = 0.5    # peso da amostra mais recente na média da mistura
+
+# Leituras ligadas direto aos métodos do motor atual (sem repasse)
+LEITURAS = (
+    "buscar", "em_ordem", "obter_tamanho", "piso", "teto", "sucessor", "antecessor",
+    "k_esimo", "posicao", "mediana", "percentil", "contar_intervalo", "buscar_muitos",
+    "altura", "exportar_dot", "exportar_json",
+)
+
+
+class ArvoreAdaptativa(InterfaceArvore):
+    """Conjunto ordenado que escolhe entre AVL e Rubro-Negra pela carga.
+
+    As leituras de LEITURAS são os métodos ligados do motor atual, postos
+    na instância a cada troca de motor: chamá-las não passa por nenhum
+    código da árvore adaptativa. Por isso não guarde `arvore.buscar` (ou
+    outra leitura) numa variável entre operações, pois depois de uma
+    migração ele continuaria lendo o motor antigo.
+
+    A mistura é medida por amostras: depois de INTERVALO escritas, as
+    próximas `janela` operações são contadas (as buscas por um invólucro
+    posto na instância só durante a amostra) e as inserções e remoções da
+    amostra são apuradas em lote, pela variação do tamanho e do contador
+    de modificações do motor. Escritas que não mudam a árvore contam como
+    buscas, que é o que custam. Sem escritas não há nova amostra, e o
+    motor fica como está. A migração espera que não haja iteradores
+    abertos (de `iterar`); o modo mapa não é suportado.
+    """
+
+    def __init__(self, motor=ArvoreRubroNegra, janela=JANELA, intervalo=INTERVALO,
+                 custos=None):
+        self._custos = CUSTOS if custos is None else custos
+        self._janela = janela
+        self._intervalo = intervalo
+        self._amostrando = False
+        self._restantes = intervalo  # escritas até a amostra, ou operações até o fim dela
+        self._inicio = (0, 0)  # (modificações, tamanho) do motor no início da amostra
+        self._mistura = None
+        self._excedente = 0.0  # µs a mais pagos por não estar no melhor motor
+        self._iteradores = 0
+        self.migracoes = 0
+        self._trocar_motor(motor())
+
+    @classmethod
+    def from_sorted(cls, valores, motor=ArvoreRubroNegra, **opcoes):
+        arvore = cls(motor, **opcoes)
+        arvore._trocar_motor(motor.from_sorted(valores))
+        return arvore
+
+    @property
+    def motor(self):
+        """Classe do motor em uso"""
+        return type(self._arvore)
+
+    def _trocar_motor(self, arvore):
+        self._arvore = arvore
+        for nome in LEITURAS:
+            setattr(self, nome, getattr(arvore, nome))
+
+    # --- Amostragem e decisão ---
+    def _passo(self):
+        """Fim do intervalo entre amostras ou fim de uma amostra"""
+        if not self._amostrando:
+            self._amostrando = True
+            self._restantes = self._janela
+            self._inicio = (self._arvore._modificacoes, self._arvore.obter_tamanho())
+            buscar = self._arvore.buscar
+
+            def contando(valor):
+                self._restantes -= 1
+                if not self._restantes:
+                    self._passo()
+                return buscar(valor)
+            self.buscar = contando
+            return
+        self._amostrando = False
+        self._restantes = self._intervalo
+        self.buscar = self._arvore.buscar
+        self._avaliar()
+
+    def _avaliar(self):
+        """Atualiza a mistura com a amostra que terminou e decide se vale migrar"""
+        janela = self._janela
+        modificacoes = self._arvore._modificacoes - self._inicio[0]
+        saldo = self._arvore.obter_tamanho() - self._inicio[1]
+        insercoes = (modificacoes + saldo) // 2
+        remocoes = (modificacoes - saldo) // 2
+        nova = ((janela - insercoes - remocoes) / janela, insercoes / janela, remocoes / janela)
+        if self._mistura is None:
+            self._mistura = nova
+        else:
+            self._mistura = tuple(SUAVIZACAO * n + (1 - SUAVIZACAO) * m
+                                  for n, m in zip(nova, self._mistura))
+        custos = {motor: sum(f * c for f, c in zip(self._mistura, coeficientes))
+                  for motor, coeficientes in self._custos.items()}
+        atual = type(self._arvore)
+        melhor = min(custos, key=custos.get)
+        if melhor is atual:
+            self._excedente = 0.0
+            return
+        # A amostra representa também as operações do intervalo anterior,
+        # estimadas pela fração de escritas observada
+        escritas = self._mistura[1] + self._mistura[2]
+        operacoes = janela + (self._intervalo / escritas if escritas else 0)
+        self._excedente += (custos[atual] - custos[melhor]) * operacoes
+        migracao = self._custos[melhor][3] * self._arvore.obter_tamanho()
+        if self._excedente >= migracao and not self._iteradores:
+            self.migrar(melhor)
+
+    def migrar(self, motor):
+        """Reconstrói os valores no motor dado, em O(n)"""
+        if self._iteradores:
+            raise RuntimeError("migração com iteradores abertos")
+        self._trocar_motor(motor.from_sorted(self._arvore))
+        self._excedente = 0.0
+        self.migracoes += 1
+        if self._amostrando:  # a amostra em curso recomeça no motor novo
+            self._amostrando = False
+            self._passo()
+
+    # --- Protocolo ---
+    def inserir(self, valor):
+        self._arvore.inserir(valor)
+        self._restantes -= 1
+        if not self._restantes:
+            self._passo()
+
+    def remover(self, valor):
+        removido = self._arvore.remover(valor)
+        self._restantes -= 1
+        if not self._restantes:
+            self._passo()
+        return removido
+
+    # Só para satisfazer o protocolo: as instâncias usam as de LEITURAS
+    def buscar(self, valor):
+        return self._arvore.buscar(valor)
+
+    def obter_tamanho(self):
+        return self._arvore.obter_tamanho()
+
+    def iterar(self, desde=None, ate=None, reverso=False):
+        return self._percorrer(desde, ate, reverso)
+
+    def _percorrer(self, desde, ate, reverso):
+        # O motor é lido só no primeiro next(), com o iterador já contado
+        self._iteradores += 1
+        try:
+            yield from self._arvore.iterar(desde, ate, reverso)
+        finally:
+            self._iteradores -= 1
+
+    def imprimir(self, profundidade=None, chave=None, acima=0, saida=None):
+        self._arvore.imprimir(profundidade=profundidade, chave=chave, acima=acima, saida=saida)
+
+    def estatisticas(self):
+        """Tamanho, altura, motor atual, migrações e a mistura estimada"""
+        resultado = instrumentacao.estatisticas(None, self.obter_tamanho(), self._arvore.altura())
+        resultado["motor"] = type(self._arvore).__name__
+        resultado["migracoes"] = self.migracoes
+        if self._mistura is not None:
+            resultado["mistura"] = dict(zip(("buscas", "insercoes", "remocoes"), self._mistura))
+        return resultado
@@ -0,0 +1,344 @@
+"""Agregados de intervalo em O(log n) com um monoide plugável.
+
+Um `Monoide` é uma função associativa `combinar`, seu elemento neutro e a
+`medida` de cada nó (por padrão o dado do modo mapa, ou a própria chave
+quando não há dado). Cada nó das árvores agregadas guarda a combinação
+das medidas da sua sub-árvore, em ordem; `combinar` não precisa ser
+comutativa. As rotações, o caminho de atualização das alturas da AVL, as
+correções da Rubro-Negra, `put` e as reconstruções mantêm o campo, e
+`agregado(lo, hi)` combina O(log n) sub-árvores inteiras.
+"""
+
+import math
+import operator
+
+from . import diario
+from .arvore_avl import ArvoreAVL, ArvoreAVL_Principal, NoAVL
+from .arvore_rn import ArvoreRubroNegra, NoRubroNegro
+
+
+def _medida_padrao(valor, dado):
+    return valor if dado is None else dado
+
+
+class Monoide:
+    """Função associativa com elemento neutro e a medida de cada nó"""
+
+    __slots__ = ("combinar", "identidade", "medir")
+
+    def __init__(self, combinar, identidade, medir=_medida_padrao):
+        self.combinar = combinar      # combinar(esquerda, direita), associativa
+        self.identidade = identidade  # combinar(identidade, x) == x
+        self.medir = medir            # medir(valor, dado) -> elemento do monoide
+
+
+SOMA = Monoide(operator.add, 0)
+MINIMO = Monoide(min, math.inf)
+MAXIMO = Monoide(max, -math.inf)
+CONTAGEM = Monoide(operator.add, 0, medir=lambda valor, dado: 1)
+
+
+def _refazer(monoide, no, nil):
+    """Recalcula o agregado de `no` a partir dos filhos (que já devem estar certos)"""
+    agregado = monoide.medir(no.valor, no.dado)
+    if no.esquerda is not nil:
+        agregado = monoide.combinar(no.esquerda.agregado, agregado)
+    if no.direita is not nil:
+        agregado = monoide.combinar(agregado, no.direita.agregado)
+    no.agregado = agregado
+
+
+def _refazer_subindo(monoide, no, nil):
+    """Recalcula o agregado de `no` e de todos os seus ancestrais (via `pai`)"""
+    medir = monoide.medir
+    combinar = monoide.combinar
+    while no is not nil:
+        agregado = medir(no.valor, no.dado)
+        if no.esquerda is not nil:
+            agregado = combinar(no.esquerda.agregado, agregado)
+        if no.direita is not nil:
+            agregado = combinar(agregado, no.direita.agregado)
+        no.agregado = agregado
+        no = no.pai
+
+
+def _refazer_caminho(monoide, caminho):
+    """Recalcula os agregados de um caminho da raiz para baixo (AVL, sem `pai`)"""
+    medir = monoide.medir
+    combinar = monoide.combinar
+    for no in reversed(caminho):
+        agregado = medir(no.valor, no.dado)
+        if no.esquerda is not None:
+            agregado = combinar(no.esquerda.agregado, agregado)
+        if no.direita is not None:
+            agregado = combinar(agregado, no.direita.agregado)
+        no.agregado = agregado
+
+
+def _refazer_todos(monoide, raiz, nil):
+    """Recalcula os agregados da árvore inteira de baixo para cima, em O(n)"""
+    medir = monoide.medir
+    combinar = monoide.combinar
+
+    def fechar(no):
+        agregado = medir(no.valor, no.dado)
+        if no.esquerda is not nil:
+            agregado = combinar(fechar(no.esquerda), agregado)
+        if no.direita is not nil:
+            agregado = combinar(agregado, fechar(no.direita))
+        no.agregado = agregado
+        return agregado
+
+    if raiz is not nil:
+        fechar(raiz)
+
+
+class _Agregacao:
+    """Mistura com a consulta e a parte comum às duas árvores agregadas.
+
+    Requer da árvore `_raiz_e_nulo()` -> (raiz, sentinela das folhas) e
+    `_refazer_caminho(chave)`, que recalcula o agregado do nó da chave e
+    de todos os seus ancestrais.
+    """
+
+    monoide = SOMA  # padrão da classe; `carregar` e `recuperar` usam este
+
+    def __init__(self, key=None, monoide=None):
+        if monoide is not None:
+            self.monoide = monoide
+        super().__init__(key=key)
+
+    @classmethod
+    def from_sorted(cls, valores, monoide=None):
+        arvore = cls(monoide=monoide)
+        arvore._construir(valores)
+        return arvore
+
+    def _de_raiz(self, raiz):
+        # split e a álgebra de conjuntos devolvem árvores com o mesmo monoide
+        arvore = type(self)(key=self._funcao_chave, monoide=self.monoide)
+        arvore._definir_raiz(raiz)
+        return arvore
+
+    def agregado(self, lo=None, hi=None):
+        """Combina, em ordem, as medidas dos valores em [lo, hi] em O(log n).
+
+        Sem `lo` (ou `hi`) o intervalo não tem limite daquele lado; um
+        intervalo vazio resulta na identidade do monoide.
+        """
+        monoide = self.monoide
+        combinar = monoide.combinar
+        medir = monoide.medir
+        no, nil = self._raiz_e_nulo()
+        # Desce até o primeiro nó dentro do intervalo: os dois limites se
+        # separam ali, e cada lado desce por um único caminho
+        while no is not nil:
+            if hi is not None and hi < no.valor:
+                no = no.esquerda
+            elif lo is not None and no.valor < lo:
+                no = no.direita
+            else:
+                break
+        else:
+            return monoide.identidade
+        resultado = medir(no.valor, no.dado)
+        # Lado esquerdo: cada nó >= lo entra com a sub-árvore direita
+        x = no.esquerda
+        if lo is None:
+            if x is not nil:
+                resultado = combinar(x.agregado, resultado)
+        else:
+            while x is not nil:
+                if x.valor < lo:
+                    x = x.direita
+                    continue
+                parte = medir(x.valor, x.dado)
+                if x.direita is not nil:
+                    parte = combinar(parte, x.direita.agregado)
+                resultado = combinar(parte, resultado)
+                x = x.esquerda
+        # Lado direito, espelhado: cada nó <= hi entra com a sub-árvore esquerda
+        x = no.direita
+        if hi is None:
+            if x is not nil:
+                resultado = combinar(resultado, x.agregado)
+        else:
+            while x is not nil:
+                if hi < x.valor:
+                    x = x.esquerda
+                    continue
+                parte = medir(x.valor, x.dado)
+                if x.esquerda is not nil:
+                    parte = combinar(x.esquerda.agregado, parte)
+                resultado = combinar(resultado, parte)
+                x = x.direita
+        return resultado
+
+    def put(self, chave, dado):
+        if self._funcao_chave is not None:
+            chave = self._funcao_chave(chave)
+        # Uma chave nova já nasce com o dado, antes dos agregados acima dela
+        # serem refeitos; numa chave existente o dado muda a medida do nó
+        no, inserido = self._inserir_no(chave, dado)
+        if not inserido:
+            no.dado = dado
+            self._refazer_caminho(chave)
+        if self._diario is not None:
+            self._diario.registrar(diario.PUT, (chave, dado))
+
+    def estatisticas(self):
+        resultado = super().estatisticas()
+        resultado["agregado"] = self.agregado()
+        return resultado
+
+
+# --- AVL ---
+class NoAVLAgregado(NoAVL):
+    """Nó AVL com o agregado da sua sub-árvore"""
+
+    __slots__ = ("agregado",)
+
+
+class _MotorAVLAgregado(ArvoreAVL_Principal):
+    """Motor AVL que mantém os agregados dos nós"""
+
+    def __init__(self, monoide):
+        super().__init__()
+        self.monoide = monoide
+        self._No = self._novo_no
+
+    def _novo_no(self, valor, dado=None):
+        no = NoAVLAgregado(valor, dado)
+        no.agregado = self.monoide.medir(valor, dado)
+        return no
+
+    def rotacao_direita(self, no_desbalanceado):
+        novo_pai = super().rotacao_direita(no_desbalanceado)
+        if novo_pai is not no_desbalanceado:
+            novo_pai.agregado = no_desbalanceado.agregado  # assume a sub-árvore inteira
+            _refazer(self.monoide, no_desbalanceado, None)
+        return novo_pai
+
+    def rotacao_esquerda(self, no_desbalanceado):
+        novo_pai = super().rotacao_esquerda(no_desbalanceado)
+        if novo_pai is not no_desbalanceado:
+            novo_pai.agregado = no_desbalanceado.agregado
+            _refazer(self.monoide, no_desbalanceado, None)
+        return novo_pai
+
+    def _retracar(self, caminho, raiz):
+        # O retraçado para quando a altura deixa de mudar, mas o agregado
+        # muda até a raiz: o caminho inteiro é refeito antes das rotações
+        _refazer_caminho(self.monoide, caminho)
+        return super()._retracar(caminho, raiz)
+
+    def _atualizar(self, no):
+        # Usado por juntar e dividir, que religam sub-árvores inteiras
+        super()._atualizar(no)
+        _refazer(self.monoide, no, None)
+
+
+class ArvoreAVLAgregada(_Agregacao, ArvoreAVL):
+    """AVL em que cada nó guarda o agregado da sua sub-árvore (veja `agregado`)"""
+
+    def __init__(self, key=None, monoide=None):
+        super().__init__(key=key, monoide=monoide)
+        self._avl = _MotorAVLAgregado(self.monoide)
+
+    def _raiz_e_nulo(self):
+        return self.root, None
+
+    def _refazer_caminho(self, chave):
+        caminho = []
+        no = self.root
+        while no is not None:
+            caminho.append(no)
+            if chave < no.valor:
+                no = no.esquerda
+            elif no.valor < chave:
+                no = no.direita
+            else:
+                break
+        _refazer_caminho(self.monoide, caminho)
+
+    def _montar(self, primeiro, n):
+        super()._montar(primeiro, n)
+        _refazer_todos(self.monoide, self.root, None)
+
+    def _restaurar(self, chaves, alturas, dados):
+        super()._restaurar(chaves, alturas, dados)
+        _refazer_todos(self.monoide, self.root, None)
+
+
+# --- Rubro-Negra ---
+class NoRubroNegroAgregado(NoRubroNegro):
+    """Nó Rubro-Negro com o agregado da sua sub-árvore"""
+
+    __slots__ = ("agregado",)
+
+    def __init__(self, valor=None, cor='PRETO', esquerda=None, direita=None, pai=None, tamanho=1, dado=None):
+        super().__init__(valor, cor, esquerda, direita, pai, tamanho, dado)
+        self.agregado = None  # calculado pela árvore antes do primeiro uso
+
+
+class ArvoreRubroNegraAgregada(_Agregacao, ArvoreRubroNegra):
+    """Rubro-Negra em que cada nó guarda o agregado da sua sub-árvore (veja `agregado`)"""
+
+    _No = NoRubroNegroAgregado
+
+    def _raiz_e_nulo(self):
+        return self.raiz, self.NIL
+
+    def _refazer_caminho(self, chave):
+        _refazer_subindo(self.monoide, self._buscar_no(self.raiz, chave), self.NIL)
+
+    def rotacao_esquerda(self, no):
+        y = no.direita
+        super().rotacao_esquerda(no)
+        y.agregado = no.agregado
+        _refazer(self.monoide, no, self.NIL)
+
+    def rotacao_direita(self, y):
+        x = y.esquerda
+        super().rotacao_direita(y)
+        x.agregado = y.agregado
+        _refazer(self.monoide, y, self.NIL)
+
+    def _fixar_insercao(self, z):
+        # z é um nó novo ou, no join, um nó recém-pendurado com sub-árvores;
+        # o caminho até a raiz é refeito antes das rotações da correção
+        _refazer_subindo(self.monoide, z, self.NIL)
+        return super()._fixar_insercao(z)
+
+    def _juntar(self, esq, no, dir, be, bd):
+        resultado = super()._juntar(esq, no, dir, be, bd)
+        if be == bd:  # `no` virou a raiz sem passar pela correção
+            _refazer(self.monoide, no, self.NIL)
+        return resultado
+
+    def _remover_no(self, z):
+        # O caminho a refazer começa no pai do nó que sai fisicamente: z
+        # (até um filho) ou o sucessor, que ocupa o lugar de z
+        nil = self.NIL
+        if z.esquerda is nil or z.direita is nil:
+            inicio, cor = z.pai, z.cor
+        else:
+            y = self._minimo(z.direita)
+            inicio, cor = (y if y.pai is z else y.pai), y.cor
+        super()._remover_no(z)
+        if cor != 'PRETO':  # sem correção, ninguém refez o caminho
+            _refazer_subindo(self.monoide, inicio, nil)
+
+    def _fixar_remocao(self, x, pai):
+        # `pai` é o início do caminho de `_remover_no`; as rotações da
+        # correção precisam dos agregados já certos
+        _refazer_subindo(self.monoide, pai, self.NIL)
+        super()._fixar_remocao(x, pai)
+
+    def _montar(self, primeiro, n):
+        super()._montar(primeiro, n)
+        _refazer_todos(self.monoide, self.raiz, self.NIL)
+
+    def _restaurar(self, chaves, forma, dados):
+        super()._restaurar(chaves, forma, dados)
+        _refazer_todos(self.monoide, self.raiz, self.NIL)
@@ -1,18 +1,53 @@
+from itertools import repeat
+from operator import attrgetter
+
+from .construcao import encadear_ordenados, gc_pausado
+from . import cache, diario, instrumentacao, visualizacao
+from .arvore_binaria import ArvoreBinaria
+from .interface_arvore import InterfaceArvore
+from .multiconjunto import Multiconjunto
+from .persistencia import ARVORE_AVL, abrir_snapshot, salvar_snapshot
+
+
 class NoAVL:
-    """Nó da árvore AVL com valor, altura e referências"""
-    
-    def __init__(self, valor):
+    """Nó da árvore AVL com valor, dado, altura, tamanho e referências"""
+
+    __slots__ = ("valor", "dado", "esquerda", "direita", "altura", "tamanho")
+
+    def __init__(self, valor, dado=None):
         self.valor = valor
+        self.dado = dado      # Carga associada à chave (modo mapa)
         self.esquerda = None  # Referência ao filho esquerdo
         self.direita = None   # Referência ao filho direito
         self.altura = 1       # Altura do nó (para balanceamento)
+        self.tamanho = 1      # Quantidade de nós da sub-árvore
+
+
+# Acesso aos nós para o módulo de visualização
+_filhos = attrgetter("esquerda", "direita")
+_valor = attrgetter("valor")
+_tamanho_no = attrgetter("tamanho")
+
+
+def _rotulo(no):
+    return str(no.valor)
+
+
+def _campos(no):
+    campos = {"altura": no.altura}
+    if no.dado is not None:
+        campos["dado"] = no.dado
+    return campos
 
 class ArvoreAVL_Principal:
     """Implementação de árvore AVL com balanceamento automático"""
 
+    _No = NoAVL  # fábrica de nós `_No(valor, dado=None)`; as árvores aumentadas a trocam
+
     def __init__(self):
         self.raiz = None
-        
+        self._ao_copiar = None  # chamado com o valor movido por `_remover` (veja `cache`)
+
     def altura(self, no):
         """Retorna a altura do nó ou 0 se for None"""
         return 0 if no is None else no.altura
@@ -34,15 +69,17 @@ class ArvoreAVL_Principal:
         novo_pai.direita = no_desbalanceado
         no_desbalanceado.esquerda = subarvore_movida
 
-        # Atualiza alturas
-        no_desbalanceado.altura = 1 + max(
-            self.altura(no_desbalanceado.esquerda),
-            self.altura(no_desbalanceado.direita)
-        )
-        novo_pai.altura = 1 + max(
-            self.altura(novo_pai.esquerda),
-            self.altura(novo_pai.direita)
-        )
+        # Atualiza alturas e tamanhos (no_desbalanceado agora é o filho direito)
+        outro = no_desbalanceado.direita
+        he, te = (subarvore_movida.altura, subarvore_movida.tamanho) if subarvore_movida is not None else (0, 0)
+        hd, td = (outro.altura, outro.tamanho) if outro is not None else (0, 0)
+        novo_pai.tamanho = no_desbalanceado.tamanho
+        no_desbalanceado.altura = 1 + (he if he > hd else hd)
+        no_desbalanceado.tamanho = 1 + te + td
+        outro = novo_pai.esquerda
+        he = outro.altura if outro is not None else 0
+        hd = no_desbalanceado.altura
+        novo_pai.altura = 1 + (he if he > hd else hd)
 
         return novo_pai
 
@@ -57,65 +94,126 @@ class ArvoreAVL_Principal:
         novo_pai.esquerda = no_desbalanceado
         no_desbalanceado.direita = subarvore_movida
 
-        # Atualiza alturas
-        no_desbalanceado.altura = 1 + max(
-            self.altura(no_desbalanceado.esquerda),
-            self.altura(no_desbalanceado.direita)
-        )
-        novo_pai.altura = 1 + max(
-            self.altura(novo_pai.esquerda),
-            self.altura(novo_pai.direita)
-        )
+        # Atualiza alturas e tamanhos (no_desbalanceado agora é o filho esquerdo)
+        outro = no_desbalanceado.esquerda
+        he, te = (outro.altura, outro.tamanho) if outro is not None else (0, 0)
+        hd, td = (subarvore_movida.altura, subarvore_movida.tamanho) if subarvore_movida is not None else (0, 0)
+        novo_pai.tamanho = no_desbalanceado.tamanho
+        no_desbalanceado.altura = 1 + (he if he > hd else hd)
+        no_desbalanceado.tamanho = 1 + te + td
+        he = no_desbalanceado.altura
+        outro = novo_pai.direita
+        hd = outro.altura if outro is not None else 0
+        novo_pai.altura = 1 + (he if he > hd else hd)
 
         return novo_pai
 
-    # Interface: inserir(raiz, valor) -> retorna (sub)raiz
-    def inserir(self, raiz, valor):
-        if raiz is None:
-            return NoAVL(valor)
-        if valor < raiz.valor:
-            raiz.esquerda = self.inserir(raiz.esquerda, valor)
-        elif valor > raiz.valor:
-            raiz.direita = self.inserir(raiz.direita, valor)
-        else:
-            return raiz
+    def _rebalancear(self, no):
+        """Atualiza a altura do nó e aplica a rotação necessária.
+
+        Supõe que as sub-árvores do nó já estão balanceadas e com alturas
+        corretas. Retorna a nova raiz da sub-árvore.
+        """
+        esq = no.esquerda
+        dir = no.direita
+        he = esq.altura if esq is not None else 0
+        hd = dir.altura if dir is not None else 0
+        if he - hd > 1:
+            ee = esq.esquerda
+            ed = esq.direita
+            # LR: filho esquerdo pende para a direita
+            if (ee.altura if ee is not None else 0) < (ed.altura if ed is not None else 0):
+                no.esquerda = self.rotacao_esquerda(esq)
+            # LL
+            return self.rotacao_direita(no)
+        if hd - he > 1:
+            de = dir.esquerda
+            dd = dir.direita
+            # RL: filho direito pende para a esquerda
+            if (dd.altura if dd is not None else 0) < (de.altura if de is not None else 0):
+                no.direita = self.rotacao_direita(dir)
+            # RR
+            return self.rotacao_esquerda(no)
+        no.altura = 1 + (he if he > hd else hd)
+        return no
 
-        raiz.altura = 1 + max(self.altura(raiz.esquerda), self.altura(raiz.direita))
-        fb = self.fator_balanceamento(raiz)
-
-        # LL
-        if fb > 1 and raiz.esquerda is not None and valor < raiz.esquerda.valor:
-            return self.rotacao_direita(raiz)
-        # RR
-        if fb < -1 and raiz.direita is not None and valor > raiz.direita.valor:
-            return self.rotacao_esquerda(raiz)
-        # LR
-        if fb > 1 and raiz.esquerda is not None and valor > raiz.esquerda.valor:
-            raiz.esquerda = self.rotacao_esquerda(raiz.esquerda)
-            return self.rotacao_direita(raiz)
-        # RL
-        if fb < -1 and raiz.direita is not None and valor < raiz.direita.valor:
-            raiz.direita = self.rotacao_direita(raiz.direita)
-            return self.rotacao_esquerda(raiz)
+    def _retracar(self, caminho, raiz):
+        """Sobe pelo caminho rebalanceando até a altura deixar de mudar.
 
+        `caminho` contém os nós da raiz até o pai do ponto alterado.
+        Retorna a (possivelmente nova) raiz da árvore.
+        """
+        i = len(caminho) - 1
+        while i >= 0:
+            no = caminho[i]
+            altura_antiga = no.altura
+            sub = self._rebalancear(no)
+            if sub is not no:
+                if i == 0:
+                    raiz = sub
+                else:
+                    pai = caminho[i - 1]
+                    if pai.esquerda is no:
+                        pai.esquerda = sub
+                    else:
+                        pai.direita = sub
+            if sub.altura == altura_antiga:
+                break
+            i -= 1
         return raiz
 
-    def buscar(self, raiz, chave):
+    def _inserir(self, raiz, valor, dado=None):
+        """Insere sem recursão; retorna (nova raiz, nó com o valor, se foi inserido).
+
+        Faz uma única comparação (`<`) por nível: o último nó em que a descida
+        foi à direita é o único candidato a igual e é conferido uma vez no fim.
+        """
         if raiz is None:
-            return None
-        if chave == raiz.valor:
-            return raiz
-        if chave < raiz.valor:
-            return self.buscar(raiz.esquerda, chave)
-        return self.buscar(raiz.direita, chave)
+            novo = self._No(valor, dado)
+            return novo, novo, True
+        caminho = []
+        candidato = None
+        no = raiz
+        while no is not None:
+            caminho.append(no)
+            if valor < no.valor:
+                no = no.esquerda
+            else:
+                candidato = no
+                no = no.direita
+        if candidato is not None and not (candidato.valor < valor):
+            return raiz, candidato, False
+        novo = self._No(valor, dado)
+        pai = caminho[-1]
+        if pai is candidato:  # a última descida foi à direita
+            pai.direita = novo
+        else:
+            pai.esquerda = novo
+        for no in caminho:
+            no.tamanho += 1
+        return self._retracar(caminho, raiz), novo, True
+
+    # Interface: inserir(raiz, valor) -> retorna (sub)raiz
+    def inserir(self, raiz, valor):
+        return self._inserir(raiz, valor)[0]
+
+    def buscar(self, raiz, chave):
+        candidato = None
+        no = raiz
+        while no is not None:
+            if chave < no.valor:
+                no = no.esquerda
+            else:
+                candidato = no
+                no = no.direita
+        if candidato is not None and not (candidato.valor < chave):
+            return candidato
+        return None
 
     def mostrar_arvore(self, no, prefixo="", is_esq=True):
-        if no is not None:
-            print(prefixo + ("└── " if is_esq else "┌── ") + str(no.valor))
-            if no.esquerda is not None or no.direita is not None:
-                novo_prefixo = prefixo + ("    " if is_esq else "│   ")
-                self.mostrar_arvore(no.direita, novo_prefixo, False)
-                self.mostrar_arvore(no.esquerda, novo_prefixo, True)
+        """Desenha a sub-árvore de `no` na saída padrão (sem recursão)"""
+        visualizacao.escrever(visualizacao.linhas(no, None, _filhos, _rotulo,
+                                                  prefixo=prefixo, is_esq=is_esq))
 
     def minimo_no(self, nodo):
         atual = nodo
@@ -123,85 +221,844 @@ class ArvoreAVL_Principal:
             atual = atual.esquerda
         return atual
 
+    def maximo_no(self, nodo):
+        atual = nodo
+        while atual is not None and atual.direita is not None:
+            atual = atual.direita
+        return atual
+
+    def _remover(self, raiz, valor):
+        """Remove sem recursão; retorna (nova raiz, se foi removido, dado removido).
+
+        Como em `_inserir`, desce com uma comparação por nível até uma folha.
+        Depois do nó igual a descida vai uma vez à direita e então só à
+        esquerda, de modo que o fim do caminho já é o sucessor dele.
+        """
+        caminho = []
+        alvo = None
+        i_alvo = 0
+        no = raiz
+        while no is not None:
+            caminho.append(no)
+            if valor < no.valor:
+                no = no.esquerda
+            else:
+                alvo = no
+                i_alvo = len(caminho) - 1
+                no = no.direita
+        if alvo is None or alvo.valor < valor:
+            return raiz, False, None
+        dado = alvo.dado
+
+        if alvo.esquerda is not None and alvo.direita is not None:
+            # nó com 2 filhos: copia o sucessor (mínimo da direita) e remove-o
+            no = caminho.pop()
+            alvo.valor = no.valor
+            alvo.dado = no.dado
+            if self._ao_copiar is not None:
+                self._ao_copiar(no.valor)  # o nó antigo do sucessor sai da árvore
+        else:
+            del caminho[i_alvo:]
+            no = alvo
+
+        # nó com 0 ou 1 filho
+        filho = no.esquerda if no.esquerda is not None else no.direita
+        if not caminho:
+            return filho, True, dado
+        for anterior in caminho:
+            anterior.tamanho -= 1
+        pai = caminho[-1]
+        if pai.esquerda is no:
+            pai.esquerda = filho
+        else:
+            pai.direita = filho
+        return self._retracar(caminho, raiz), True, dado
+
     def remover(self, raiz, valor):
-        if raiz is None:
-            return None
+        return self._remover(raiz, valor)[0]
+
+    # --- Junção e divisão (base das operações de conjunto) ---
+    def _atualizar(self, no):
+        """Recalcula altura e tamanho do nó a partir dos filhos"""
+        esq = no.esquerda
+        dir = no.direita
+        he, te = (esq.altura, esq.tamanho) if esq is not None else (0, 0)
+        hd, td = (dir.altura, dir.tamanho) if dir is not None else (0, 0)
+        no.altura = 1 + (he if he > hd else hd)
+        no.tamanho = 1 + te + td
 
-        if valor < raiz.valor:
-            raiz.esquerda = self.remover(raiz.esquerda, valor)
-        elif valor > raiz.valor:
-            raiz.direita = self.remover(raiz.direita, valor)
+    def juntar(self, esq, no, dir):
+        """Une as árvores esq < no < dir; retorna a nova raiz.
+
+        Desce pela espinha da árvore mais alta até uma sub-árvore com altura
+        compatível com a outra, pendura `no` ali e rebalanceia de volta.
+        Custo O(|altura(esq) - altura(dir)| + 1).
+        """
+        he = esq.altura if esq is not None else 0
+        hd = dir.altura if dir is not None else 0
+        if he > hd + 1:
+            caminho = []
+            c = esq
+            while (c.altura if c is not None else 0) > hd + 1:
+                caminho.append(c)
+                c = c.direita
+            no.esquerda = c
+            no.direita = dir
+            self._atualizar(no)
+            sub = no
+            for pai in reversed(caminho):
+                pai.direita = sub
+                self._atualizar(pai)
+                sub = self._rebalancear(pai)
+            return sub
+        if hd > he + 1:
+            caminho = []
+            c = dir
+            while (c.altura if c is not None else 0) > he + 1:
+                caminho.append(c)
+                c = c.esquerda
+            no.esquerda = esq
+            no.direita = c
+            self._atualizar(no)
+            sub = no
+            for pai in reversed(caminho):
+                pai.esquerda = sub
+                self._atualizar(pai)
+                sub = self._rebalancear(pai)
+            return sub
+        no.esquerda = esq
+        no.direita = dir
+        self._atualizar(no)
+        return no
+
+    def dividir(self, raiz, chave):
+        """Divide a árvore em (menores, nó igual a `chave` ou None, maiores).
+
+        Percorre o caminho até `chave` e junta as sub-árvores de baixo para
+        cima; o custo das junções é telescópico, totalizando O(log n).
+        """
+        caminho = []
+        no = raiz
+        while no is not None:
+            if chave < no.valor:
+                caminho.append((no, True))
+                no = no.esquerda
+            elif no.valor < chave:
+                caminho.append((no, False))
+                no = no.direita
+            else:
+                break
+        if no is not None:
+            esq, dir = no.esquerda, no.direita
+            no.esquerda = no.direita = None
+            self._atualizar(no)
         else:
-            # nó com 0 ou 1 filho
-            if raiz.esquerda is None:
-                return raiz.direita
-            elif raiz.direita is None:
-                return raiz.esquerda
-            # nó com 2 filhos: pega sucessor (mínimo da direita)
-            temp = self.minimo_no(raiz.direita)
-            raiz.valor = temp.valor
-            raiz.direita = self.remover(raiz.direita, temp.valor)
-
-        # se sub-árvore ficou vazia
-        if raiz is None:
+            esq = dir = None
+        for pai, foi_esquerda in reversed(caminho):
+            if foi_esquerda:
+                dir = self.juntar(dir, pai, pai.direita)
+            else:
+                esq = self.juntar(pai.esquerda, pai, esq)
+        return esq, no, dir
+
+    def _extrair_minimo(self, raiz):
+        """Desliga o menor nó da árvore; retorna (nova raiz, nó extraído)"""
+        caminho = []
+        no = raiz
+        while no.esquerda is not None:
+            caminho.append(no)
+            no = no.esquerda
+        filho = no.direita
+        if not caminho:
+            return filho, no
+        for anterior in caminho:
+            anterior.tamanho -= 1
+        caminho[-1].esquerda = filho
+        return self._retracar(caminho, raiz), no
+
+    def juntar2(self, esq, dir):
+        """Une esq < dir sem chave intermediária (usa o mínimo de dir)"""
+        if dir is None:
+            return esq
+        dir, meio = self._extrair_minimo(dir)
+        return self.juntar(esq, meio, dir)
+
+    def uniao(self, a, b, dados_de_b=False):
+        """União das árvores `a` e `b` em O(m log(n/m + 1)); consome ambas.
+
+        Nas chaves repetidas fica o nó de `a`, com o dado de `b` se
+        `dados_de_b` for verdadeiro.
+        """
+        if a is None:
+            return b
+        if b is None:
+            return a
+        esq, dir = a.esquerda, a.direita
+        b_esq, igual, b_dir = self.dividir(b, a.valor)
+        if dados_de_b and igual is not None:
+            a.dado = igual.dado
+        return self.juntar(self.uniao(esq, b_esq, dados_de_b), a,
+                           self.uniao(dir, b_dir, dados_de_b))
+
+    def intersecao(self, a, b):
+        """Interseção das árvores `a` e `b`; consome ambas"""
+        if a is None or b is None:
             return None
+        esq, dir = a.esquerda, a.direita
+        b_esq, igual, b_dir = self.dividir(b, a.valor)
+        esq = self.intersecao(esq, b_esq)
+        dir = self.intersecao(dir, b_dir)
+        if igual is None:
+            return self.juntar2(esq, dir)
+        return self.juntar(esq, a, dir)
 
-        # atualizar altura e rebalancear
-        raiz.altura = 1 + max(self.altura(raiz.esquerda), self.altura(raiz.direita))
-        fb = self.fator_balanceamento(raiz)
-
-        # LL
-        if fb > 1 and self.fator_balanceamento(raiz.esquerda) >= 0:
-            return self.rotacao_direita(raiz)
-        # LR
-        if fb > 1 and self.fator_balanceamento(raiz.esquerda) < 0:
-            raiz.esquerda = self.rotacao_esquerda(raiz.esquerda)
-            return self.rotacao_direita(raiz)
-        # RR
-        if fb < -1 and self.fator_balanceamento(raiz.direita) <= 0:
-            return self.rotacao_esquerda(raiz)
-        # RL
-        if fb < -1 and self.fator_balanceamento(raiz.direita) > 0:
-            raiz.direita = self.rotacao_direita(raiz.direita)
-            return self.rotacao_esquerda(raiz)
+    def diferenca(self, a, b):
+        """Valores de `a` que não estão em `b`; consome ambas"""
+        if a is None or b is None:
+            return a
+        b_esq, b_dir = b.esquerda, b.direita
+        a_esq, _, a_dir = self.dividir(a, b.valor)
+        return self.juntar2(self.diferenca(a_esq, b_esq), self.diferenca(a_dir, b_dir))
 
-        return raiz
+class ArvoreAVL_Persistente:
+    """AVL imutável por cópia de caminho.
 
-class ArvoreAVL:
-    """Implementação AVL com API esperada pelos testes"""
-    def __init__(self):
+    `inserir` e `remover` nunca alteram nós existentes: retornam uma nova
+    raiz que compartilha com a anterior todas as sub-árvores fora do
+    caminho percorrido, criando O(log n) nós por atualização.
+    """
+
+    buscar = ArvoreAVL_Principal.buscar
+
+    def _no(self, valor, dado, esq, dir):
+        """Cria um nó com altura e tamanho calculados a partir dos filhos"""
+        no = NoAVL(valor, dado)
+        no.esquerda = esq
+        no.direita = dir
+        he, te = (esq.altura, esq.tamanho) if esq is not None else (0, 0)
+        hd, td = (dir.altura, dir.tamanho) if dir is not None else (0, 0)
+        no.altura = 1 + (he if he > hd else hd)
+        no.tamanho = 1 + te + td
+        return no
+
+    def _balancear(self, valor, dado, esq, dir):
+        """Cria o nó (esq, valor, dir) já balanceado, com até três nós novos.
+
+        As alturas de `esq` e `dir` diferem no máximo em 2; as rotações
+        criam cópias em vez de religar os nós existentes.
+        """
+        he = esq.altura if esq is not None else 0
+        hd = dir.altura if dir is not None else 0
+        if he > hd + 1:
+            ee = esq.esquerda
+            ed = esq.direita
+            if (ee.altura if ee is not None else 0) >= (ed.altura if ed is not None else 0):
+                # LL
+                return self._no(esq.valor, esq.dado, ee, self._no(valor, dado, ed, dir))
+            # LR
+            return self._no(ed.valor, ed.dado,
+                            self._no(esq.valor, esq.dado, ee, ed.esquerda),
+                            self._no(valor, dado, ed.direita, dir))
+        if hd > he + 1:
+            de = dir.esquerda
+            dd = dir.direita
+            if (dd.altura if dd is not None else 0) >= (de.altura if de is not None else 0):
+                # RR
+                return self._no(dir.valor, dir.dado, self._no(valor, dado, esq, de), dd)
+            # RL
+            return self._no(de.valor, de.dado,
+                            self._no(valor, dado, esq, de.esquerda),
+                            self._no(dir.valor, dir.dado, de.direita, dd))
+        return self._no(valor, dado, esq, dir)
+
+    def inserir(self, raiz, valor):
+        """Retorna a raiz da versão com `valor` (a própria `raiz` se ele já existir)"""
+        caminho = []
+        lados = []  # True se a descida foi à esquerda
+        candidato = None
+        no = raiz
+        while no is not None:
+            caminho.append(no)
+            if valor < no.valor:
+                lados.append(True)
+                no = no.esquerda
+            else:
+                lados.append(False)
+                candidato = no
+                no = no.direita
+        if candidato is not None and not (candidato.valor < valor):
+            return raiz
+        sub = NoAVL(valor)
+        for i in range(len(caminho) - 1, -1, -1):
+            pai = caminho[i]
+            if lados[i]:
+                sub = self._balancear(pai.valor, pai.dado, sub, pai.direita)
+            else:
+                sub = self._balancear(pai.valor, pai.dado, pai.esquerda, sub)
+        return sub
+
+    def remover(self, raiz, valor):
+        """Retorna a raiz da versão sem `valor` (a própria `raiz` se ele não existir).
+
+        Desce como `ArvoreAVL_Principal._remover`: depois do nó igual o
+        caminho termina no sucessor dele, que toma o seu lugar na cópia.
+        """
+        caminho = []
+        alvo = None
+        i_alvo = 0
+        no = raiz
+        while no is not None:
+            caminho.append(no)
+            if valor < no.valor:
+                no = no.esquerda
+            else:
+                alvo = no
+                i_alvo = len(caminho) - 1
+                no = no.direita
+        if alvo is None or alvo.valor < valor:
+            return raiz
+
+        if alvo.direita is None:
+            sub = alvo.esquerda
+        else:
+            sucessor = caminho[-1]
+            sub = sucessor.direita
+            for i in range(len(caminho) - 2, i_alvo, -1):
+                pai = caminho[i]  # a descida abaixo do alvo só vai à esquerda
+                sub = self._balancear(pai.valor, pai.dado, sub, pai.direita)
+            sub = self._balancear(sucessor.valor, sucessor.dado, alvo.esquerda, sub)
+
+        antigo = alvo
+        for i in range(i_alvo - 1, -1, -1):
+            pai = caminho[i]
+            if pai.esquerda is antigo:
+                sub = self._balancear(pai.valor, pai.dado, sub, pai.direita)
+            else:
+                sub = self._balancear(pai.valor, pai.dado, pai.esquerda, sub)
+            antigo = pai
+        return sub
+
+class ArvoreAVL(ArvoreBinaria):
+    """Implementação AVL com API esperada pelos testes.
+
+    Também funciona como mapa ordenado (`put`, `get`, `pop`, `items`). A
+    função opcional `key` normaliza as chaves do mapa; seu resultado é
+    calculado uma vez e guardado no nó.
+    """
+
+    _campos_json = staticmethod(_campos)
+
+    def __init__(self, key=None):
         self.root = None
         self._avl = ArvoreAVL_Principal()
+        self._funcao_chave = key
+        self._diario = None  # diário de mutações (veja `recuperar`)
+        self._metricas = None  # contadores (veja `instrumentar`)
+        self._cache = None  # cache de buscas (veja `ativar_cache`)
+        self._tamanho = 0
+        self._modificacoes = 0  # invalida iteradores em andamento
+
+    @classmethod
+    def from_sorted(cls, valores):
+        """Constrói uma árvore balanceada a partir de valores ordenados em O(n).
+
+        Aceita qualquer iterável, inclusive geradores. Entradas fora de ordem
+        ou com duplicatas são ordenadas e deduplicadas (O(n log n)).
+        """
+        arvore = cls()
+        arvore._construir(valores)
+        return arvore
+
+    def _construir(self, valores):
+        """Substitui o conteúdo da árvore pelos valores dados, em O(n)"""
+        with gc_pausado():
+            self._montar(*encadear_ordenados(valores, self._avl._No))
+
+    def _montar(self, primeiro, n):
+        """Substitui o conteúdo pela cadeia ordenada de `n` nós (via `direita`)"""
+        atual = primeiro
+
+        def construir(n):
+            # Consome a cadeia em ordem: sub-árvore esquerda, nó, direita
+            nonlocal atual
+            if n == 0:
+                return None
+            esq = construir((n - 1) // 2)
+            no = atual
+            atual = no.direita
+            dir = construir(n - 1 - (n - 1) // 2)
+            no.esquerda = esq
+            no.direita = dir
+            he = esq.altura if esq is not None else 0
+            hd = dir.altura if dir is not None else 0
+            no.altura = 1 + (he if he > hd else hd)
+            no.tamanho = n
+            return no
+
+        self.root = construir(n)
+        self._tamanho = n
+        self._modificacoes += 1
+
+    def _raiz_e_vazio(self):
+        return self.root, None
+
+    def _fabrica_no(self):
+        return self._avl._No
+
+    # --- Snapshot binário ---
+    def salvar(self, caminho):
+        """Grava um snapshot binário: chaves em ordem e a altura de cada nó"""
+        nos = self._listar_nos()
+        salvar_snapshot(caminho, ARVORE_AVL, nos, bytes(no.altura for no in nos))
+
+    @classmethod
+    def carregar(cls, caminho, key=None):
+        """Restaura um snapshot de `salvar` com a mesma forma, em O(n)"""
+        arvore = cls(key=key)
+        with abrir_snapshot(caminho, ARVORE_AVL) as (_, forma, chaves, dados):
+            with gc_pausado():
+                arvore._restaurar(chaves, forma, repeat(None) if dados is None else dados)
+        return arvore
+
+    def _restaurar(self, chaves, alturas, dados):
+        """Refaz a forma gravada sem rotações.
+
+        Em ordem, a raiz de cada sub-árvore é o único máximo de altura do
+        seu trecho, então a árvore é a cartesiana das alturas: uma pilha
+        com a espinha direita da parte já montada basta. Os tamanhos são
+        fechados quando cada nó sai da pilha.
+        """
+        criar_no = self._avl._No
+        pilha = []
+        for valor, altura, dado in zip(chaves, alturas, dados):
+            no = criar_no(valor, dado)
+            no.altura = altura
+            ultimo = None
+            while pilha and pilha[-1].altura < altura:
+                ultimo = pilha.pop()
+                esq, dir = ultimo.esquerda, ultimo.direita
+                ultimo.tamanho = (1 + (esq.tamanho if esq is not None else 0)
+                                  + (dir.tamanho if dir is not None else 0))
+            no.esquerda = ultimo
+            if pilha:
+                pilha[-1].direita = no
+            pilha.append(no)
+        raiz = None
+        while pilha:
+            raiz = pilha.pop()
+            esq, dir = raiz.esquerda, raiz.direita
+            raiz.tamanho = (1 + (esq.tamanho if esq is not None else 0)
+                            + (dir.tamanho if dir is not None else 0))
+        self.root = raiz
+        self._tamanho = raiz.tamanho if raiz is not None else 0
+        self._modificacoes += 1
+
+    def _listar_nos(self):
+        """Lista os nós em ordem (antes de religá-los numa reconstrução)"""
+        nos = []
+        pilha = []
+        no = self.root
+        while pilha or no is not None:
+            while no is not None:
+                pilha.append(no)
+                no = no.esquerda
+            no = pilha.pop()
+            nos.append(no)
+            no = no.direita
+        return nos
 
     def inserir(self, valor):
-        self.root = self._avl.inserir(self.root, valor)
+        self.root, _, inserido = self._avl._inserir(self.root, valor)
+        if inserido:
+            self._tamanho += 1
+            self._modificacoes += 1
+            if self._diario is not None:
+                self._diario.registrar(diario.INSERIR, valor)
 
     def remover(self, valor):
-        if self.buscar(valor) is None:
-            return False
-        self.root = self._avl.remover(self.root, valor)
-        return True
+        self.root, removido, _ = self._avl._remover(self.root, valor)
+        if removido:
+            self._tamanho -= 1
+            self._modificacoes += 1
+            if self._diario is not None:
+                self._diario.registrar(diario.REMOVER, valor)
+        return removido
+
+    def _inserir_no(self, valor, dado=None):
+        """Insere `valor` (com `dado`) se ausente; retorna (nó com o valor, se foi inserido)"""
+        self.root, no, inserido = self._avl._inserir(self.root, valor, dado)
+        if inserido:
+            self._tamanho += 1
+            self._modificacoes += 1
+        return no, inserido
 
     def buscar(self, valor):
         return self._avl.buscar(self.root, valor)
 
-    def em_ordem(self):
-        resultado = []
-        def _in_order(no):
-            if no:
-                _in_order(no.esquerda)
-                resultado.append(no.valor)
-                _in_order(no.direita)
-        _in_order(self.root)
-        return resultado
+    # --- Modo mapa (chave -> dado) ---
+    def get(self, chave, padrao=None):
+        """Retorna o dado associado à chave, ou `padrao` se ela não existir"""
+        if self._funcao_chave is not None:
+            chave = self._funcao_chave(chave)
+        no = self._avl.buscar(self.root, chave)
+        return padrao if no is None else no.dado
+
+    def pop(self, chave, *padrao):
+        """Remove a chave e retorna seu dado (KeyError ou `padrao` se ausente)"""
+        if self._funcao_chave is not None:
+            chave = self._funcao_chave(chave)
+        self.root, removido, dado = self._avl._remover(self.root, chave)
+        if removido:
+            self._tamanho -= 1
+            self._modificacoes += 1
+            if self._diario is not None:
+                self._diario.registrar(diario.REMOVER, chave)
+            return dado
+        if padrao:
+            return padrao[0]
+        raise KeyError(chave)
+
+    # --- Percurso ---
+    def iterar(self, desde=None, ate=None, reverso=False):
+        """Gera os valores em ordem, opcionalmente restritos a [desde, ate].
+
+        Usa uma pilha explícita (memória O(altura)) e levanta RuntimeError
+        se a árvore for modificada durante a iteração.
+        """
+        return self._percorrer(desde, ate, reverso, False)
+
+    def _percorrer(self, desde, ate, reverso, pares):
+        versao = self._modificacoes
+        pilha = []
+        no = self.root
+        if not reverso:
+            while no is not None:
+                if desde is not None and no.valor < desde:
+                    no = no.direita
+                else:
+                    pilha.append(no)
+                    no = no.esquerda
+            while pilha:
+                no = pilha.pop()
+                if ate is not None and ate < no.valor:
+                    return
+                yield (no.valor, no.dado) if pares else no.valor
+                if self._modificacoes != versao:
+                    raise RuntimeError("árvore modificada durante a iteração")
+                no = no.direita
+                while no is not None:
+                    pilha.append(no)
+                    no = no.esquerda
+        else:
+            while no is not None:
+                if ate is not None and ate < no.valor:
+                    no = no.esquerda
+                else:
+                    pilha.append(no)
+                    no = no.direita
+            while pilha:
+                no = pilha.pop()
+                if desde is not None and no.valor < desde:
+                    return
+                yield (no.valor, no.dado) if pares else no.valor
+                if self._modificacoes != versao:
+                    raise RuntimeError("árvore modificada durante a iteração")
+                no = no.esquerda
+                while no is not None:
+                    pilha.append(no)
+                    no = no.direita
+
+    # --- Vizinhos e intervalos ---
+    def piso(self, valor):
+        """Retorna o maior valor <= `valor`, ou None"""
+        candidato = None
+        no = self.root
+        while no is not None:
+            if valor < no.valor:
+                no = no.esquerda
+            else:
+                candidato = no
+                no = no.direita
+        return None if candidato is None else candidato.valor
+
+    def teto(self, valor):
+        """Retorna o menor valor >= `valor`, ou None"""
+        candidato = None
+        no = self.root
+        while no is not None:
+            if no.valor < valor:
+                no = no.direita
+            else:
+                candidato = no
+                no = no.esquerda
+        return None if candidato is None else candidato.valor
+
+    def sucessor(self, valor):
+        """Retorna o menor valor estritamente maior que `valor`, ou None"""
+        candidato = None
+        no = self.root
+        while no is not None:
+            if valor < no.valor:
+                candidato = no
+                no = no.esquerda
+            else:
+                no = no.direita
+        return None if candidato is None else candidato.valor
+
+    def antecessor(self, valor):
+        """Retorna o maior valor estritamente menor que `valor`, ou None"""
+        candidato = None
+        no = self.root
+        while no is not None:
+            if no.valor < valor:
+                candidato = no
+                no = no.direita
+            else:
+                no = no.esquerda
+        return None if candidato is None else candidato.valor
+
+    def contar_intervalo(self, lo, hi):
+        """Conta os valores em [lo, hi] em O(log n) usando os tamanhos"""
+        if hi < lo:
+            return 0
+        ate_hi = 0
+        no = self.root
+        while no is not None:
+            if hi < no.valor:
+                no = no.esquerda
+            else:
+                esq = no.esquerda
+                ate_hi += 1 + (esq.tamanho if esq is not None else 0)
+                no = no.direita
+        return ate_hi - self.posicao(lo)
+
+    # --- Divisão, junção e álgebra de conjuntos ---
+    # Estas operações reaproveitam os nós das árvores envolvidas: as árvores
+    # passadas como argumento (e a própria, no split) ficam vazias.
+    def _de_raiz(self, raiz):
+        """Nova árvore do mesmo tipo (e mesma função de chave) com a raiz dada"""
+        arvore = type(self)(key=self._funcao_chave)
+        arvore._definir_raiz(raiz)
+        return arvore
+
+    def _definir_raiz(self, raiz, fazer_checkpoint=True):
+        self.root = raiz
+        self._tamanho = raiz.tamanho if raiz is not None else 0
+        self._modificacoes += 1
+        if fazer_checkpoint and self._diario is not None:
+            # Operações estruturais não vão para o diário: viram checkpoint
+            self.checkpoint()
+
+    def split(self, chave):
+        """Divide em (menores que chave, chave presente?, maiores) em O(log n)"""
+        esq, no, dir = self._avl.dividir(self.root, chave)
+        self._definir_raiz(None)
+        return self._de_raiz(esq), no is not None, self._de_raiz(dir)
+
+    @classmethod
+    def join(cls, esquerda, chave, direita):
+        """Une esquerda < chave < direita numa nova árvore em O(log n)"""
+        if (not esquerda.esta_vazia() and not esquerda.k_esimo(-1) < chave) or (
+                not direita.esta_vazia() and not chave < direita.k_esimo(0)):
+            raise ValueError("join exige max(esquerda) < chave < min(direita)")
+        raiz = esquerda._avl.juntar(esquerda.root, esquerda._avl._No(chave), direita.root)
+        nova = esquerda._de_raiz(raiz)
+        esquerda._definir_raiz(None)
+        direita._definir_raiz(None)
+        return nova
+
+    def uniao(self, outra):
+        """Acrescenta os valores de `outra` a esta árvore; `outra` fica vazia.
+
+        Como em `dict.update`, nas chaves presentes nas duas vale o dado de `outra`.
+        """
+        if outra is self:
+            return
+        avl = self._avl
+        a, b = self.root, outra.root
+        outra_menor = outra._tamanho < self._tamanho
+        outra._definir_raiz(None)
+        if a is not None and b is not None:
+            # Faixas disjuntas (caso típico de split seguido de religação)
+            if avl.maximo_no(a).valor < avl.minimo_no(b).valor:
+                self._definir_raiz(avl.juntar2(a, b))
+                return
+            if avl.maximo_no(b).valor < avl.minimo_no(a).valor:
+                self._definir_raiz(avl.juntar2(b, a))
+                return
+        if outra_menor:
+            # Divide a maior pelas chaves da menor; os nós de `outra` já vencem
+            self._definir_raiz(avl.uniao(b, a))
+        else:
+            self._definir_raiz(avl.uniao(a, b, dados_de_b=True))
+
+    def intersecao(self, outra):
+        """Mantém só os valores também presentes em `outra`; `outra` fica vazia"""
+        if outra is self:
+            return
+        b = outra.root
+        outra._definir_raiz(None)
+        self._definir_raiz(self._avl.intersecao(self.root, b))
+
+    def diferenca(self, outra):
+        """Remove os valores presentes em `outra`; `outra` fica vazia"""
+        if outra is self:
+            self._definir_raiz(None)
+            return
+        b = outra.root
+        outra._definir_raiz(None)
+        self._definir_raiz(self._avl.diferenca(self.root, b))
+
+    def remover_intervalo(self, lo, hi):
+        """Remove os valores em [lo, hi] com dois splits e uma junção"""
+        if hi < lo:
+            return 0
+        antes = self._tamanho
+        esq, _, resto = self._avl.dividir(self.root, lo)
+        _, _, dir = self._avl.dividir(resto, hi)
+        self._definir_raiz(self._avl.juntar2(esq, dir), fazer_checkpoint=False)
+        removidos = antes - self._tamanho
+        if removidos and self._diario is not None:
+            self._diario.registrar(diario.REMOVER_INTERVALO, (lo, hi))
+        return removidos
+
+    # --- Instrumentação ---
+    def instrumentar(self, gancho=None):
+        """Liga (ou zera) os contadores de comparações, caminhos e rotações.
+
+        Se dado, `gancho(operacao, dados)` é chamado depois de cada
+        operação individual com os números dela.
+        """
+        self.desinstrumentar()
+        self._metricas = instrumentacao.Metricas(
+            ("rotacoes", "rotacoes_simples", "rotacoes_duplas"), gancho)
+        if self._cache is not None:
+            cache.descobrir(self._cache)  # as descidas contadas ficam por baixo do cache
+        instrumentacao.contar_rotacoes(self._avl, self._metricas, rebalancear=True)
+        instrumentacao.contar_comparacoes(self._avl, self._metricas, instrumentacao.DESCIDAS_AVL)
+        instrumentacao.medir_operacoes(self, self._metricas)
+        if self._cache is not None:
+            self._encobrir_cache()
+
+    def desinstrumentar(self):
+        if self._cache is not None:
+            cache.descobrir(self._cache)
+        instrumentacao.remover_medicoes(self, self._avl)
+        self._metricas = None
+        if self._cache is not None:
+            self._encobrir_cache()
+
+    # --- Cache de buscas ---
+    def _encobrir_cache(self):
+        # Por cima da instrumentação, se houver
+        cache.encobrir_busca(self._avl, "buscar", self._cache)
+        cache.invalidar_avl(self._avl, self._cache)
+        cache.limpar_em(self, ("_montar", "_definir_raiz"), self._cache)
+
+    def altura(self):
+        """Altura da árvore em nós (0 se vazia), em O(1)"""
+        return self.root.altura if self.root is not None else 0
+
+    # --- Visualização ---
+    def imprimir(self, profundidade=None, chave=None, acima=0, saida=None):
+        """Desenha a árvore em texto, direita acima da esquerda.
 
-    def imprimir(self):
-        self._avl.mostrar_arvore(self.root)
+        `profundidade` limita os níveis desenhados; com `chave`, desenha só
+        a sub-árvore do nó com essa chave (ou do último nó da busca), a
+        partir de `acima` níveis acima dele. `saida` é um arquivo de texto
+        ou um caminho (padrão: saída padrão).
+        """
+        raiz = self.root
+        if chave is not None:
+            if self._funcao_chave is not None:
+                chave = self._funcao_chave(chave)
+            raiz = visualizacao.localizar(raiz, None, _filhos, _valor, chave, acima)
+        visualizacao.escrever(visualizacao.linhas(raiz, None, _filhos, _rotulo,
+                                                  profundidade, _tamanho_no), saida)
 
-    def obter_tamanho(self):
-        return len(self.em_ordem())
 
-    def esta_vazia(self):
-        return self.root is None
+class ArvoreAVLMulticonjunto(Multiconjunto, ArvoreAVL):
+    """AVL em modo multiconjunto: cada nó guarda a contagem do seu valor"""
+
+
+class VersaoAVL:
+    """Versão imutável de uma ArvoreAVLPersistente, obtida em O(1).
+
+    Continua válida e inalterada enquanto a árvore de origem recebe novas
+    atualizações, e pode ser lida de outras threads sem trava.
+    """
+
+    _avl = ArvoreAVL_Persistente()
+    _funcao_chave = None
+    _modificacoes = 0  # os nós nunca mudam; iteradores não são invalidados
+
+    def __init__(self, raiz=None, tamanho=0):
+        self.root = raiz
+        self._tamanho = tamanho
+
+    # As consultas de ArvoreAVL só leem `root`, `_tamanho` e os nós
+    _raiz_e_vazio = ArvoreAVL._raiz_e_vazio
+    _atributos_dot = None
+    _campos_json = staticmethod(_campos)
+    buscar = ArvoreAVL.buscar
+    buscar_muitos = ArvoreAVL.buscar_muitos
+    get = ArvoreAVL.get
+    items = ArvoreAVL.items
+    em_ordem = ArvoreAVL.em_ordem
+    __iter__ = ArvoreAVL.__iter__
+    __reversed__ = ArvoreAVL.__reversed__
+    iterar = ArvoreAVL.iterar
+    _percorrer = ArvoreAVL._percorrer
+    piso = ArvoreAVL.piso
+    teto = ArvoreAVL.teto
+    sucessor = ArvoreAVL.sucessor
+    antecessor = ArvoreAVL.antecessor
+    intervalo = ArvoreAVL.intervalo
+    contar_intervalo = ArvoreAVL.contar_intervalo
+    k_esimo = ArvoreAVL.k_esimo
+    posicao = ArvoreAVL.posicao
+    mediana = ArvoreAVL.mediana
+    percentil = ArvoreAVL.percentil
+    obter_tamanho = ArvoreAVL.obter_tamanho
+    esta_vazia = ArvoreAVL.esta_vazia
+    imprimir = ArvoreAVL.imprimir
+    exportar_dot = ArvoreAVL.exportar_dot
+    exportar_json = ArvoreAVL.exportar_json
+
+
+class ArvoreAVLPersistente(VersaoAVL, InterfaceArvore):
+    """AVL persistente: cada atualização gera uma nova versão em O(log n).
+
+    `versao()` captura o estado atual em O(1) e `restaurar(versao)` volta a
+    ele, também em O(1). Um iterador continua percorrendo a versão em que
+    começou, mesmo que a árvore seja alterada durante a iteração.
+    """
+
+    @classmethod
+    def from_sorted(cls, valores):
+        """Constrói a versão inicial a partir de valores ordenados em O(n)"""
+        base = ArvoreAVL.from_sorted(valores)
+        return cls(base.root, base._tamanho)
+
+    def inserir(self, valor):
+        raiz = self._avl.inserir(self.root, valor)
+        if raiz is not self.root:
+            self.root = raiz
+            self._tamanho += 1
+
+    def remover(self, valor):
+        raiz = self._avl.remover(self.root, valor)
+        if raiz is self.root:
+            return False
+        self.root = raiz
+        self._tamanho -= 1
+        return True
 
+    def versao(self):
+        """Retorna a versão atual (imutável)"""
+        return VersaoAVL(self.root, self._tamanho)
 
+    def restaurar(self, versao):
+        """Volta a árvore para uma versão obtida antes com `versao()`"""
+        self.root = versao.root
+        self._tamanho = versao._tamanho
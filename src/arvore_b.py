@@ -0,0 +1,363 @@
+"""Árvore B+ com nós largos: poucos saltos por busca e `bisect` dentro do nó.
+
+Numa árvore binária, cada nível custa ao CPython um acesso a atributo e
+uma comparação em Python sobre um objeto separado. Aqui cada nó guarda uma
+lista ordenada de chaves, percorrida por `bisect` em C, e a altura fica em
+torno de log_{m/2}(n) para ordem m.
+"""
+
+from bisect import bisect_left, bisect_right
+
+from . import instrumentacao, visualizacao
+from .interface_arvore import InterfaceArvore
+
+# Chaves exibidas por nó no desenho antes de abreviar
+CHAVES_NO_DESENHO = 8
+
+
+class NoB:
+    """Nó da árvore B+: chaves ordenadas e, nos nós internos, os filhos"""
+
+    __slots__ = ("chaves", "filhos")
+
+    def __init__(self, chaves, filhos=None):
+        self.chaves = chaves
+        self.filhos = filhos  # None nas folhas
+
+
+def _filhos(no):
+    return no.filhos
+
+
+def _rotulo(no):
+    chaves = no.chaves
+    if len(chaves) <= CHAVES_NO_DESENHO:
+        return "[" + " ".join(map(str, chaves)) + "]"
+    metade = CHAVES_NO_DESENHO // 2
+    return ("[" + " ".join(map(str, chaves[:metade])) + " … "
+            + " ".join(map(str, chaves[-metade:])) + f"] ({len(chaves)} chaves)")
+
+
+# Caracteres com significado nos rótulos de registro do DOT
+_ESPECIAIS_REGISTRO = str.maketrans({c: "\\" + c for c in "{}|<>\\"})
+
+
+def _campos_registro(no):
+    return " | ".join(str(chave).translate(_ESPECIAIS_REGISTRO) for chave in no.chaves)
+
+
+def _campos(no):
+    return {"chaves": no.chaves}
+
+
+def _grupos(itens, capacidade):
+    """Corta `itens` em grupos consecutivos de tamanhos quase iguais, até `capacidade`"""
+    n = len(itens)
+    quantidade = -(-n // capacidade)
+    base, sobra = divmod(n, quantidade)
+    inicio = 0
+    for k in range(quantidade):
+        fim = inicio + base + (k < sobra)
+        yield itens[inicio:fim]
+        inicio = fim
+
+
+class ArvoreB(InterfaceArvore):
+    """Árvore B+ de ordem configurável, sem duplicatas.
+
+    Os valores ficam nas folhas; um nó interno com chaves k_0..k_{j-1} tem
+    j + 1 filhos, e tudo em `filhos[i]` é menor que k_i, que por sua vez é
+    menor ou igual a tudo em `filhos[i + 1]`. Com ordem m, folhas guardam
+    até m valores e nós internos até m filhos; fora da raiz, pelo menos
+    metade disso. Mesma API básica das árvores binárias; `buscar` retorna
+    a folha que contém o valor (ou None).
+    """
+
+    ORDEM_PADRAO = 256
+
+    def __init__(self, ordem=ORDEM_PADRAO):
+        if ordem < 3:
+            raise ValueError("a ordem de uma árvore B deve ser ao menos 3")
+        self.ordem = ordem
+        self._minimo_folha = ordem // 2           # valores numa folha
+        self._minimo_interno = (ordem - 1) // 2   # chaves num nó interno
+        self.raiz = NoB([])
+        self._tamanho = 0
+        self._modificacoes = 0  # invalida iteradores em andamento
+
+    @classmethod
+    def from_sorted(cls, valores, ordem=ORDEM_PADRAO):
+        """Constrói a árvore em O(n) a partir de valores ordenados.
+
+        Entradas fora de ordem ou com duplicatas são ordenadas e
+        deduplicadas. Os nós saem cheios, exceto pelo ajuste que divide os
+        valores igualmente entre os nós de cada nível.
+        """
+        arvore = cls(ordem)
+        lista = list(valores)
+        if any(not (a < b) for a, b in zip(lista, lista[1:])):
+            lista.sort()
+            unicos = lista[:1]
+            for valor in lista[1:]:
+                if unicos[-1] < valor:
+                    unicos.append(valor)
+            lista = unicos
+        if not lista:
+            return arvore
+        # Cada nível guarda (nó, menor valor da sub-árvore)
+        nivel = [(NoB(grupo), grupo[0]) for grupo in _grupos(lista, ordem)]
+        while len(nivel) > 1:
+            nivel = [(NoB([minimo for _, minimo in grupo[1:]], [no for no, _ in grupo]),
+                      grupo[0][1])
+                     for grupo in _grupos(nivel, ordem)]
+        arvore.raiz = nivel[0][0]
+        arvore._tamanho = len(lista)
+        return arvore
+
+    # --- Operações individuais ---
+    def buscar(self, valor):
+        """Retorna a folha que contém `valor`, ou None"""
+        no = self.raiz
+        while no.filhos is not None:
+            no = no.filhos[bisect_right(no.chaves, valor)]
+        chaves = no.chaves
+        i = bisect_left(chaves, valor)
+        if i < len(chaves) and not (valor < chaves[i]):
+            return no
+        return None
+
+    def _descer(self, valor):
+        """Retorna (folha de `valor`, caminho de (nó interno, índice do filho))"""
+        caminho = []
+        no = self.raiz
+        while no.filhos is not None:
+            i = bisect_right(no.chaves, valor)
+            caminho.append((no, i))
+            no = no.filhos[i]
+        return no, caminho
+
+    def inserir(self, valor):
+        folha, caminho = self._descer(valor)
+        chaves = folha.chaves
+        i = bisect_left(chaves, valor)
+        if i < len(chaves) and not (valor < chaves[i]):
+            return  # não insere duplicatas
+        chaves.insert(i, valor)
+        self._tamanho += 1
+        self._modificacoes += 1
+        if len(chaves) > self.ordem:
+            self._dividir(folha, caminho)
+
+    def _dividir(self, no, caminho):
+        """Divide `no`, cheio demais, subindo pelo caminho enquanto o pai transbordar"""
+        while True:
+            chaves = no.chaves
+            meio = len(chaves) // 2
+            if no.filhos is None:
+                novo = NoB(chaves[meio:])
+                separador = chaves[meio]
+            else:
+                # A chave do meio sobe e não fica em nenhuma das metades
+                novo = NoB(chaves[meio + 1:], no.filhos[meio + 1:])
+                separador = chaves[meio]
+                del no.filhos[meio + 1:]
+            del chaves[meio:]
+            if not caminho:
+                self.raiz = NoB([separador], [no, novo])
+                return
+            pai, i = caminho.pop()
+            pai.chaves.insert(i, separador)
+            pai.filhos.insert(i + 1, novo)
+            if len(pai.filhos) <= self.ordem:
+                return
+            no = pai
+
+    def remover(self, valor):
+        folha, caminho = self._descer(valor)
+        chaves = folha.chaves
+        i = bisect_left(chaves, valor)
+        if i == len(chaves) or valor < chaves[i]:
+            return False
+        del chaves[i]
+        self._tamanho -= 1
+        self._modificacoes += 1
+        if len(chaves) < self._minimo_folha and caminho:
+            self._reparar(folha, caminho)
+        return True
+
+    def _reparar(self, no, caminho):
+        """Corrige `no`, abaixo do mínimo, pegando uma chave de um irmão ou fundindo.
+
+        Uma fusão tira uma chave do pai, que pode então precisar do mesmo
+        reparo; uma raiz interna que fique com um só filho é descartada.
+        """
+        while caminho:
+            folha = no.filhos is None
+            minimo = self._minimo_folha if folha else self._minimo_interno
+            if len(no.chaves) >= minimo:
+                return
+            pai, i = caminho.pop()
+            irmaos = pai.filhos
+            if i > 0 and len(irmaos[i - 1].chaves) > minimo:
+                esq = irmaos[i - 1]
+                if folha:
+                    no.chaves.insert(0, esq.chaves.pop())
+                    pai.chaves[i - 1] = no.chaves[0]
+                else:
+                    no.chaves.insert(0, pai.chaves[i - 1])
+                    pai.chaves[i - 1] = esq.chaves.pop()
+                    no.filhos.insert(0, esq.filhos.pop())
+                return
+            if i + 1 < len(irmaos) and len(irmaos[i + 1].chaves) > minimo:
+                dir = irmaos[i + 1]
+                if folha:
+                    no.chaves.append(dir.chaves.pop(0))
+                    pai.chaves[i] = dir.chaves[0]
+                else:
+                    no.chaves.append(pai.chaves[i])
+                    pai.chaves[i] = dir.chaves.pop(0)
+                    no.filhos.append(dir.filhos.pop(0))
+                return
+            # Funde com o irmão da esquerda, ou com o da direita no primeiro filho
+            if i > 0:
+                i -= 1
+            esq, dir = irmaos[i], irmaos[i + 1]
+            if not folha:
+                esq.chaves.append(pai.chaves[i])
+                esq.filhos += dir.filhos
+            esq.chaves += dir.chaves
+            del pai.chaves[i]
+            del irmaos[i + 1]
+            no = pai
+        if no.filhos is not None and len(no.filhos) == 1:
+            self.raiz = no.filhos[0]
+
+    # --- Percursos ---
+    def _folhas(self):
+        """Gera as folhas da esquerda para a direita"""
+        pilha = [self.raiz]
+        while pilha:
+            no = pilha.pop()
+            if no.filhos is None:
+                yield no
+            else:
+                pilha.extend(reversed(no.filhos))
+
+    def em_ordem(self):
+        resultado = []
+        for folha in self._folhas():
+            resultado += folha.chaves
+        return resultado
+
+    def __iter__(self):
+        return self.iterar()
+
+    def __reversed__(self):
+        return self.iterar(reverso=True)
+
+    def iterar(self, desde=None, ate=None, reverso=False):
+        """Gera os valores em ordem, opcionalmente restritos a [desde, ate].
+
+        Guarda só o caminho até a folha atual (memória O(altura)) e levanta
+        RuntimeError se a árvore for modificada durante a iteração.
+        """
+        versao = self._modificacoes
+        limite = ate if reverso else desde
+        caminho = []
+        no = self.raiz
+        while no.filhos is not None:
+            if limite is not None:
+                i = bisect_right(no.chaves, limite)
+            else:
+                i = len(no.filhos) - 1 if reverso else 0
+            caminho.append([no, i])
+            no = no.filhos[i]
+        primeira = True
+        while True:
+            chaves = no.chaves
+            if not reverso:
+                inicio = bisect_left(chaves, desde) if primeira and desde is not None else 0
+                for valor in chaves[inicio:]:
+                    if ate is not None and ate < valor:
+                        return
+                    yield valor
+                    if self._modificacoes != versao:
+                        raise RuntimeError("árvore modificada durante a iteração")
+            else:
+                fim = bisect_right(chaves, ate) if primeira and ate is not None else len(chaves)
+                for valor in reversed(chaves[:fim]):
+                    if desde is not None and valor < desde:
+                        return
+                    yield valor
+                    if self._modificacoes != versao:
+                        raise RuntimeError("árvore modificada durante a iteração")
+            primeira = False
+            # Sobe até um ancestral com um próximo filho e desce até a folha vizinha
+            passo = -1 if reverso else 1
+            while caminho:
+                entrada = caminho[-1]
+                i = entrada[1] + passo
+                if 0 <= i < len(entrada[0].filhos):
+                    entrada[1] = i
+                    no = entrada[0].filhos[i]
+                    break
+                caminho.pop()
+            else:
+                return
+            while no.filhos is not None:
+                i = len(no.filhos) - 1 if reverso else 0
+                caminho.append([no, i])
+                no = no.filhos[i]
+
+    def intervalo(self, lo, hi):
+        """Gera, em ordem, os valores em [lo, hi]"""
+        return self.iterar(desde=lo, ate=hi)
+
+    # --- Tamanho, altura e desenho ---
+    def obter_tamanho(self):
+        return self._tamanho
+
+    def esta_vazia(self):
+        return self._tamanho == 0
+
+    def altura(self):
+        """Quantidade de níveis de nós (0 se vazia), em O(altura)"""
+        if self._tamanho == 0:
+            return 0
+        niveis = 1
+        no = self.raiz
+        while no.filhos is not None:
+            no = no.filhos[0]
+            niveis += 1
+        return niveis
+
+    def estatisticas(self):
+        """Tamanho e altura atuais, no formato das árvores instrumentáveis"""
+        return instrumentacao.estatisticas(None, self._tamanho, self.altura())
+
+    def imprimir(self, profundidade=None, chave=None, acima=0, saida=None):
+        """Desenha os nós de cima para baixo, um por linha.
+
+        Nós com mais de CHAVES_NO_DESENHO chaves são abreviados.
+        `profundidade`, `chave`, `acima` e `saida` funcionam como em
+        ArvoreAVL.imprimir.
+        """
+        if self._tamanho == 0:
+            return
+        raiz = self.raiz
+        if chave is not None:
+            folha, caminho = self._descer(chave)
+            nos = [no for no, _ in caminho] + [folha]
+            raiz = nos[max(0, len(nos) - 1 - acima)]
+        visualizacao.escrever(visualizacao.linhas_ramos(raiz, _filhos, _rotulo, profundidade),
+                              saida)
+
+    def exportar_dot(self, saida, profundidade=None):
+        """Grava a árvore no formato DOT do Graphviz (arquivo ou caminho)"""
+        visualizacao.escrever(visualizacao.dot_ramos(self.raiz, _filhos, _campos_registro,
+                                                     profundidade), saida)
+
+    def exportar_json(self, saida, profundidade=None):
+        """Grava a árvore como JSON aninhado: {"chaves": [...], "filhos": [...]}"""
+        visualizacao.escrever(visualizacao.json_ramos(self.raiz, _filhos, _campos,
+                                                      profundidade), saida)
@@ -0,0 +1,236 @@
+"""Métodos comuns às árvores binárias de busca aumentadas (AVL e Rubro-Negra).
+
+Tudo aqui independe do motor de balanceamento: lotes, estatísticas de
+ordem, modo mapa, diário, cache e exportação. As árvores fornecem a raiz e
+o sentinela das folhas (`_raiz_e_vazio`), a fábrica de nós (`_fabrica_no`),
+a reconstrução (`_listar_nos`, `_montar`), a descida do mapa
+(`_inserir_no`), o percurso (`_percorrer`), o snapshot (`salvar`) e o
+encobrimento do cache (`_encobrir_cache`). Cada nó guarda `tamanho`.
+"""
+
+import math
+from bisect import bisect_left
+from operator import attrgetter
+
+from .construcao import filtrar_nos, gc_pausado, mesclar_nos
+from . import cache, diario, instrumentacao, visualizacao
+from .interface_arvore import InterfaceArvore
+
+# Acesso aos nós para o módulo de visualização
+_filhos = attrgetter("esquerda", "direita")
+_valor = attrgetter("valor")
+_tamanho_no = attrgetter("tamanho")
+
+
+class ArvoreBinaria(InterfaceArvore):
+    """Base das árvores AVL e Rubro-Negra, com os métodos que não dependem do motor"""
+
+    _atributos_dot = None  # atributos DOT de cada nó (a Rubro-Negra pinta as cores)
+    _campos_json = None  # campos extras de cada nó no JSON
+
+    def _raiz_e_vazio(self):
+        """Retorna (raiz, sentinela das folhas)"""
+        raise NotImplementedError
+
+    def _fabrica_no(self):
+        """Retorna a fábrica de nós `(valor) -> nó` das reconstruções em lote"""
+        raise NotImplementedError
+
+    def obter_tamanho(self):
+        return self._tamanho
+
+    def esta_vazia(self):
+        return not self._tamanho
+
+    # --- Modo mapa (chave -> dado) ---
+    def put(self, chave, dado):
+        """Associa `dado` à chave, inserindo-a ou substituindo o dado atual"""
+        if self._funcao_chave is not None:
+            chave = self._funcao_chave(chave)
+        self._inserir_no(chave)[0].dado = dado
+        if self._diario is not None:
+            self._diario.registrar(diario.PUT, (chave, dado))
+
+    def items(self, desde=None, ate=None, reverso=False):
+        """Gera pares (chave, dado) em ordem, com os mesmos limites de `iterar`"""
+        return self._percorrer(desde, ate, reverso, True)
+
+    # --- Operações em lote ---
+    def inserir_muitos(self, valores):
+        """Insere um lote de valores; retorna quantos eram novos.
+
+        O lote é ordenado. Se for ao menos do tamanho da árvore, a árvore é
+        reconstruída em O(n + m) mesclando as duas sequências; senão os
+        valores são inseridos um a um, em ordem crescente.
+        """
+        lote = sorted(valores)
+        antes = self._tamanho
+        if len(lote) >= antes:
+            with gc_pausado():
+                self._montar(*mesclar_nos(self._listar_nos(), lote, self._fabrica_no()))
+            if self._diario is not None:
+                self._diario.registrar(diario.INSERIR_MUITOS, lote)
+        else:
+            with gc_pausado():
+                for valor in lote:
+                    self.inserir(valor)
+        return self._tamanho - antes
+
+    def remover_muitos(self, valores):
+        """Remove um lote de valores; retorna quantos estavam presentes.
+
+        Lotes ao menos do tamanho da árvore reconstroem a árvore em O(n + m);
+        os demais removem em ordem, um a um.
+        """
+        lote = sorted(valores)
+        antes = self._tamanho
+        if len(lote) >= antes:
+            if antes:
+                self._montar(*filtrar_nos(self._listar_nos(), lote))
+                if self._diario is not None:
+                    self._diario.registrar(diario.REMOVER_MUITOS, lote)
+        else:
+            for valor in lote:
+                self.remover(valor)
+        return antes - self._tamanho
+
+    def buscar_muitos(self, valores):
+        """Retorna uma máscara de presença (lista de bool) na ordem do lote.
+
+        O lote ordenado desce pela árvore de uma só vez: em cada nó ele é
+        particionado com bisect, então prefixos de caminho comuns a várias
+        chaves são percorridos uma única vez (O(m log(n/m + 1)) nós). Lotes
+        muito menores que a árvore usam buscas individuais.
+        """
+        lote = list(valores)
+        if len(lote) * 64 < self._tamanho:
+            # Lote esparso: os caminhos quase não se sobrepõem
+            return [self.buscar(valor) is not None for valor in lote]
+        ordem = sorted(range(len(lote)), key=lote.__getitem__)
+        chaves = [lote[i] for i in ordem]
+        mascara = [False] * len(lote)
+        raiz, vazio = self._raiz_e_vazio()
+        pilha = [(raiz, 0, len(chaves))]
+        while pilha:
+            no, lo, hi = pilha.pop()
+            if no is vazio or lo >= hi:
+                continue
+            i = bisect_left(chaves, no.valor, lo, hi)
+            j = i
+            while j < hi and not (no.valor < chaves[j]):
+                mascara[ordem[j]] = True  # chaves[j] == no.valor
+                j += 1
+            pilha.append((no.esquerda, lo, i))
+            pilha.append((no.direita, j, hi))
+        return mascara
+
+    # --- Estatísticas de ordem (O(log n) via tamanhos das sub-árvores) ---
+    def k_esimo(self, k):
+        """Retorna o k-ésimo menor valor (base 0; aceita índices negativos)"""
+        if k < 0:
+            k += self._tamanho
+        if not 0 <= k < self._tamanho:
+            raise IndexError("índice fora do intervalo da árvore")
+        no, vazio = self._raiz_e_vazio()
+        while True:
+            esq = no.esquerda
+            te = esq.tamanho if esq is not vazio else 0
+            if k < te:
+                no = esq
+            elif k == te:
+                return no.valor
+            else:
+                k -= te + 1
+                no = no.direita
+
+    def posicao(self, valor):
+        """Retorna quantos valores da árvore são menores que `valor`"""
+        pos = 0
+        no, vazio = self._raiz_e_vazio()
+        while no is not vazio:
+            if no.valor < valor:
+                esq = no.esquerda
+                pos += 1 + (esq.tamanho if esq is not vazio else 0)
+                no = no.direita
+            else:
+                no = no.esquerda
+        return pos
+
+    def mediana(self):
+        """Retorna a mediana (a inferior, se o tamanho for par)"""
+        return self.k_esimo((self._tamanho - 1) // 2)
+
+    def percentil(self, p):
+        """Retorna o percentil `p` (0 a 100) pelo método do posto mais próximo"""
+        if not 0 <= p <= 100:
+            raise ValueError("percentil deve estar entre 0 e 100")
+        return self.k_esimo(max(math.ceil(p / 100 * self._tamanho) - 1, 0))
+
+    # --- Instrumentação e cache de buscas ---
+    def estatisticas(self):
+        """Contadores da instrumentação e do cache, mais o tamanho e a altura atuais"""
+        resultado = instrumentacao.estatisticas(self._metricas, self._tamanho, self.altura())
+        if self._cache is not None:
+            resultado["cache"] = self._cache.estatisticas()
+        return resultado
+
+    def ativar_cache(self, capacidade=cache.CAPACIDADE, politica="lru"):
+        """Liga (ou esvazia) o cache de buscas das chaves mais acessadas.
+
+        `politica` é "lru", "tinylfu" ou um objeto com a interface de
+        `cache.LRU`. Retorna o `cache.CacheBusca`, com os contadores
+        `acertos` e `faltas`; `estatisticas()` também os inclui.
+        """
+        self.desativar_cache()
+        self._cache = cache.CacheBusca(capacidade, politica)
+        self._encobrir_cache()
+        return self._cache
+
+    def desativar_cache(self):
+        if self._cache is not None:
+            cache.remover_cache(self._cache)
+            self._cache = None
+
+    # --- Exportação ---
+    def exportar_dot(self, saida, profundidade=None):
+        """Grava a árvore no formato DOT do Graphviz (arquivo ou caminho)"""
+        raiz, vazio = self._raiz_e_vazio()
+        visualizacao.escrever(visualizacao.dot(raiz, vazio, _filhos, _valor,
+                                               self._atributos_dot, profundidade,
+                                               _tamanho_no), saida)
+
+    def exportar_json(self, saida, profundidade=None):
+        """Grava a árvore como JSON aninhado (arquivo ou caminho)"""
+        raiz, vazio = self._raiz_e_vazio()
+        visualizacao.escrever(visualizacao.json_aninhado(raiz, vazio, _filhos, _valor,
+                                                         self._campos_json, profundidade,
+                                                         _tamanho_no), saida)
+
+    # --- Durabilidade: diário de mutações e checkpoints ---
+    @classmethod
+    def recuperar(cls, pasta, key=None, a_cada=1, intervalo_ms=None):
+        """Abre (ou cria) uma árvore durável em `pasta`.
+
+        Carrega o último checkpoint e reaplica o diário. As mutações
+        seguintes são registradas com um `fsync` a cada `a_cada` operações
+        e/ou a cada `intervalo_ms` milissegundos (commit em grupo).
+        """
+        return diario.recuperar(cls, pasta, key=key, a_cada=a_cada, intervalo_ms=intervalo_ms)
+
+    def checkpoint(self):
+        """Grava um snapshot da árvore e esvazia o diário"""
+        if self._diario is None:
+            raise RuntimeError("árvore sem diário; use recuperar(pasta)")
+        self.salvar(self._diario.caminho_snapshot)
+        self._diario.truncar()
+
+    def sincronizar(self):
+        """Força o `fsync` das mutações ainda pendentes no diário"""
+        if self._diario is not None:
+            self._diario.sincronizar()
+
+    def fechar_diario(self):
+        """Sincroniza e desanexa o diário"""
+        if self._diario is not None:
+            self._diario.fechar()
+            self._diario = None
@@ -0,0 +1,220 @@
+"""Árvore de intervalos: Rubro-Negra ordenada pelo início com o máximo dos fins.
+
+Os valores são tuplas (inicio, fim, ...) com inicio <= fim, fechadas nas
+duas pontas; campos extras (um identificador, por exemplo) permitem
+guardar intervalos iguais. Cada nó guarda em `maximo` o maior fim da sua
+sub-árvore, o que permite descartar sub-árvores inteiras nas consultas de
+sobreposição. O campo é mantido nas rotações, na inserção (antes da
+correção), na remoção (no caminho do nó que sai) e nas reconstruções, então
+split, join, a álgebra de conjuntos e os lotes continuam valendo.
+"""
+
+from .arvore_rn import ArvoreRubroNegra, NoRubroNegro
+
+
+class NoIntervalo(NoRubroNegro):
+    """Nó com o maior fim entre os intervalos da sua sub-árvore"""
+
+    __slots__ = ("maximo",)
+
+    def __init__(self, valor, cor='PRETO', esquerda=None, direita=None, pai=None, tamanho=1, dado=None):
+        if valor[1] < valor[0]:
+            raise ValueError(f"intervalo com fim antes do início: {valor!r}")
+        # Campos atribuídos aqui mesmo: sem a chamada ao construtor da base,
+        # a construção em lote fica ~20% mais rápida
+        self.valor = valor
+        self.dado = dado
+        self.cor = cor
+        self.esquerda = esquerda
+        self.direita = direita
+        self.pai = pai
+        self.tamanho = tamanho
+        self.maximo = valor[1]
+
+
+class ArvoreIntervalos(ArvoreRubroNegra):
+    """Conjunto de intervalos com consultas de sobreposição.
+
+    `sobrepostos` e `contendo` são geradores preguiçosos: cada intervalo
+    devolvido custa O(log n) no pior caso e sub-árvores sem resposta são
+    puladas inteiras, então uma consulta visita O(log n) nós quando há
+    poucas respostas. `algum_sobreposto` acha uma resposta em O(log n).
+    """
+
+    _No = NoIntervalo
+
+    def __init__(self, key=None):
+        super().__init__(key=key)
+        self._subiu = None  # nó que ocupa o lugar do removido (veja `_remover_no`)
+
+    # --- Manutenção do máximo ---
+    def _recalcular(self, no):
+        """Refaz `no.maximo` a partir dos filhos (que já devem estar certos)"""
+        nil = self.NIL
+        maximo = no.valor[1]
+        filho = no.esquerda
+        if filho is not nil and maximo < filho.maximo:
+            maximo = filho.maximo
+        filho = no.direita
+        if filho is not nil and maximo < filho.maximo:
+            maximo = filho.maximo
+        no.maximo = maximo
+
+    def _recalcular_caminho(self, no, ate):
+        """Refaz os máximos de `no` para cima depois de uma remoção.
+
+        Até passar por `ate` (o sucessor que subiu no lugar do removido,
+        ou `no` mesmo) todos são refeitos; acima dele os máximos só podem
+        cair, e a subida para no primeiro que não muda.
+        """
+        nil = self.NIL
+        passou = False
+        while no is not nil:
+            maximo = no.valor[1]
+            filho = no.esquerda
+            if filho is not nil and maximo < filho.maximo:
+                maximo = filho.maximo
+            filho = no.direita
+            if filho is not nil and maximo < filho.maximo:
+                maximo = filho.maximo
+            if passou and no.maximo == maximo:
+                return
+            no.maximo = maximo
+            if no is ate:
+                passou = True
+            no = no.pai
+
+    def _recalcular_todos(self):
+        """Refaz os máximos da árvore inteira de baixo para cima, em O(n)"""
+        nil = self.NIL
+
+        def fechar(no):
+            maximo = no.valor[1]
+            if no.esquerda is not nil:
+                filho = fechar(no.esquerda)
+                if maximo < filho:
+                    maximo = filho
+            if no.direita is not nil:
+                filho = fechar(no.direita)
+                if maximo < filho:
+                    maximo = filho
+            no.maximo = maximo
+            return maximo
+
+        if self.raiz is not nil:
+            fechar(self.raiz)
+
+    def rotacao_esquerda(self, no):
+        y = no.direita
+        super().rotacao_esquerda(no)
+        y.maximo = no.maximo  # y assume a sub-árvore inteira de no
+        self._recalcular(no)
+
+    def rotacao_direita(self, y):
+        x = y.esquerda
+        super().rotacao_direita(y)
+        x.maximo = y.maximo
+        self._recalcular(y)
+
+    def _fixar_insercao(self, z):
+        # z é um nó novo ou, no join, um nó recém-pendurado com sub-árvores;
+        # os ancestrais só ganham intervalos, então o máximo deles só sobe
+        # e a subida para no primeiro que não muda. Tudo antes das rotações.
+        self._recalcular(z)
+        nil = self.NIL
+        maximo = z.maximo
+        pai = z.pai
+        while pai is not nil and pai.maximo < maximo:
+            pai.maximo = maximo
+            pai = pai.pai
+        return super()._fixar_insercao(z)
+
+    def _juntar(self, esq, no, dir, be, bd):
+        resultado = super()._juntar(esq, no, dir, be, bd)
+        if be == bd:  # `no` virou a raiz sem passar pela correção
+            self._recalcular(no)
+        return resultado
+
+    def _remover_no(self, z):
+        # O caminho a refazer começa no pai do nó que sai fisicamente: z
+        # (até um filho) ou o sucessor y, que ocupa o lugar de z
+        nil = self.NIL
+        if z.esquerda is nil or z.direita is nil:
+            inicio, cor = z.pai, z.cor
+            self._subiu = inicio
+        else:
+            y = self._minimo(z.direita)
+            inicio, cor = (y if y.pai is z else y.pai), y.cor
+            self._subiu = y
+        super()._remover_no(z)
+        if cor != 'PRETO':  # sem correção, ninguém refez o caminho
+            self._recalcular_caminho(inicio, self._subiu)
+        self._subiu = None
+
+    def _fixar_remocao(self, x, pai):
+        # `pai` é o início do caminho de `_remover_no`; as rotações da
+        # correção precisam dos máximos já certos
+        self._recalcular_caminho(pai, self._subiu)
+        super()._fixar_remocao(x, pai)
+
+    def _montar(self, primeiro, n):
+        super()._montar(primeiro, n)
+        self._recalcular_todos()
+
+    def _restaurar(self, chaves, forma, dados):
+        super()._restaurar(chaves, forma, dados)
+        self._recalcular_todos()
+
+    # --- Consultas ---
+    def sobrepostos(self, inicio, fim):
+        """Gera, em ordem, os intervalos que se sobrepõem a [inicio, fim].
+
+        Desce à esquerda só enquanto a sub-árvore tem algum fim >= inicio
+        e para no primeiro intervalo que começa depois de `fim`. Levanta
+        RuntimeError se a árvore for modificada durante a iteração.
+        """
+        nil = self.NIL
+        versao = self._modificacoes
+        pilha = []
+        no = self.raiz
+        while True:
+            while no is not nil and not (no.maximo < inicio):
+                pilha.append(no)
+                no = no.esquerda
+            if not pilha:
+                return
+            no = pilha.pop()
+            valor = no.valor
+            if fim < valor[0]:
+                return  # daqui em diante todos começam depois de `fim`
+            if not (valor[1] < inicio):
+                yield valor
+                if self._modificacoes != versao:
+                    raise RuntimeError("árvore modificada durante a iteração")
+            no = no.direita
+
+    def contendo(self, ponto):
+        """Gera, em ordem, os intervalos que contêm `ponto`"""
+        return self.sobrepostos(ponto, ponto)
+
+    def algum_sobreposto(self, inicio, fim):
+        """Retorna um intervalo que se sobrepõe a [inicio, fim], ou None, em O(log n)"""
+        nil = self.NIL
+        no = self.raiz
+        while no is not nil:
+            valor = no.valor
+            if not (fim < valor[0] or valor[1] < inicio):
+                return valor
+            # Se a esquerda alcança `inicio`, ou ela tem uma resposta ou
+            # nenhum intervalo à direita (que começam depois) tem
+            if no.esquerda is not nil and not (no.esquerda.maximo < inicio):
+                no = no.esquerda
+            else:
+                no = no.direita
+        return None
+
+    def estatisticas(self):
+        resultado = super().estatisticas()
+        if self.raiz is not self.NIL:
+            resultado["maior_fim"] = self.raiz.maximo
+        return resultado
@@ -1,22 +1,129 @@
+from itertools import repeat
+from operator import attrgetter
+
+from .construcao import encadear_ordenados, gc_pausado
+from . import cache, diario, instrumentacao, visualizacao
+from .arvore_binaria import ArvoreBinaria
+from .multiconjunto import Multiconjunto
+from .persistencia import ARVORE_RN, abrir_snapshot, salvar_snapshot
+
+
 class NoRubroNegro:
-    """Nó da árvore Rubro-Negra com valor, cor e referências"""
+    """Nó da árvore Rubro-Negra com valor, dado, cor, tamanho e referências"""
     
-    __slots__ = ("valor", "cor", "esquerda", "direita", "pai")
+    __slots__ = ("valor", "dado", "cor", "esquerda", "direita", "pai", "tamanho")
     
-    def __init__(self, valor=None, cor='PRETO', esquerda=None, direita=None, pai=None):
+    def __init__(self, valor=None, cor='PRETO', esquerda=None, direita=None, pai=None, tamanho=1, dado=None):
         self.valor = valor
+        self.dado = dado     # Carga associada à chave (modo mapa)
         self.cor = cor       # 'PRETO' ou 'VERMELHO'
         self.esquerda = esquerda
         self.direita = direita
         self.pai = pai
+        self.tamanho = tamanho  # Quantidade de nós da sub-árvore (0 no sentinela)
+
+
+# Sentinela compartilhado por todas as árvores. Nunca é modificado (a remoção
+# acompanha o pai de x explicitamente), o que permite mover nós entre árvores
+# em split/join sem religar folhas.
+NIL = NoRubroNegro(cor='PRETO', tamanho=0)
+
+# Acesso aos nós para o módulo de visualização
+_filhos = attrgetter("esquerda", "direita")
+_valor = attrgetter("valor")
+_tamanho_no = attrgetter("tamanho")
+
+
+def _rotulo_colorido(no):
+    cor = '\033[91m' if no.cor == 'VERMELHO' else '\033[90m' # Vermelho ou Cinza para Preto
+    return f"{cor}{no.valor} ({no.cor})\033[0m"
+
+
+def _rotulo(no):
+    return f"{no.valor} ({no.cor})"
+
+
+def _atributos(no):
+    cor = "red" if no.cor == 'VERMELHO' else "black"
+    return f"style=filled, fillcolor={cor}, fontcolor=white"
+
+
+def _campos(no):
+    campos = {"cor": no.cor}
+    if no.dado is not None:
+        campos["dado"] = no.dado
+    return campos
+
+class ArvoreRubroNegra(ArvoreBinaria):
+    """Implementação de árvore Rubro-Negra com recoloração e rotações.
+
+    Também funciona como mapa ordenado (`put`, `get`, `pop`, `items`). A
+    função opcional `key` normaliza as chaves do mapa; seu resultado é
+    calculado uma vez e guardado no nó.
+    """
 
-class ArvoreRubroNegra:
-    """Implementação de árvore Rubro-Negra com recoloração e rotações"""
+    _No = NoRubroNegro  # classe dos nós; as árvores aumentadas usam uma subclasse
+    _atributos_dot = staticmethod(_atributos)
+    _campos_json = staticmethod(_campos)
 
-    def __init__(self):
-        self.NIL = NoRubroNegro(cor='PRETO')  # Nó sentinela
+    def __init__(self, key=None):
+        self.NIL = NIL  # Nó sentinela
         self.raiz = self.NIL
+        self._funcao_chave = key
+        self._diario = None  # diário de mutações (veja `recuperar`)
+        self._metricas = None  # contadores (veja `instrumentar`)
+        self._cache = None  # cache de buscas (veja `ativar_cache`)
         self._tamanho = 0
+        self._modificacoes = 0  # invalida iteradores em andamento
+        self._altura = None  # (modificações, altura) da última medição
+
+    @classmethod
+    def from_sorted(cls, valores):
+        """Constrói uma árvore válida a partir de valores ordenados em O(n).
+
+        Aceita qualquer iterável, inclusive geradores. Entradas fora de ordem
+        ou com duplicatas são ordenadas e deduplicadas (O(n log n)). A árvore
+        gerada é completa exceto pelo último nível, cujos nós ficam vermelhos;
+        todos os demais são pretos, o que iguala a altura negra dos caminhos.
+        """
+        arvore = cls()
+        arvore._construir(valores)
+        return arvore
+
+    def _construir(self, valores):
+        """Substitui o conteúdo da árvore pelos valores dados, em O(n)"""
+        with gc_pausado():
+            self._montar(*encadear_ordenados(valores, self._No))
+
+    def _montar(self, primeiro, n):
+        """Substitui o conteúdo pela cadeia ordenada de `n` nós (via `direita`)"""
+        nil = self.NIL
+        atual = primeiro
+        ultimo_nivel = n.bit_length() - 1
+
+        def construir(n, profundidade):
+            nonlocal atual
+            if n == 0:
+                return nil
+            esq = construir((n - 1) // 2, profundidade + 1)
+            no = atual
+            atual = no.direita
+            dir = construir(n - 1 - (n - 1) // 2, profundidade + 1)
+            no.esquerda = esq
+            no.direita = dir
+            if esq is not nil:
+                esq.pai = no
+            if dir is not nil:
+                dir.pai = no
+            no.tamanho = n
+            no.cor = 'VERMELHO' if 0 < profundidade == ultimo_nivel else 'PRETO'
+            return no
+
+        self.raiz = construir(n, 0)
+        if n:
+            self.raiz.pai = nil
+        self._tamanho = n
+        self._modificacoes += 1
 
     def rotacao_esquerda(self, no):
         """Executa rotação à esquerda mantendo propriedades RN"""
@@ -33,6 +140,8 @@ class ArvoreRubroNegra:
             no.pai.direita = y
         y.esquerda = no
         no.pai = y
+        y.tamanho = no.tamanho
+        no.tamanho = no.esquerda.tamanho + no.direita.tamanho + 1
 
     def rotacao_direita(self, y):
         """Executa rotação à direita mantendo propriedades RN"""
@@ -49,18 +158,30 @@ class ArvoreRubroNegra:
             y.pai.esquerda = x
         x.direita = y
         y.pai = x
+        x.tamanho = y.tamanho
+        y.tamanho = y.esquerda.tamanho + y.direita.tamanho + 1
 
     def _fixar_insercao(self, z):
-        """Restaura propriedades da árvore Rubro-Negra após inserção"""
+        """Restaura propriedades da árvore Rubro-Negra após inserção.
+
+        Retorna True se a altura negra da árvore aumentou.
+        """
+        metricas = self._metricas
         while z.pai is not self.NIL and z.pai.cor == 'VERMELHO':
+            if metricas is not None:
+                metricas.iteracoes_fixacao += 1
             if z.pai is z.pai.pai.esquerda:
                 y = z.pai.pai.direita
                 if y is not self.NIL and y.cor == 'VERMELHO':
+                    if metricas is not None:
+                        metricas.recoloracoes += 3
                     z.pai.cor = 'PRETO'
                     y.cor = 'PRETO'
                     z.pai.pai.cor = 'VERMELHO'
                     z = z.pai.pai
                 else:
+                    if metricas is not None:
+                        metricas.recoloracoes += 2
                     if z is z.pai.direita:
                         z = z.pai
                         self.rotacao_esquerda(z)
@@ -70,18 +191,28 @@ class ArvoreRubroNegra:
             else:
                 y = z.pai.pai.esquerda
                 if y is not self.NIL and y.cor == 'VERMELHO':
+                    if metricas is not None:
+                        metricas.recoloracoes += 3
                     z.pai.cor = 'PRETO'
                     y.cor = 'PRETO'
                     z.pai.pai.cor = 'VERMELHO'
                     z = z.pai.pai
                 else:
+                    if metricas is not None:
+                        metricas.recoloracoes += 2
                     if z is z.pai.esquerda:
                         z = z.pai
                         self.rotacao_direita(z)
                     z.pai.cor = 'PRETO'
                     z.pai.pai.cor = 'VERMELHO'
                     self.rotacao_esquerda(z.pai.pai)
+        # A raiz só termina vermelha se a recoloração subiu até ela; ao
+        # pintá-la de preto a altura negra da árvore cresce em um.
+        cresceu = self.raiz.cor == 'VERMELHO'
         self.raiz.cor = 'PRETO'
+        if cresceu and metricas is not None:
+            metricas.recoloracoes += 1
+        return cresceu
 
     def _transplantar(self, u, v):
         """Substitui um subtree pela outra"""
@@ -91,7 +222,8 @@ class ArvoreRubroNegra:
             u.pai.esquerda = v
         else:
             u.pai.direita = v
-        v.pai = u.pai
+        if v is not self.NIL:
+            v.pai = u.pai
 
     def _minimo(self, x):
         """Retorna o nó com o menor valor em uma árvore"""
@@ -99,137 +231,498 @@ class ArvoreRubroNegra:
             x = x.esquerda
         return x
 
-    def _fixar_remocao(self, x):
-        """Restaura propriedades da árvore Rubro-Negra após remoção"""
+    def _fixar_remocao(self, x, pai):
+        """Restaura propriedades da árvore Rubro-Negra após remoção.
+
+        `pai` é o pai de x, passado à parte porque x pode ser o sentinela.
+        """
+        metricas = self._metricas
         while x is not self.raiz and x.cor == 'PRETO':
-            if x is x.pai.esquerda:
-                w = x.pai.direita
+            # Atribuições de cor por caso: irmão vermelho 2, irmão com
+            # filhos pretos 1, sobrinho próximo vermelho 2, caso final 3
+            recoloracoes = 0
+            if x is pai.esquerda:
+                w = pai.direita
                 if w.cor == 'VERMELHO':
                     w.cor = 'PRETO'
-                    x.pai.cor = 'VERMELHO'
-                    self.rotacao_esquerda(x.pai)
-                    w = x.pai.direita
+                    pai.cor = 'VERMELHO'
+                    self.rotacao_esquerda(pai)
+                    w = pai.direita
+                    recoloracoes = 2
                 if w.esquerda.cor == 'PRETO' and w.direita.cor == 'PRETO':
                     w.cor = 'VERMELHO'
-                    x = x.pai
+                    x = pai
+                    pai = x.pai
+                    recoloracoes += 1
                 else:
                     if w.direita.cor == 'PRETO':
                         w.esquerda.cor = 'PRETO'
                         w.cor = 'VERMELHO'
                         self.rotacao_direita(w)
-                        w = x.pai.direita
-                    w.cor = x.pai.cor
-                    x.pai.cor = 'PRETO'
+                        w = pai.direita
+                        recoloracoes += 2
+                    w.cor = pai.cor
+                    pai.cor = 'PRETO'
                     w.direita.cor = 'PRETO'
-                    self.rotacao_esquerda(x.pai)
+                    self.rotacao_esquerda(pai)
                     x = self.raiz
+                    recoloracoes += 3
             else:
-                w = x.pai.esquerda
+                w = pai.esquerda
                 if w.cor == 'VERMELHO':
                     w.cor = 'PRETO'
-                    x.pai.cor = 'VERMELHO'
-                    self.rotacao_direita(x.pai)
-                    w = x.pai.esquerda
+                    pai.cor = 'VERMELHO'
+                    self.rotacao_direita(pai)
+                    w = pai.esquerda
+                    recoloracoes = 2
                 if w.direita.cor == 'PRETO' and w.esquerda.cor == 'PRETO':
                     w.cor = 'VERMELHO'
-                    x = x.pai
+                    x = pai
+                    pai = x.pai
+                    recoloracoes += 1
                 else:
                     if w.esquerda.cor == 'PRETO':
                         w.direita.cor = 'PRETO'
                         w.cor = 'VERMELHO'
                         self.rotacao_esquerda(w)
-                        w = x.pai.esquerda
-                    w.cor = x.pai.cor
-                    x.pai.cor = 'PRETO'
+                        w = pai.esquerda
+                        recoloracoes += 2
+                    w.cor = pai.cor
+                    pai.cor = 'PRETO'
                     w.esquerda.cor = 'PRETO'
-                    self.rotacao_direita(x.pai)
+                    self.rotacao_direita(pai)
                     x = self.raiz
-        x.cor = 'PRETO'
+                    recoloracoes += 3
+            if metricas is not None:
+                metricas.iteracoes_fixacao += 1
+                metricas.recoloracoes += recoloracoes
+        if x is not self.NIL:
+            if metricas is not None and x.cor == 'VERMELHO':
+                metricas.recoloracoes += 1
+            x.cor = 'PRETO'
+
+    def _raiz_e_vazio(self):
+        return self.raiz, self.NIL
+
+    def _fabrica_no(self):
+        return self._No
+
+    # --- Snapshot binário ---
+    def salvar(self, caminho):
+        """Grava um snapshot binário: chaves em ordem, profundidade e cor.
+
+        Cada nó ocupa um byte de forma: profundidade nos 7 bits baixos (a
+        altura de uma Rubro-Negra não passa de 2·log2(n + 1)) e o bit alto
+        ligado se o nó for vermelho.
+        """
+        nil = self.NIL
+        nos = []
+        forma = bytearray()
+        pilha = []
+        no, profundidade = self.raiz, 0
+        while pilha or no is not nil:
+            while no is not nil:
+                pilha.append((no, profundidade))
+                no = no.esquerda
+                profundidade += 1
+            no, profundidade = pilha.pop()
+            nos.append(no)
+            forma.append(profundidade | (0x80 if no.cor == 'VERMELHO' else 0))
+            no = no.direita
+            profundidade += 1
+        salvar_snapshot(caminho, ARVORE_RN, nos, forma)
+
+    @classmethod
+    def carregar(cls, caminho, key=None):
+        """Restaura um snapshot de `salvar` com a mesma forma e cores, em O(n)"""
+        arvore = cls(key=key)
+        with abrir_snapshot(caminho, ARVORE_RN) as (_, forma, chaves, dados):
+            with gc_pausado():
+                arvore._restaurar(chaves, forma, repeat(None) if dados is None else dados)
+        return arvore
+
+    def _restaurar(self, chaves, forma, dados):
+        """Refaz a forma gravada sem rotações nem recolorações.
+
+        Em ordem, a raiz de cada sub-árvore é o único nó de menor
+        profundidade do seu trecho, então a árvore é a cartesiana das
+        profundidades: uma pilha com a espinha direita da parte já montada
+        basta. Os tamanhos são fechados quando cada nó sai da pilha.
+        """
+        nil = self.NIL
+        criar_no = self._No
+        pilha = []
+        profundidades = []
+        for valor, byte, dado in zip(chaves, forma, dados):
+            profundidade = byte & 0x7F
+            no = criar_no(valor, 'VERMELHO' if byte & 0x80 else 'PRETO', nil, nil, nil, 1, dado)
+            ultimo = nil
+            while profundidades and profundidades[-1] > profundidade:
+                profundidades.pop()
+                ultimo = pilha.pop()
+                ultimo.tamanho = ultimo.esquerda.tamanho + ultimo.direita.tamanho + 1
+            if ultimo is not nil:
+                no.esquerda = ultimo
+                ultimo.pai = no
+            if pilha:
+                pilha[-1].direita = no
+                no.pai = pilha[-1]
+            pilha.append(no)
+            profundidades.append(profundidade)
+        raiz = nil
+        while pilha:
+            raiz = pilha.pop()
+            raiz.tamanho = raiz.esquerda.tamanho + raiz.direita.tamanho + 1
+        self.raiz = raiz
+        self._tamanho = raiz.tamanho
+        self._modificacoes += 1
+
+    def _listar_nos(self):
+        """Lista os nós em ordem (antes de religá-los numa reconstrução)"""
+        nil = self.NIL
+        nos = []
+        pilha = []
+        no = self.raiz
+        while pilha or no is not nil:
+            while no is not nil:
+                pilha.append(no)
+                no = no.esquerda
+            no = pilha.pop()
+            nos.append(no)
+            no = no.direita
+        return nos
 
     # --- API pública esperada pelos testes ---
     def inserir(self, valor):
-        novo = NoRubroNegro(valor, cor='VERMELHO', esquerda=self.NIL, direita=self.NIL, pai=self.NIL)
-        y = self.NIL
+        if self._inserir_no(valor)[1] and self._diario is not None:
+            self._diario.registrar(diario.INSERIR, valor)
+
+    def _inserir_no(self, valor, dado=None):
+        """Insere `valor` (com `dado`) se ausente; retorna (nó com o valor, se foi inserido).
+
+        Faz uma única comparação (`<`) por nível: o último nó em que a descida
+        foi à direita é o único candidato a igual e é conferido uma vez no fim.
+        """
+        nil = self.NIL
+        y = nil
+        candidato = nil
         x = self.raiz
-        while x is not self.NIL:
+        while x is not nil:
             y = x
-            if novo.valor < x.valor:
+            if valor < x.valor:
                 x = x.esquerda
-            elif novo.valor > x.valor:
-                x = x.direita
             else:
-                return  # não insere duplicatas
-        novo.pai = y
-        if y is self.NIL:
+                candidato = x
+                x = x.direita
+        if candidato is not nil and not (candidato.valor < valor):
+            return candidato, False  # não insere duplicatas
+        novo = self._No(valor, cor='VERMELHO', esquerda=nil, direita=nil, pai=y, dado=dado)
+        if y is nil:
             self.raiz = novo
-        elif novo.valor < y.valor:
-            y.esquerda = novo
-        else:
+        elif y is candidato:  # a última descida foi à direita
             y.direita = novo
+        else:
+            y.esquerda = novo
+        while y is not nil:
+            y.tamanho += 1
+            y = y.pai
         self._fixar_insercao(novo)
         self._tamanho += 1
+        self._modificacoes += 1
+        return novo, True
+
+    # --- Modo mapa (chave -> dado) ---
+    def get(self, chave, padrao=None):
+        """Retorna o dado associado à chave, ou `padrao` se ela não existir"""
+        if self._funcao_chave is not None:
+            chave = self._funcao_chave(chave)
+        no = self._buscar_no(self.raiz, chave)
+        return padrao if no is self.NIL else no.dado
+
+    def pop(self, chave, *padrao):
+        """Remove a chave e retorna seu dado (KeyError ou `padrao` se ausente)"""
+        if self._funcao_chave is not None:
+            chave = self._funcao_chave(chave)
+        z = self._buscar_no(self.raiz, chave)
+        if z is self.NIL:
+            if padrao:
+                return padrao[0]
+            raise KeyError(chave)
+        self._remover_no(z)
+        self._tamanho -= 1
+        self._modificacoes += 1
+        if self._diario is not None:
+            self._diario.registrar(diario.REMOVER, chave)
+        return z.dado
 
+    # --- Busca e percurso ---
     def _buscar_no(self, node, valor):
+        # Uma comparação por nível; a igualdade é conferida só no fim
+        nil = self.NIL
+        candidato = nil
         x = node
-        while x is not self.NIL:
-            if valor == x.valor:
-                return x
+        while x is not nil:
             if valor < x.valor:
                 x = x.esquerda
             else:
+                candidato = x
                 x = x.direita
-        return self.NIL
+        if candidato is not nil and not (candidato.valor < valor):
+            return candidato
+        return nil
 
     def buscar(self, valor):
         node = self._buscar_no(self.raiz, valor)
         return None if node is self.NIL else node
 
-    def em_ordem(self):
-        out = []
-        def _inorder(n):
-            if n is self.NIL:
-                return
-            _inorder(n.esquerda)
-            out.append(n.valor)
-            _inorder(n.direita)
-        _inorder(self.raiz)
-        return out
+    def iterar(self, desde=None, ate=None, reverso=False):
+        """Gera os valores em ordem, opcionalmente restritos a [desde, ate].
 
-    def imprimir(self):
-        self.mostrar_arvore(self.raiz)
+        Localiza o primeiro nó em O(log n) e avança pelos ponteiros `pai`
+        (O(1) amortizado por passo, memória O(1)). Levanta RuntimeError se
+        a árvore for modificada durante a iteração.
+        """
+        return self._percorrer(desde, ate, reverso, False)
+
+    def _percorrer(self, desde, ate, reverso, pares):
+        nil = self.NIL
+        versao = self._modificacoes
+        if self.raiz is nil:
+            return
+        if not reverso:
+            no = self._minimo(self.raiz) if desde is None else self._teto_no(desde)
+            while no is not nil:
+                if ate is not None and ate < no.valor:
+                    return
+                yield (no.valor, no.dado) if pares else no.valor
+                if self._modificacoes != versao:
+                    raise RuntimeError("árvore modificada durante a iteração")
+                # Sucessor embutido no laço (evita uma chamada por passo)
+                if no.direita is not nil:
+                    no = no.direita
+                    while no.esquerda is not nil:
+                        no = no.esquerda
+                else:
+                    pai = no.pai
+                    while pai is not nil and no is pai.direita:
+                        no = pai
+                        pai = pai.pai
+                    no = pai
+        else:
+            no = self._maximo(self.raiz) if ate is None else self._piso_no(ate)
+            while no is not nil:
+                if desde is not None and no.valor < desde:
+                    return
+                yield (no.valor, no.dado) if pares else no.valor
+                if self._modificacoes != versao:
+                    raise RuntimeError("árvore modificada durante a iteração")
+                if no.esquerda is not nil:
+                    no = no.esquerda
+                    while no.direita is not nil:
+                        no = no.direita
+                else:
+                    pai = no.pai
+                    while pai is not nil and no is pai.esquerda:
+                        no = pai
+                        pai = pai.pai
+                    no = pai
+
+    # --- Vizinhos e intervalos ---
+    def _maximo(self, x):
+        """Retorna o nó com o maior valor em uma árvore"""
+        while x.direita is not self.NIL:
+            x = x.direita
+        return x
+
+    def _piso_no(self, valor):
+        """Nó com o maior valor <= `valor` (ou NIL)"""
+        candidato = self.NIL
+        x = self.raiz
+        while x is not self.NIL:
+            if valor < x.valor:
+                x = x.esquerda
+            else:
+                candidato = x
+                x = x.direita
+        return candidato
+
+    def _teto_no(self, valor):
+        """Nó com o menor valor >= `valor` (ou NIL)"""
+        candidato = self.NIL
+        x = self.raiz
+        while x is not self.NIL:
+            if x.valor < valor:
+                x = x.direita
+            else:
+                candidato = x
+                x = x.esquerda
+        return candidato
+
+    def piso(self, valor):
+        """Retorna o maior valor <= `valor`, ou None"""
+        return self._piso_no(valor).valor
+
+    def teto(self, valor):
+        """Retorna o menor valor >= `valor`, ou None"""
+        return self._teto_no(valor).valor
+
+    def sucessor(self, valor):
+        """Retorna o menor valor estritamente maior que `valor`, ou None"""
+        candidato = self.NIL
+        x = self.raiz
+        while x is not self.NIL:
+            if valor < x.valor:
+                candidato = x
+                x = x.esquerda
+            else:
+                x = x.direita
+        return candidato.valor
+
+    def antecessor(self, valor):
+        """Retorna o maior valor estritamente menor que `valor`, ou None"""
+        candidato = self.NIL
+        x = self.raiz
+        while x is not self.NIL:
+            if x.valor < valor:
+                candidato = x
+                x = x.direita
+            else:
+                x = x.esquerda
+        return candidato.valor
+
+    def contar_intervalo(self, lo, hi):
+        """Conta os valores em [lo, hi] em O(log n) usando os tamanhos"""
+        if hi < lo:
+            return 0
+        ate_hi = 0
+        no = self.raiz
+        while no is not self.NIL:
+            if hi < no.valor:
+                no = no.esquerda
+            else:
+                ate_hi += no.esquerda.tamanho + 1
+                no = no.direita
+        return ate_hi - self.posicao(lo)
+
+    # --- Instrumentação ---
+    def instrumentar(self, gancho=None):
+        """Liga (ou zera) os contadores de comparações, caminhos, rotações,
+        recolorações e iterações da fixação.
+
+        Se dado, `gancho(operacao, dados)` é chamado depois de cada
+        operação individual com os números dela.
+        """
+        self.desinstrumentar()
+        self._metricas = instrumentacao.Metricas(
+            ("rotacoes", "recoloracoes", "iteracoes_fixacao"), gancho)
+        if self._cache is not None:
+            cache.descobrir(self._cache)  # as descidas contadas ficam por baixo do cache
+        instrumentacao.contar_rotacoes(self, self._metricas)
+        instrumentacao.contar_comparacoes(self, self._metricas, instrumentacao.DESCIDAS_RN)
+        instrumentacao.medir_operacoes(self, self._metricas)
+        if self._cache is not None:
+            self._encobrir_cache()
+
+    def desinstrumentar(self):
+        if self._cache is not None:
+            cache.descobrir(self._cache)
+        instrumentacao.remover_medicoes(self)
+        self._metricas = None
+        if self._cache is not None:
+            self._encobrir_cache()
+
+    # --- Cache de buscas ---
+    def _encobrir_cache(self):
+        # Por cima da instrumentação, se houver
+        cache.encobrir_busca(self, "_buscar_no", self._cache)
+        cache.invalidar_rn(self, self._cache)
+        cache.limpar_em(self, ("_montar", "_definir_raiz"), self._cache)
+
+    def altura(self):
+        """Altura da árvore em nós (0 se vazia).
+
+        Percorre a árvore (O(n)) só se ela mudou desde a última medição;
+        até a próxima mutação, a altura guardada é devolvida em O(1).
+        """
+        if self._altura is not None and self._altura[0] == self._modificacoes:
+            return self._altura[1]
+        nil = self.NIL
+        maior = 0
+        pilha = [(self.raiz, 1)] if self.raiz is not nil else []
+        while pilha:
+            no, nivel = pilha.pop()
+            if nivel > maior:
+                maior = nivel
+            if no.esquerda is not nil:
+                pilha.append((no.esquerda, nivel + 1))
+            if no.direita is not nil:
+                pilha.append((no.direita, nivel + 1))
+        self._altura = (self._modificacoes, maior)
+        return maior
+
+    # --- Visualização ---
+    def imprimir(self, profundidade=None, chave=None, acima=0, saida=None):
+        """Desenha a árvore em texto, direita acima da esquerda.
+
+        `profundidade` limita os níveis desenhados; com `chave`, desenha só
+        a sub-árvore do nó com essa chave (ou do último nó da busca), a
+        partir de `acima` níveis acima dele. `saida` é um arquivo de texto
+        ou um caminho (padrão: saída padrão); as cores só vão para terminais.
+        """
+        raiz = self.raiz
+        if chave is not None:
+            if self._funcao_chave is not None:
+                chave = self._funcao_chave(chave)
+            raiz = visualizacao.localizar(raiz, self.NIL, _filhos, _valor, chave, acima)
+        rotulo = _rotulo_colorido if visualizacao.em_terminal(saida) else _rotulo
+        visualizacao.escrever(visualizacao.linhas(raiz, self.NIL, _filhos, rotulo,
+                                                  profundidade, _tamanho_no), saida)
 
     def mostrar_arvore(self, no, prefixo="", is_esq=True):
-        if no is not self.NIL:
-            cor = '\033[91m' if no.cor == 'VERMELHO' else '\033[90m' # Vermelho ou Cinza para Preto
-            reset = '\033[0m'
-            print(prefixo + ("└── " if is_esq else "┌── ") + f"{cor}{no.valor} ({no.cor}){reset}")
-            if no.esquerda is not self.NIL or no.direita is not self.NIL:
-                novo_prefixo = prefixo + ("    " if is_esq else "│   ")
-                self.mostrar_arvore(no.direita, novo_prefixo, False)
-                self.mostrar_arvore(no.esquerda, novo_prefixo, True)
-
-    def obter_tamanho(self):
-        return self._tamanho
+        """Desenha a sub-árvore de `no` na saída padrão (sem recursão)"""
+        rotulo = _rotulo_colorido if visualizacao.em_terminal(None) else _rotulo
+        visualizacao.escrever(visualizacao.linhas(no, self.NIL, _filhos, rotulo,
+                                                  prefixo=prefixo, is_esq=is_esq))
 
+    # --- Remoção ---
     def remover(self, valor):
         z = self._buscar_no(self.raiz, valor)
         if z is self.NIL:
             return False
+        self._remover_no(z)
+        self._tamanho -= 1
+        self._modificacoes += 1
+        if self._diario is not None:
+            self._diario.registrar(diario.REMOVER, valor)
+        return True
+
+    def _remover_no(self, z):
+        """Desliga o nó z da árvore, mantendo tamanhos e cores"""
         y = z
         y_original_color = y.cor
+        # O nó que sai fisicamente da árvore é z (até 1 filho) ou o sucessor
+        # de z; todos os seus ancestrais perdem um descendente.
+        removido = z if z.esquerda is self.NIL or z.direita is self.NIL else self._minimo(z.direita)
+        ancestral = removido.pai
+        while ancestral is not self.NIL:
+            ancestral.tamanho -= 1
+            ancestral = ancestral.pai
         if z.esquerda is self.NIL:
             x = z.direita
+            x_pai = z.pai
             self._transplantar(z, z.direita)
         elif z.direita is self.NIL:
             x = z.esquerda
+            x_pai = z.pai
             self._transplantar(z, z.esquerda)
         else:
-            y = self._minimo(z.direita)
+            y = removido
             y_original_color = y.cor
             x = y.direita
             if y.pai is z:
-                x.pai = y
+                x_pai = y
             else:
+                x_pai = y.pai
                 self._transplantar(y, y.direita)
                 y.direita = z.direita
                 y.direita.pai = y
@@ -237,11 +730,283 @@ class ArvoreRubroNegra:
             y.esquerda = z.esquerda
             y.esquerda.pai = y
             y.cor = z.cor
+            y.tamanho = z.tamanho
         if y_original_color == 'PRETO':
-            # x pode ser self.NIL; _fixar_remocao trata sentinel corretamente
-            self._fixar_remocao(x)
-        self._tamanho -= 1
-        return True
+            # x pode ser self.NIL; seu pai é passado explicitamente
+            self._fixar_remocao(x, x_pai)
+
+    # --- Junção e divisão (base das operações de conjunto) ---
+    # Os métodos com raízes como argumento usam self.raiz como registrador de
+    # trabalho, pois as rotações e as correções atualizam a raiz por ele.
+    # Cada sub-árvore circula junto com sua altura negra (contando a raiz
+    # como preta), para que nenhuma junção precise medi-la de novo.
+    def _altura_negra(self, x):
+        """Altura negra de x como raiz (pintada de preto), sem o sentinela"""
+        if x is self.NIL:
+            return 0
+        h = 1
+        x = x.esquerda
+        while x is not self.NIL:
+            if x.cor == 'PRETO':
+                h += 1
+            x = x.esquerda
+        return h
+
+    @staticmethod
+    def _altura_negra_filho(altura_pai, filho):
+        """Altura negra de `filho` como raiz, dada a do pai em O(1)"""
+        return altura_pai - 1 + (filho.cor == 'VERMELHO')
+
+    def _juntar(self, esq, no, dir, be, bd):
+        """Une as árvores esq < no < dir; retorna (raiz, altura negra).
+
+        Desce pela espinha da árvore de maior altura negra até um nó preto
+        com a altura negra da outra, pendura `no` (vermelho) ali e corrige
+        como numa inserção. Custo O(|be - bd| + 1).
+        """
+        nil = self.NIL
+        for raiz in (esq, dir):
+            if raiz is not nil:
+                raiz.pai = nil
+                raiz.cor = 'PRETO'
+        if be == bd:
+            no.esquerda = esq
+            no.direita = dir
+            no.pai = nil
+            no.cor = 'PRETO'
+            if esq is not nil:
+                esq.pai = no
+            if dir is not nil:
+                dir.pai = no
+            no.tamanho = esq.tamanho + dir.tamanho + 1
+            self.raiz = no
+            return no, be + 1
+        no.cor = 'VERMELHO'
+        if be > bd:
+            self.raiz = esq
+            c = esq
+            h = be
+            while h > bd or c.cor == 'VERMELHO':
+                if c.cor == 'PRETO':
+                    h -= 1
+                pai = c
+                c = c.direita
+            pai.direita = no
+            no.esquerda = c
+            no.direita = dir
+            acrescimo = dir.tamanho + 1
+        else:
+            self.raiz = dir
+            c = dir
+            h = bd
+            while h > be or c.cor == 'VERMELHO':
+                if c.cor == 'PRETO':
+                    h -= 1
+                pai = c
+                c = c.esquerda
+            pai.esquerda = no
+            no.esquerda = esq
+            no.direita = c
+            acrescimo = esq.tamanho + 1
+        no.pai = pai
+        for filho in (no.esquerda, no.direita):
+            if filho is not nil:
+                filho.pai = no
+        no.tamanho = no.esquerda.tamanho + no.direita.tamanho + 1
+        while pai is not nil:
+            pai.tamanho += acrescimo
+            pai = pai.pai
+        cresceu = self._fixar_insercao(no)
+        return self.raiz, max(be, bd) + cresceu
+
+    def _dividir(self, raiz, bh, chave):
+        """Divide em (menores, bh, nó igual a `chave` ou None, maiores, bh).
+
+        As junções ao longo do caminho têm custo telescópico: O(log n).
+        """
+        nil = self.NIL
+        caminho = []
+        no = raiz
+        while no is not nil:
+            if chave < no.valor:
+                caminho.append((no, True, bh))
+                bh = self._altura_negra_filho(bh, no.esquerda)
+                no = no.esquerda
+            elif no.valor < chave:
+                caminho.append((no, False, bh))
+                bh = self._altura_negra_filho(bh, no.direita)
+                no = no.direita
+            else:
+                break
+        if no is not nil:
+            esq, dir = no.esquerda, no.direita
+            be = self._altura_negra_filho(bh, esq)
+            bd = self._altura_negra_filho(bh, dir)
+            encontrado = no
+        else:
+            esq = dir = nil
+            be = bd = 0
+            encontrado = None
+        for pai, foi_esquerda, bh_pai in reversed(caminho):
+            if foi_esquerda:
+                outra = pai.direita
+                dir, bd = self._juntar(dir, pai, outra, bd, self._altura_negra_filho(bh_pai, outra))
+            else:
+                outra = pai.esquerda
+                esq, be = self._juntar(outra, pai, esq, self._altura_negra_filho(bh_pai, outra), be)
+        return esq, be, encontrado, dir, bd
+
+    def _juntar2(self, esq, be, dir):
+        """Une esq < dir sem chave intermediária (usa o mínimo de dir)"""
+        if dir is self.NIL:
+            return esq, be
+        dir.pai = self.NIL
+        dir.cor = 'PRETO'
+        self.raiz = dir
+        meio = self._minimo(dir)
+        self._remover_no(meio)
+        # A remoção já custa O(log n); medir a altura negra não muda a ordem
+        dir = self.raiz
+        return self._juntar(esq, meio, dir, be, self._altura_negra(dir))
+
+    def _uniao(self, a, ba, b, bb, dados_de_b=False):
+        # Nas chaves repetidas fica o nó de `a` (com o dado de `b`, se pedido)
+        if a is self.NIL:
+            return b, bb
+        if b is self.NIL:
+            return a, ba
+        esq, dir = a.esquerda, a.direita
+        bh_esq = self._altura_negra_filho(ba, esq)
+        bh_dir = self._altura_negra_filho(ba, dir)
+        b_esq, bh_b_esq, igual, b_dir, bh_b_dir = self._dividir(b, bb, a.valor)
+        if dados_de_b and igual is not None:
+            a.dado = igual.dado
+        esq, bh_esq = self._uniao(esq, bh_esq, b_esq, bh_b_esq, dados_de_b)
+        dir, bh_dir = self._uniao(dir, bh_dir, b_dir, bh_b_dir, dados_de_b)
+        return self._juntar(esq, a, dir, bh_esq, bh_dir)
+
+    def _intersecao(self, a, ba, b, bb):
+        if a is self.NIL or b is self.NIL:
+            return self.NIL, 0
+        esq, dir = a.esquerda, a.direita
+        bh_esq = self._altura_negra_filho(ba, esq)
+        bh_dir = self._altura_negra_filho(ba, dir)
+        b_esq, bh_b_esq, igual, b_dir, bh_b_dir = self._dividir(b, bb, a.valor)
+        esq, bh_esq = self._intersecao(esq, bh_esq, b_esq, bh_b_esq)
+        dir, bh_dir = self._intersecao(dir, bh_dir, b_dir, bh_b_dir)
+        if igual is None:
+            return self._juntar2(esq, bh_esq, dir)
+        return self._juntar(esq, a, dir, bh_esq, bh_dir)
+
+    def _diferenca(self, a, ba, b, bb):
+        if a is self.NIL or b is self.NIL:
+            return a, ba
+        b_esq, b_dir = b.esquerda, b.direita
+        bh_b_esq = self._altura_negra_filho(bb, b_esq)
+        bh_b_dir = self._altura_negra_filho(bb, b_dir)
+        a_esq, bh_a_esq, _, a_dir, bh_a_dir = self._dividir(a, ba, b.valor)
+        esq, bh_esq = self._diferenca(a_esq, bh_a_esq, b_esq, bh_b_esq)
+        dir, _ = self._diferenca(a_dir, bh_a_dir, b_dir, bh_b_dir)
+        return self._juntar2(esq, bh_esq, dir)
+
+    # --- Divisão, junção e álgebra de conjuntos ---
+    # Estas operações reaproveitam os nós das árvores envolvidas: as árvores
+    # passadas como argumento (e a própria, no split) ficam vazias.
+    def _de_raiz(self, raiz):
+        """Nova árvore do mesmo tipo (e mesma função de chave) com a raiz dada"""
+        arvore = type(self)(key=self._funcao_chave)
+        arvore._definir_raiz(raiz)
+        return arvore
+
+    def _definir_raiz(self, raiz, fazer_checkpoint=True):
+        if raiz is not self.NIL:
+            raiz.pai = self.NIL
+            raiz.cor = 'PRETO'
+        self.raiz = raiz
+        self._tamanho = raiz.tamanho
+        self._modificacoes += 1
+        if fazer_checkpoint and self._diario is not None:
+            # Operações estruturais não vão para o diário: viram checkpoint
+            self.checkpoint()
+
+    def split(self, chave):
+        """Divide em (menores que chave, chave presente?, maiores) em O(log n)"""
+        esq, _, no, dir, _ = self._dividir(self.raiz, self._altura_negra(self.raiz), chave)
+        self._definir_raiz(self.NIL)
+        return self._de_raiz(esq), no is not None, self._de_raiz(dir)
+
+    @classmethod
+    def join(cls, esquerda, chave, direita):
+        """Une esquerda < chave < direita numa nova árvore em O(log n)"""
+        if (not esquerda.esta_vazia() and not esquerda.k_esimo(-1) < chave) or (
+                not direita.esta_vazia() and not chave < direita.k_esimo(0)):
+            raise ValueError("join exige max(esquerda) < chave < min(direita)")
+        raiz, _ = esquerda._juntar(esquerda.raiz, esquerda._No(chave), direita.raiz,
+                                   esquerda._altura_negra(esquerda.raiz),
+                                   esquerda._altura_negra(direita.raiz))
+        nova = esquerda._de_raiz(raiz)
+        esquerda._definir_raiz(esquerda.NIL)
+        direita._definir_raiz(direita.NIL)
+        return nova
+
+    def uniao(self, outra):
+        """Acrescenta os valores de `outra` a esta árvore; `outra` fica vazia.
+
+        Como em `dict.update`, nas chaves presentes nas duas vale o dado de `outra`.
+        """
+        if outra is self:
+            return
+        a, b = self.raiz, outra.raiz
+        ba, bb = self._altura_negra(a), self._altura_negra(b)
+        outra_menor = outra._tamanho < self._tamanho
+        outra._definir_raiz(self.NIL)
+        if a is not self.NIL and b is not self.NIL:
+            # Faixas disjuntas (caso típico de split seguido de religação)
+            if self._maximo(a).valor < self._minimo(b).valor:
+                self._definir_raiz(self._juntar2(a, ba, b)[0])
+                return
+            if self._maximo(b).valor < self._minimo(a).valor:
+                self._definir_raiz(self._juntar2(b, bb, a)[0])
+                return
+        if outra_menor:
+            # Divide a maior pelas chaves da menor; os nós de `outra` já vencem
+            raiz, _ = self._uniao(b, bb, a, ba)
+        else:
+            raiz, _ = self._uniao(a, ba, b, bb, dados_de_b=True)
+        self._definir_raiz(raiz)
+
+    def intersecao(self, outra):
+        """Mantém só os valores também presentes em `outra`; `outra` fica vazia"""
+        if outra is self:
+            return
+        a, b = self.raiz, outra.raiz
+        outra._definir_raiz(self.NIL)
+        raiz, _ = self._intersecao(a, self._altura_negra(a), b, self._altura_negra(b))
+        self._definir_raiz(raiz)
+
+    def diferenca(self, outra):
+        """Remove os valores presentes em `outra`; `outra` fica vazia"""
+        if outra is self:
+            self._definir_raiz(self.NIL)
+            return
+        a, b = self.raiz, outra.raiz
+        outra._definir_raiz(self.NIL)
+        raiz, _ = self._diferenca(a, self._altura_negra(a), b, self._altura_negra(b))
+        self._definir_raiz(raiz)
+
+    def remover_intervalo(self, lo, hi):
+        """Remove os valores em [lo, hi] com dois splits e uma junção"""
+        if hi < lo:
+            return 0
+        antes = self._tamanho
+        esq, be, _, resto, bh_resto = self._dividir(self.raiz, self._altura_negra(self.raiz), lo)
+        _, _, _, dir, _ = self._dividir(resto, bh_resto, hi)
+        raiz, _ = self._juntar2(esq, be, dir)
+        self._definir_raiz(raiz, fazer_checkpoint=False)
+        removidos = antes - self._tamanho
+        if removidos and self._diario is not None:
+            self._diario.registrar(diario.REMOVER_INTERVALO, (lo, hi))
+        return removidos
 
-    def esta_vazia(self):
-        return self.raiz is self.NIL
+class ArvoreRubroNegraMulticonjunto(Multiconjunto, ArvoreRubroNegra):
+    """Rubro-Negra em modo multiconjunto: cada nó guarda a contagem do seu valor"""
@@ -0,0 +1,377 @@
+from array import array
+
+from . import visualizacao
+from .interface_arvore import InterfaceArvore
+
+PRETO = 0
+VERMELHO = 1
+
+
+class ArvoreRubroNegraCompacta(InterfaceArvore):
+    """Árvore Rubro-Negra com nós armazenados em arrays paralelos.
+
+    Cada nó é um índice inteiro: `_esq`, `_dir` e `_pai` guardam índices em
+    `array('q')`, `_cor` é um `bytearray` (0 = preto, 1 = vermelho) e
+    `_valores` uma lista. O índice 0 é o sentinela NIL. Slots liberados por
+    `remover` formam uma lista livre encadeada por `_dir` e são reaproveitados
+    pelas inserções seguintes.
+    """
+
+    NIL = 0
+
+    def __init__(self):
+        self._valores = [None]
+        self._esq = array('q', [0])
+        self._dir = array('q', [0])
+        self._pai = array('q', [0])
+        self._cor = bytearray([PRETO])
+        self._livre = 0  # topo da lista livre (0 = vazia)
+        self.raiz = 0
+        self._tamanho = 0
+        self._modificacoes = 0  # invalida iteradores em andamento
+
+    def _novo_no(self, valor, pai):
+        """Aloca um nó vermelho, reaproveitando um slot livre se houver"""
+        i = self._livre
+        if i:
+            self._livre = self._dir[i]
+            self._valores[i] = valor
+            self._esq[i] = 0
+            self._dir[i] = 0
+            self._pai[i] = pai
+            self._cor[i] = VERMELHO
+        else:
+            i = len(self._valores)
+            self._valores.append(valor)
+            self._esq.append(0)
+            self._dir.append(0)
+            self._pai.append(pai)
+            self._cor.append(VERMELHO)
+        return i
+
+    def _liberar(self, i):
+        """Devolve o slot `i` à lista livre"""
+        self._valores[i] = None
+        self._dir[i] = self._livre
+        self._livre = i
+
+    def rotacao_esquerda(self, x):
+        """Executa rotação à esquerda mantendo propriedades RN"""
+        esq, dir, pai = self._esq, self._dir, self._pai
+        y = dir[x]
+        dir[x] = esq[y]
+        if esq[y]:
+            pai[esq[y]] = x
+        pai[y] = pai[x]
+        if not pai[x]:
+            self.raiz = y
+        elif x == esq[pai[x]]:
+            esq[pai[x]] = y
+        else:
+            dir[pai[x]] = y
+        esq[y] = x
+        pai[x] = y
+
+    def rotacao_direita(self, y):
+        """Executa rotação à direita mantendo propriedades RN"""
+        esq, dir, pai = self._esq, self._dir, self._pai
+        x = esq[y]
+        esq[y] = dir[x]
+        if dir[x]:
+            pai[dir[x]] = y
+        pai[x] = pai[y]
+        if not pai[y]:
+            self.raiz = x
+        elif y == dir[pai[y]]:
+            dir[pai[y]] = x
+        else:
+            esq[pai[y]] = x
+        dir[x] = y
+        pai[y] = x
+
+    def _fixar_insercao(self, z):
+        """Restaura propriedades da árvore Rubro-Negra após inserção"""
+        esq, dir, pai, cor = self._esq, self._dir, self._pai, self._cor
+        while cor[pai[z]] == VERMELHO:
+            p = pai[z]
+            g = pai[p]
+            if p == esq[g]:
+                y = dir[g]
+                if cor[y] == VERMELHO:
+                    cor[p] = PRETO
+                    cor[y] = PRETO
+                    cor[g] = VERMELHO
+                    z = g
+                else:
+                    if z == dir[p]:
+                        z = p
+                        self.rotacao_esquerda(z)
+                        p = pai[z]
+                    cor[p] = PRETO
+                    cor[g] = VERMELHO
+                    self.rotacao_direita(g)
+            else:
+                y = esq[g]
+                if cor[y] == VERMELHO:
+                    cor[p] = PRETO
+                    cor[y] = PRETO
+                    cor[g] = VERMELHO
+                    z = g
+                else:
+                    if z == esq[p]:
+                        z = p
+                        self.rotacao_direita(z)
+                        p = pai[z]
+                    cor[p] = PRETO
+                    cor[g] = VERMELHO
+                    self.rotacao_esquerda(g)
+        cor[self.raiz] = PRETO
+
+    def _transplantar(self, u, v):
+        """Substitui um subtree pela outra"""
+        pai = self._pai
+        pu = pai[u]
+        if not pu:
+            self.raiz = v
+        elif u == self._esq[pu]:
+            self._esq[pu] = v
+        else:
+            self._dir[pu] = v
+        pai[v] = pu
+
+    def _minimo(self, x):
+        """Retorna o índice do menor valor em uma sub-árvore"""
+        esq = self._esq
+        while esq[x]:
+            x = esq[x]
+        return x
+
+    def _maximo(self, x):
+        """Retorna o índice do maior valor em uma sub-árvore"""
+        dir = self._dir
+        while dir[x]:
+            x = dir[x]
+        return x
+
+    def _fixar_remocao(self, x):
+        """Restaura propriedades da árvore Rubro-Negra após remoção"""
+        esq, dir, pai, cor = self._esq, self._dir, self._pai, self._cor
+        while x != self.raiz and cor[x] == PRETO:
+            p = pai[x]
+            if x == esq[p]:
+                w = dir[p]
+                if cor[w] == VERMELHO:
+                    cor[w] = PRETO
+                    cor[p] = VERMELHO
+                    self.rotacao_esquerda(p)
+                    w = dir[p]
+                if cor[esq[w]] == PRETO and cor[dir[w]] == PRETO:
+                    cor[w] = VERMELHO
+                    x = p
+                else:
+                    if cor[dir[w]] == PRETO:
+                        cor[esq[w]] = PRETO
+                        cor[w] = VERMELHO
+                        self.rotacao_direita(w)
+                        w = dir[p]
+                    cor[w] = cor[p]
+                    cor[p] = PRETO
+                    cor[dir[w]] = PRETO
+                    self.rotacao_esquerda(p)
+                    x = self.raiz
+            else:
+                w = esq[p]
+                if cor[w] == VERMELHO:
+                    cor[w] = PRETO
+                    cor[p] = VERMELHO
+                    self.rotacao_direita(p)
+                    w = esq[p]
+                if cor[dir[w]] == PRETO and cor[esq[w]] == PRETO:
+                    cor[w] = VERMELHO
+                    x = p
+                else:
+                    if cor[esq[w]] == PRETO:
+                        cor[dir[w]] = PRETO
+                        cor[w] = VERMELHO
+                        self.rotacao_esquerda(w)
+                        w = esq[p]
+                    cor[w] = cor[p]
+                    cor[p] = PRETO
+                    cor[esq[w]] = PRETO
+                    self.rotacao_direita(p)
+                    x = self.raiz
+        cor[x] = PRETO
+
+    # --- API pública (mesma de ArvoreRubroNegra) ---
+    def inserir(self, valor):
+        valores, esq, dir = self._valores, self._esq, self._dir
+        y = 0
+        candidato = 0  # último nó em que a descida foi à direita
+        x = self.raiz
+        while x:
+            y = x
+            if valor < valores[x]:
+                x = esq[x]
+            else:
+                candidato = x
+                x = dir[x]
+        if candidato and not (valores[candidato] < valor):
+            return  # não insere duplicatas
+        novo = self._novo_no(valor, y)
+        if not y:
+            self.raiz = novo
+        elif y == candidato:
+            dir[y] = novo
+        else:
+            esq[y] = novo
+        self._fixar_insercao(novo)
+        self._tamanho += 1
+        self._modificacoes += 1
+
+    def _buscar_no(self, valor):
+        valores, esq, dir = self._valores, self._esq, self._dir
+        candidato = 0
+        x = self.raiz
+        while x:
+            if valor < valores[x]:
+                x = esq[x]
+            else:
+                candidato = x
+                x = dir[x]
+        if candidato and not (valores[candidato] < valor):
+            return candidato
+        return 0
+
+    def buscar(self, valor):
+        """Retorna o índice do nó com `valor`, ou None"""
+        return self._buscar_no(valor) or None
+
+    def remover(self, valor):
+        z = self._buscar_no(valor)
+        if not z:
+            return False
+        esq, dir, pai, cor = self._esq, self._dir, self._pai, self._cor
+        y_original_color = cor[z]
+        if not esq[z]:
+            x = dir[z]
+            self._transplantar(z, x)
+        elif not dir[z]:
+            x = esq[z]
+            self._transplantar(z, x)
+        else:
+            y = self._minimo(dir[z])
+            y_original_color = cor[y]
+            x = dir[y]
+            if pai[y] == z:
+                pai[x] = y
+            else:
+                self._transplantar(y, x)
+                dir[y] = dir[z]
+                pai[dir[y]] = y
+            self._transplantar(z, y)
+            esq[y] = esq[z]
+            pai[esq[y]] = y
+            cor[y] = cor[z]
+        if y_original_color == PRETO:
+            # x pode ser o sentinela 0; o laço usa pai[0] definido acima
+            self._fixar_remocao(x)
+        pai[0] = 0
+        self._liberar(z)
+        self._tamanho -= 1
+        self._modificacoes += 1
+        return True
+
+    def em_ordem(self):
+        return list(self)
+
+    def __iter__(self):
+        return self.iterar()
+
+    def __reversed__(self):
+        return self.iterar(reverso=True)
+
+    def iterar(self, desde=None, ate=None, reverso=False):
+        """Gera os valores em ordem, opcionalmente restritos a [desde, ate].
+
+        Avança pelos índices de pai (memória O(1)) e levanta RuntimeError
+        se a árvore for modificada durante a iteração.
+        """
+        valores, esq, dir, pai = self._valores, self._esq, self._dir, self._pai
+        versao = self._modificacoes
+        x = self.raiz
+        no = 0
+        if not reverso:
+            # primeiro nó >= desde
+            while x:
+                if desde is not None and valores[x] < desde:
+                    x = dir[x]
+                else:
+                    no = x
+                    x = esq[x]
+            while no:
+                if ate is not None and ate < valores[no]:
+                    return
+                yield valores[no]
+                if self._modificacoes != versao:
+                    raise RuntimeError("árvore modificada durante a iteração")
+                if dir[no]:
+                    no = self._minimo(dir[no])
+                else:
+                    p = pai[no]
+                    while p and no == dir[p]:
+                        no = p
+                        p = pai[p]
+                    no = p
+        else:
+            # último nó <= ate
+            while x:
+                if ate is not None and ate < valores[x]:
+                    x = esq[x]
+                else:
+                    no = x
+                    x = dir[x]
+            while no:
+                if desde is not None and valores[no] < desde:
+                    return
+                yield valores[no]
+                if self._modificacoes != versao:
+                    raise RuntimeError("árvore modificada durante a iteração")
+                if esq[no]:
+                    no = self._maximo(esq[no])
+                else:
+                    p = pai[no]
+                    while p and no == esq[p]:
+                        no = p
+                        p = pai[p]
+                    no = p
+
+    def imprimir(self, profundidade=None, saida=None):
+        """Desenha a árvore em texto; veja ArvoreRubroNegra.imprimir"""
+        visualizacao.escrever(self._linhas(self.raiz, profundidade, "", True,
+                                           visualizacao.em_terminal(saida)), saida)
+
+    def mostrar_arvore(self, no, prefixo="", is_esq=True):
+        """Desenha a sub-árvore de `no` na saída padrão (sem recursão)"""
+        visualizacao.escrever(self._linhas(no, None, prefixo, is_esq,
+                                           visualizacao.em_terminal(None)))
+
+    def _linhas(self, no, profundidade, prefixo, is_esq, cores):
+        valores, cor = self._valores, self._cor
+        esq, dir = self._esq, self._dir
+
+        def rotulo(i):
+            vermelho = cor[i] == VERMELHO
+            nome = 'VERMELHO' if vermelho else 'PRETO'
+            if not cores:
+                return f"{valores[i]} ({nome})"
+            inicio = '\033[91m' if vermelho else '\033[90m' # Vermelho ou Cinza para Preto
+            return f"{inicio}{valores[i]} ({nome})\033[0m"
+
+        return visualizacao.linhas(no, 0, lambda i: (esq[i], dir[i]), rotulo, profundidade,
+                                   prefixo=prefixo, is_esq=is_esq)
+
+    def obter_tamanho(self):
+        return self._tamanho
+
+    def esta_vazia(self):
+        return self.raiz == 0
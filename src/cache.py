@@ -0,0 +1,251 @@
+"""Cache opcional de buscas para as chaves mais acessadas.
+
+Guarda o resultado da busca (o nó, ou o "não encontrado" da árvore) por
+chave, com política de descarte plugável: `LRU` ou `TinyLFU`. Como a
+instrumentação, o cache encobre métodos apenas na instância que o liga:
+a busca da árvore passa a consultá-lo antes de descer, e os pontos por
+onde toda mutação passa descartam exatamente as chaves afetadas. Uma
+inserção ou remoção invalida a própria chave; na AVL, a remoção de um nó
+com dois filhos copia o sucessor para ele e também invalida o sucessor,
+cujo nó antigo sai da árvore. Reconstruções e operações estruturais
+(lotes grandes, split, join, álgebra de conjuntos) esvaziam o cache.
+
+Com o cache, uma busca altera estado (a ordem do LRU, as frequências);
+as políticas toleram buscas simultâneas sob a trava de leitura de
+`concorrente`, que continua excluindo as mutações.
+"""
+
+from collections import OrderedDict
+
+CAPACIDADE = 1024
+_AUSENTE = object()  # "chave fora do cache" (o resultado pode ser None)
+
+
+class LRU:
+    """Descarta a chave usada há mais tempo.
+
+    Uma política expõe `envolver`, que monta a busca com o cache na frente
+    (o caminho de acerto fica numa única função, sem chamadas extras),
+    além de `descartar`, `limpar` e `len`.
+    """
+
+    def __init__(self, capacidade):
+        self.capacidade = capacidade
+        self._entradas = OrderedDict()
+
+    def envolver(self, buscar, cache):
+        """Retorna `busca(raiz, chave)`: consulta o cache e, na falta, `buscar`"""
+        obter = self._entradas.get
+        mover = self._entradas.move_to_end
+        guardar = self._guardar
+
+        def busca(raiz, chave):
+            try:
+                resultado = obter(chave, _AUSENTE)
+                if resultado is not _AUSENTE:
+                    cache.acertos += 1
+                    mover(chave)
+                    return resultado
+            except TypeError:  # chave sem hash: nunca entra no cache
+                return buscar(raiz, chave)
+            except KeyError:  # descartada por outro leitor nesse meio-tempo
+                return resultado
+            cache.faltas += 1
+            resultado = buscar(raiz, chave)
+            guardar(chave, resultado)
+            return resultado
+        return busca
+
+    def _guardar(self, chave, resultado):
+        entradas = self._entradas
+        if len(entradas) >= self.capacidade:
+            entradas.popitem(last=False)
+        entradas[chave] = resultado
+
+    def descartar(self, chave):
+        self._entradas.pop(chave, None)
+
+    def limpar(self):
+        self._entradas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
+
+
+class TinyLFU(LRU):
+    """LRU com admissão por frequência: uma chave nova só entra no lugar
+    da vítima do LRU se foi mais acessada que ela.
+
+    As frequências são contadas num dicionário (não num count-min sketch,
+    que em Python custaria mais por acesso) e envelhecem a cada `amostra`
+    acessos, quando são divididas por dois; assim ele não passa de
+    `amostra` chaves. Varreduras de chaves frias não expulsam as quentes.
+    """
+
+    def __init__(self, capacidade, amostra=None):
+        super().__init__(capacidade)
+        self.amostra = 10 * capacidade if amostra is None else amostra
+        self._frequencias = {}
+        self._proximo_envelhecimento = self.amostra
+
+    def envolver(self, buscar, cache):
+        obter = self._entradas.get
+        mover = self._entradas.move_to_end
+        frequencias = self._frequencias
+        contar = frequencias.get
+        admitir = self._admitir
+
+        def busca(raiz, chave):
+            try:
+                frequencias[chave] = contar(chave, 0) + 1
+                resultado = obter(chave, _AUSENTE)
+                if resultado is not _AUSENTE:
+                    cache.acertos += 1
+                    mover(chave)
+                    return resultado
+            except TypeError:
+                return buscar(raiz, chave)
+            except KeyError:
+                return resultado
+            cache.faltas += 1
+            resultado = buscar(raiz, chave)
+            admitir(chave, resultado, cache)
+            return resultado
+        return busca
+
+    def _admitir(self, chave, resultado, cache):
+        # O envelhecimento é conferido só nas faltas, pelo total de acessos
+        if cache.acertos + cache.faltas >= self._proximo_envelhecimento:
+            self._envelhecer()
+            self._proximo_envelhecimento = cache.acertos + cache.faltas + self.amostra
+        entradas = self._entradas
+        if len(entradas) >= self.capacidade:
+            vitima = next(iter(entradas))
+            frequencias = self._frequencias
+            if frequencias.get(chave, 0) <= frequencias.get(vitima, 0):
+                return
+            entradas.pop(vitima, None)
+        entradas[chave] = resultado
+
+    def _envelhecer(self):
+        # No lugar: a busca montada por `envolver` guarda o dicionário
+        metades = {chave: n >> 1 for chave, n in self._frequencias.items() if n > 1}
+        self._frequencias.clear()
+        self._frequencias.update(metades)
+
+
+POLITICAS = {"lru": LRU, "tinylfu": TinyLFU}
+
+
+class CacheBusca:
+    """Política de descarte mais os contadores de acertos e faltas"""
+
+    def __init__(self, capacidade=CAPACIDADE, politica="lru"):
+        if capacidade < 1:
+            raise ValueError("a capacidade do cache deve ser ao menos 1")
+        self.politica = POLITICAS[politica](capacidade) if isinstance(politica, str) else politica
+        self.acertos = 0
+        self.faltas = 0
+        self._encobertos = []  # (alvo, nome, atributo anterior) dos métodos encobertos
+
+    def descartar(self, chave):
+        try:
+            self.politica.descartar(chave)
+        except TypeError:  # chave sem hash: nunca entra no cache
+            pass
+
+    def limpar(self):
+        self.politica.limpar()
+
+    def taxa_acertos(self):
+        consultas = self.acertos + self.faltas
+        return self.acertos / consultas if consultas else 0.0
+
+    def estatisticas(self):
+        return {"acertos": self.acertos, "faltas": self.faltas,
+                "taxa_acertos": self.taxa_acertos(), "entradas": len(self.politica)}
+
+
+def _encobrir(alvo, nome, funcao, cache):
+    # Guarda o atributo de instância encoberto (a instrumentação fica por baixo)
+    cache._encobertos.append((alvo, nome, alvo.__dict__.get(nome)))
+    setattr(alvo, nome, funcao)
+
+
+def encobrir_busca(alvo, nome, cache):
+    """Encobre `alvo.nome(raiz, chave)` (a descida a partir da raiz) com o cache"""
+    _encobrir(alvo, nome, cache.politica.envolver(getattr(alvo, nome), cache), cache)
+
+
+def invalidar_avl(motor, cache):
+    """Encobre `_inserir`/`_remover` do motor AVL e liga seu `_ao_copiar`"""
+    inserir = motor._inserir
+    remover = motor._remover
+    descartar = cache.descartar
+
+    def _inserir(raiz, valor, dado=None):
+        resultado = inserir(raiz, valor, dado)
+        if resultado[2]:
+            descartar(valor)
+        return resultado
+
+    def _remover(raiz, valor):
+        resultado = remover(raiz, valor)
+        if resultado[1]:
+            descartar(valor)
+        return resultado
+    _encobrir(motor, "_inserir", _inserir, cache)
+    _encobrir(motor, "_remover", _remover, cache)
+    motor._ao_copiar = descartar
+
+
+def invalidar_rn(arvore, cache):
+    """Encobre `_inserir_no`/`_remover_no` da Rubro-Negra, que nunca move valores entre nós"""
+    inserir_no = arvore._inserir_no
+    remover_no = arvore._remover_no
+    descartar = cache.descartar
+
+    def _inserir_no(valor, dado=None):
+        resultado = inserir_no(valor, dado)
+        if resultado[1]:
+            descartar(valor)
+        return resultado
+
+    def _remover_no(z):
+        descartar(z.valor)
+        remover_no(z)
+    _encobrir(arvore, "_inserir_no", _inserir_no, cache)
+    _encobrir(arvore, "_remover_no", _remover_no, cache)
+
+
+def limpar_em(arvore, nomes, cache):
+    """Encobre os métodos que trocam os nós da árvore de uma vez, esvaziando o cache"""
+    for nome in nomes:
+        original = getattr(arvore, nome)
+
+        def reconstrucao(*args, original=original, **opcoes):
+            cache.limpar()
+            return original(*args, **opcoes)
+        _encobrir(arvore, nome, reconstrucao, cache)
+
+
+def descobrir(cache):
+    """Desfaz as funções acima, sem esvaziar o cache.
+
+    Cada método volta ao que era antes: o da classe ou o encoberto pela
+    instrumentação. A árvore usa isso para instrumentar por baixo do cache.
+    """
+    for alvo, nome, anterior in reversed(cache._encobertos):
+        if anterior is None:
+            alvo.__dict__.pop(nome, None)
+        else:
+            setattr(alvo, nome, anterior)
+        if hasattr(alvo, "_ao_copiar"):
+            alvo._ao_copiar = None
+    cache._encobertos.clear()
+
+
+def remover_cache(cache):
+    """Desfaz as funções acima e esvazia o cache"""
+    descobrir(cache)
+    cache.limpar()
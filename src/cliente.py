@@ -0,0 +1,236 @@
+"""Cliente asyncio para o servidor de árvores (`servidor.py` na raiz).
+
+Uma `Conexao` aceita várias requisições em voo ao mesmo tempo: cada
+chamada manda sua linha e espera a resposta, que o servidor devolve na
+ordem dos pedidos. Os pedidos feitos na mesma volta do laço de eventos
+saem numa única escrita, então `asyncio.gather` sobre muitas buscas vira
+um pipeline sem nenhum código extra. `PoolConexoes` abre conexões sob
+demanda, até um limite, e as reaproveita.
+"""
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+
+PORTA = 7070
+LIMITE_LINHA = 1 << 22  # maior linha de resposta aceita (BM com muitos valores)
+
+
+class ErroServidor(Exception):
+    """O servidor respondeu com uma linha de erro"""
+
+
+class Conexao:
+    """Conexão com pipelining; crie com `await Conexao.abrir(...)`"""
+
+    def __init__(self, leitor, escritor):
+        self._leitor = leitor
+        self._escritor = escritor
+        self._esperando = deque()  # futuros e filas de RANGE, na ordem dos pedidos
+        self._saida = []           # linhas ainda não escritas
+        self._erro = None
+        self._leitura = asyncio.get_running_loop().create_task(self._ler())
+
+    @classmethod
+    async def abrir(cls, host="127.0.0.1", porta=PORTA, unix=None):
+        if unix is not None:
+            leitor, escritor = await asyncio.open_unix_connection(unix, limit=LIMITE_LINHA)
+        else:
+            leitor, escritor = await asyncio.open_connection(host, porta, limit=LIMITE_LINHA)
+        return cls(leitor, escritor)
+
+    @property
+    def fechada(self):
+        return self._erro is not None
+
+    async def fechar(self):
+        if self._erro is None:
+            self._erro = ConnectionError("conexão fechada")
+        self._escritor.close()
+        try:
+            await self._escritor.wait_closed()
+        except ConnectionError:
+            pass
+        await self._leitura
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *excecao):
+        await self.fechar()
+
+    # --- Envio e recepção ---
+    def _enviar(self, linha, destino):
+        if self._erro is not None:
+            raise self._erro
+        if not self._saida:
+            asyncio.get_running_loop().call_soon(self._descarregar)
+        self._saida.append(linha)
+        self._esperando.append(destino)
+
+    def _descarregar(self):
+        if self._saida and self._erro is None:
+            self._escritor.write(b"".join(self._saida))
+        self._saida.clear()
+
+    async def _pedir(self, linha):
+        futuro = asyncio.get_running_loop().create_future()
+        self._enviar(linha, futuro)
+        return await futuro
+
+    async def _ler(self):
+        try:
+            while True:
+                linha = await self._leitor.readline()
+                if not linha:
+                    raise ConnectionError("o servidor fechou a conexão")
+                destino = self._esperando[0]
+                marca, conteudo = linha[:1], linha[1:-1]
+                if isinstance(destino, asyncio.Queue):
+                    if marca == b"+":
+                        destino.put_nowait(conteudo)
+                        continue
+                    destino.put_nowait(ErroServidor(conteudo.decode()) if marca == b"-" else None)
+                elif not destino.done():
+                    if marca == b"=":
+                        destino.set_result(conteudo)
+                    else:
+                        destino.set_exception(ErroServidor(conteudo.decode()))
+                self._esperando.popleft()
+        except ConnectionError as excecao:
+            if self._erro is None:
+                self._erro = excecao
+        except Exception as excecao:  # linha longa demais ou sem pedido esperando
+            if self._erro is None:
+                self._erro = ConnectionError(f"resposta inesperada do servidor: {excecao!r}")
+            self._escritor.close()
+        # Quem ainda espera resposta recebe o erro
+        for destino in self._esperando:
+            if isinstance(destino, asyncio.Queue):
+                destino.put_nowait(self._erro)
+            elif not destino.done():
+                destino.set_exception(self._erro)
+        self._esperando.clear()
+
+    # --- Operações ---
+    async def inserir(self, valor):
+        """True se o valor era novo"""
+        return await self._pedir(b"I %d\n" % valor) == b"1"
+
+    async def remover(self, valor):
+        return await self._pedir(b"R %d\n" % valor) == b"1"
+
+    async def buscar(self, valor):
+        """True se o valor está na árvore"""
+        return await self._pedir(b"B %d\n" % valor) == b"1"
+
+    async def inserir_muitos(self, valores):
+        """Insere em um pedido só; retorna quantos eram novos"""
+        return int(await self._pedir(b"IM %s\n" % _juntar(valores)))
+
+    async def remover_muitos(self, valores):
+        return int(await self._pedir(b"RM %s\n" % _juntar(valores)))
+
+    async def buscar_muitos(self, valores):
+        """Lista de booleanos, um por valor, na ordem dada"""
+        return [digito == 49 for digito in await self._pedir(b"BM %s\n" % _juntar(valores))]
+
+    async def tamanho(self):
+        return int(await self._pedir(b"N\n"))
+
+    async def ping(self):
+        return await self._pedir(b"PING\n") == b"PONG"
+
+    async def intervalo(self, lo, hi):
+        """Gera os valores em [lo, hi] à medida que os blocos chegam.
+
+        Outros pedidos da mesma conexão podem ser feitos durante a
+        iteração; as respostas deles esperam o fim da transmissão.
+        """
+        fila = asyncio.Queue()
+        self._enviar(b"RANGE %d %d\n" % (lo, hi), fila)
+        while True:
+            bloco = await fila.get()
+            if bloco is None:
+                return
+            if isinstance(bloco, Exception):
+                raise bloco
+            for valor in bloco.split():
+                yield int(valor)
+
+
+def _juntar(valores):
+    return b" ".join(b"%d" % valor for valor in valores)
+
+
+class PoolConexoes:
+    """Até `tamanho` conexões com o mesmo endereço, abertas sob demanda.
+
+    Uso: `async with pool.conexao() as conexao: ...`. Conexões que caem
+    não voltam para o pool; a vaga delas abre uma nova no próximo pedido.
+    Depois de `fechar`, novos pedidos levantam RuntimeError e as conexões
+    ainda emprestadas são fechadas ao serem devolvidas.
+    """
+
+    def __init__(self, tamanho=4, host="127.0.0.1", porta=PORTA, unix=None):
+        if tamanho < 1:
+            raise ValueError("o pool precisa de pelo menos uma conexão")
+        self.tamanho = tamanho
+        self._endereco = {"host": host, "porta": porta, "unix": unix}
+        self._livres = None  # criada no laço de eventos, no primeiro uso
+        self._abertas = []
+        self._fechado = False
+        self._fechando = set()  # fechamentos agendados por `liberar`
+
+    async def adquirir(self):
+        if self._fechado:
+            raise RuntimeError("pool fechado")
+        if self._livres is None:
+            self._livres = asyncio.LifoQueue()
+            for _ in range(self.tamanho):
+                self._livres.put_nowait(None)  # vaga sem conexão aberta
+        conexao = await self._livres.get()
+        if self._fechado:
+            self._livres.put_nowait(conexao)  # acorda o próximo à espera
+            raise RuntimeError("pool fechado")
+        if conexao is None or conexao.fechada:
+            if conexao is not None:
+                self._abertas.remove(conexao)
+            try:
+                conexao = await Conexao.abrir(**self._endereco)
+            except BaseException:
+                self._livres.put_nowait(None)
+                raise
+            self._abertas.append(conexao)
+        return conexao
+
+    def liberar(self, conexao):
+        if not self._fechado:
+            self._livres.put_nowait(conexao)
+        elif not conexao.fechada:
+            # Aberta enquanto o pool fechava: não há mais a quem devolvê-la
+            tarefa = asyncio.ensure_future(conexao.fechar())
+            self._fechando.add(tarefa)
+            tarefa.add_done_callback(self._fechando.discard)
+
+    @asynccontextmanager
+    async def conexao(self):
+        conexao = await self.adquirir()
+        try:
+            yield conexao
+        finally:
+            self.liberar(conexao)
+
+    async def fechar(self):
+        self._fechado = True
+        if self._livres is not None:
+            self._livres.put_nowait(None)  # quem espera uma vaga recebe o erro
+        abertas, self._abertas = self._abertas, []
+        for conexao in abertas:
+            await conexao.fechar()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *excecao):
+        await self.fechar()
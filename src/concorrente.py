@@ -0,0 +1,245 @@
+"""Fachada thread-safe para as árvores: muitos leitores, um escritor.
+
+As leituras das árvores não alteram nenhum estado, então podem rodar em
+paralelo; só as mutações precisam de exclusão mútua. A trava dá
+prioridade aos escritores: um escritor esperando impede novos leitores
+de entrar, então um fluxo contínuo de leituras não o deixa sem vez.
+
+Com a ArvoreAVLPersistente as leituras não tomam trava: cada mutação
+publica a versão imutável resultante e as consultas leem a última
+publicada. Nas árvores que alteram os nós no lugar, toda leitura passa
+pela trava; com o GIL as leituras não rodam de fato em paralelo e essa
+trava custa mais por chamada que um `threading.Lock`, então ali a
+fachada dá consistência (leituras em grupo, iteração sobre um
+instantâneo), não vazão.
+"""
+
+import threading
+from contextlib import contextmanager
+
+# Consultas que, com a AVL persistente, leem a versão publicada sem trava
+CONSULTAS = ("buscar", "buscar_muitos", "get", "piso", "teto", "sucessor", "antecessor",
+             "contar_intervalo", "k_esimo", "posicao", "mediana", "percentil",
+             "obter_tamanho", "esta_vazia")
+
+
+class TravaLeituraEscrita:
+    """Trava de leitores/escritor com prioridade para escritores.
+
+    Não é reentrante: uma thread que já tem a trava não deve adquiri-la
+    de novo (nem passar de leitura para escrita).
+    """
+
+    def __init__(self):
+        # O caminho comum usa o mutex direto; a condição só para esperar
+        self._mutex = threading.Lock()
+        self._condicao = threading.Condition(self._mutex)
+        self._leitores = 0
+        self._escrevendo = False
+        self._escritores_esperando = 0
+
+    def adquirir_leitura(self):
+        with self._mutex:
+            while self._escrevendo or self._escritores_esperando:
+                self._condicao.wait()
+            self._leitores += 1
+
+    def liberar_leitura(self):
+        with self._mutex:
+            self._leitores -= 1
+            # Só escritores esperam os leitores saírem
+            if self._leitores == 0 and self._escritores_esperando:
+                self._condicao.notify_all()
+
+    def adquirir_escrita(self):
+        with self._mutex:
+            self._escritores_esperando += 1
+            try:
+                while self._escrevendo or self._leitores:
+                    self._condicao.wait()
+            finally:
+                self._escritores_esperando -= 1
+            self._escrevendo = True
+
+    def liberar_escrita(self):
+        with self._mutex:
+            self._escrevendo = False
+            self._condicao.notify_all()
+
+    @contextmanager
+    def leitura(self):
+        self.adquirir_leitura()
+        try:
+            yield
+        finally:
+            self.liberar_leitura()
+
+    @contextmanager
+    def escrita(self):
+        self.adquirir_escrita()
+        try:
+            yield
+        finally:
+            self.liberar_escrita()
+
+
+def _leitura(nome):
+    def metodo(self, *args, **kwargs):
+        trava = self._trava
+        # Caminho rápido de `adquirir_leitura`, sem chamadas: nenhum escritor
+        with trava._mutex:
+            livre = not (trava._escrevendo or trava._escritores_esperando)
+            if livre:
+                trava._leitores += 1
+        if not livre:
+            trava.adquirir_leitura()
+        try:
+            return getattr(self._arvore, nome)(*args, **kwargs)
+        finally:
+            with trava._mutex:
+                trava._leitores -= 1
+                if trava._leitores == 0 and trava._escritores_esperando:
+                    trava._condicao.notify_all()
+    metodo.__name__ = nome
+    metodo.__doc__ = f"`{nome}` sob a trava de leitura"
+    return metodo
+
+
+def _leitura_publicada(fachada, nome):
+    def metodo(*args, **kwargs):
+        return getattr(fachada._publicada, nome)(*args, **kwargs)
+    metodo.__name__ = nome
+    metodo.__doc__ = f"`{nome}` na última versão publicada, sem trava"
+    return metodo
+
+
+def _escrita(nome):
+    def metodo(self, *args, **kwargs):
+        trava = self._trava
+        trava.adquirir_escrita()
+        try:
+            return getattr(self._arvore, nome)(*args, **kwargs)
+        finally:
+            if self._versionada:
+                self._publicada = self._arvore.versao()
+            trava.liberar_escrita()
+    metodo.__name__ = nome
+    metodo.__doc__ = f"`{nome}` sob a trava de escrita"
+    return metodo
+
+
+class ArvoreConcorrente:
+    """Envolve uma ArvoreAVL, ArvoreRubroNegra ou ArvoreAVLPersistente para uso entre threads.
+
+    Consultas rodam em paralelo sob a trava de leitura; mutações rodam
+    sozinhas sob a trava de escrita. A iteração (`iterar`, `items`,
+    `intervalo`, `em_ordem`, `for x in arvore`) percorre um instantâneo e
+    não bloqueia escritores enquanto é consumida.
+
+    Com a ArvoreAVLPersistente, cada mutação publica a versão imutável
+    resultante (O(1)) antes de soltar a trava de escrita, e as consultas e
+    os instantâneos leem a última versão publicada sem trava nenhuma. Nas
+    demais árvores o instantâneo é uma cópia O(n) feita sob a trava de
+    leitura, que segura os escritores durante a cópia. Para várias
+    consultas sobre o mesmo estado, use `versao()` ou `leitura()`.
+    """
+
+    def __init__(self, arvore):
+        self._arvore = arvore
+        self._trava = TravaLeituraEscrita()
+        self._versionada = hasattr(arvore, "versao")
+        if self._versionada:
+            # Caminho rápido: as consultas encobrem as da classe
+            self._publicada = arvore.versao()
+            for nome in CONSULTAS:
+                setattr(self, nome, _leitura_publicada(self, nome))
+
+    def versao(self):
+        """Versão imutável do estado atual, que pode ser lida sem trava (O(1)).
+
+        Só existe para a ArvoreAVLPersistente; as demais árvores alteram os
+        nós no lugar e levantam TypeError.
+        """
+        if not self._versionada:
+            raise TypeError(f"{type(self._arvore).__name__} não tem versões; "
+                            "use ArvoreAVLPersistente ou leitura()")
+        return self._publicada
+
+    @contextmanager
+    def leitura(self):
+        """Segura a trava de leitura e fornece a árvore interna.
+
+        Dentro do bloco nenhuma mutação acontece; a árvore não deve ser
+        modificada por ele.
+        """
+        with self._trava.leitura():
+            yield self._arvore
+
+    @contextmanager
+    def escrita(self):
+        """Segura a trava de escrita e fornece a árvore interna"""
+        with self._trava.escrita():
+            try:
+                yield self._arvore
+            finally:
+                if self._versionada:
+                    self._publicada = self._arvore.versao()
+
+    # Consultas
+    buscar = _leitura("buscar")
+    buscar_muitos = _leitura("buscar_muitos")
+    get = _leitura("get")
+    piso = _leitura("piso")
+    teto = _leitura("teto")
+    sucessor = _leitura("sucessor")
+    antecessor = _leitura("antecessor")
+    contar_intervalo = _leitura("contar_intervalo")
+    k_esimo = _leitura("k_esimo")
+    posicao = _leitura("posicao")
+    mediana = _leitura("mediana")
+    percentil = _leitura("percentil")
+    obter_tamanho = _leitura("obter_tamanho")
+    esta_vazia = _leitura("esta_vazia")
+    salvar = _leitura("salvar")
+
+    # Mutações
+    inserir = _escrita("inserir")
+    remover = _escrita("remover")
+    put = _escrita("put")
+    pop = _escrita("pop")
+    inserir_muitos = _escrita("inserir_muitos")
+    remover_muitos = _escrita("remover_muitos")
+    remover_intervalo = _escrita("remover_intervalo")
+    checkpoint = _escrita("checkpoint")
+    sincronizar = _escrita("sincronizar")
+
+    # --- Iteração sobre um instantâneo consistente ---
+    def iterar(self, desde=None, ate=None, reverso=False):
+        if self._versionada:
+            return self.versao().iterar(desde, ate, reverso)
+        with self._trava.leitura():
+            valores = list(self._arvore.iterar(desde, ate, reverso))
+        return iter(valores)
+
+    def items(self, desde=None, ate=None, reverso=False):
+        if self._versionada:
+            return self.versao().items(desde, ate, reverso)
+        with self._trava.leitura():
+            pares = list(self._arvore.items(desde, ate, reverso))
+        return iter(pares)
+
+    def em_ordem(self):
+        if self._versionada:
+            return self.versao().em_ordem()
+        with self._trava.leitura():
+            return self._arvore.em_ordem()
+
+    def intervalo(self, lo, hi):
+        """Gera, em ordem, os valores em [lo, hi] de um instantâneo"""
+        return self.iterar(desde=lo, ate=hi)
+
+    def __iter__(self):
+        return self.iterar()
+
+    def __reversed__(self):
+        return self.iterar(reverso=True)
@@ -0,0 +1,133 @@
+"""Auxiliares compartilhados para construção de árvores a partir de sequências."""
+
+import gc
+from contextlib import contextmanager
+
+
+@contextmanager
+def gc_pausado():
+    """Suspende o coletor cíclico durante alocações em massa de nós.
+
+    Os nós não formam ciclos inalcançáveis durante a construção, e as
+    varreduras completas disparadas por milhões de alocações dominariam
+    o tempo de montagem.
+    """
+    ativo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if ativo:
+            gc.enable()
+
+
+def encadear_ordenados(valores, criar_no):
+    """Encadeia nós (pelo campo `direita`) com os valores em ordem estrita.
+
+    Consome qualquer iterável uma única vez, sem copiá-lo para uma lista
+    enquanto ele vier ordenado. Ao detectar um valor fora de ordem ou
+    repetido, ordena o restante e descarta as duplicatas.
+    Retorna (primeiro nó, quantidade de nós).
+    """
+    it = iter(valores)
+    primeiro = anterior = None
+    n = 0
+    for valor in it:
+        if anterior is not None and not (anterior.valor < valor):
+            todos = []
+            no = primeiro
+            while no is not None:
+                todos.append(no.valor)
+                no = no.direita
+            todos.append(valor)
+            todos.extend(it)
+            todos.sort()
+            return _encadear_lista(todos, criar_no)
+        no = criar_no(valor)
+        if anterior is None:
+            primeiro = no
+        else:
+            anterior.direita = no
+        anterior = no
+        n += 1
+    return primeiro, n
+
+
+def _encadear_lista(ordenados, criar_no):
+    """Encadeia uma lista já ordenada, pulando valores repetidos"""
+    primeiro = anterior = None
+    n = 0
+    for valor in ordenados:
+        if anterior is not None and not (anterior.valor < valor):
+            continue
+        no = criar_no(valor)
+        if anterior is None:
+            primeiro = no
+        else:
+            anterior.direita = no
+        anterior = no
+        n += 1
+    return primeiro, n
+
+
+def mesclar_nos(nos, ordenados, criar_no):
+    """Encadeia os nós existentes com novos nós para os valores ausentes.
+
+    `nos` é uma lista de nós em ordem estrita (reaproveitados, com seus
+    dados) e `ordenados` uma sequência ordenada de valores, possivelmente
+    com repetições. Retorna (primeiro nó, quantidade de nós).
+    """
+    primeiro = anterior = None
+    n = 0
+    i = 0
+    total = len(nos)
+    for valor in ordenados:
+        while i < total and nos[i].valor < valor:
+            no = nos[i]
+            i += 1
+            if anterior is None:
+                primeiro = no
+            else:
+                anterior.direita = no
+            anterior = no
+            n += 1
+        if i < total and not (valor < nos[i].valor):
+            continue  # já presente
+        if anterior is not None and not (anterior.valor < valor):
+            continue  # repetido no lote
+        no = criar_no(valor)
+        if anterior is None:
+            primeiro = no
+        else:
+            anterior.direita = no
+        anterior = no
+        n += 1
+    for no in nos[i:]:
+        if anterior is None:
+            primeiro = no
+        else:
+            anterior.direita = no
+        anterior = no
+        n += 1
+    return primeiro, n
+
+
+def filtrar_nos(nos, ordenados):
+    """Encadeia os nós (lista em ordem) cujos valores não estão em `ordenados`"""
+    it = iter(ordenados)
+    fim = object()
+    y = next(it, fim)
+    primeiro = anterior = None
+    n = 0
+    for no in nos:
+        while y is not fim and y < no.valor:
+            y = next(it, fim)
+        if y is not fim and not (no.valor < y):
+            continue
+        if anterior is None:
+            primeiro = no
+        else:
+            anterior.direita = no
+        anterior = no
+        n += 1
+    return primeiro, n
@@ -0,0 +1,231 @@
+"""Diário (write-ahead log) append-only com commit em grupo.
+
+Uma pasta durável contém o último checkpoint (`snapshot.bin`, no formato de
+`persistencia`) e o diário (`diario.log`) com as mutações posteriores a ele.
+Cada registro tem o formato
+
+    comprimento do corpo (4 bytes) | CRC32 (4) | operação (1) | tipo (1) | corpo
+
+e descreve o estado final de uma ou mais chaves (presente, ausente, com
+um dado ou com uma contagem). Por isso reaplicar o diário sobre um checkpoint mais novo que
+ele não altera o resultado, e um checkpoint interrompido entre gravar o
+snapshot e truncar o diário continua recuperável.
+"""
+
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+
+from .persistencia import INTEIRO, OBJETO, TEXTO
+
+SNAPSHOT = "snapshot.bin"
+DIARIO = "diario.log"
+
+REGISTRO = struct.Struct("<IIBB")
+_INT64 = struct.Struct("<q")
+_MIN_INT64 = -(1 << 63)
+_MAX_INT64 = (1 << 63) - 1
+
+# Operações
+INSERIR = 1
+REMOVER = 2
+PUT = 3              # corpo: (chave, dado)
+INSERIR_MUITOS = 4   # corpo: lista de chaves
+REMOVER_MUITOS = 5   # corpo: lista de chaves
+REMOVER_INTERVALO = 6  # corpo: (lo, hi)
+CONTAGEM = 7         # corpo: (chave, ocorrências) de um multiconjunto
+
+
+def _codificar(valor):
+    """Retorna (tipo, bytes) com atalhos para int de 64 bits e str"""
+    if type(valor) is int and _MIN_INT64 <= valor <= _MAX_INT64:
+        return INTEIRO, _INT64.pack(valor)
+    if type(valor) is str:
+        return TEXTO, valor.encode("utf-8")
+    return OBJETO, pickle.dumps(valor, pickle.HIGHEST_PROTOCOL)
+
+
+def _decodificar(tipo, corpo):
+    if tipo == INTEIRO:
+        return _INT64.unpack(corpo)[0]
+    if tipo == TEXTO:
+        return str(corpo, "utf-8")
+    return pickle.loads(corpo)
+
+
+def ler_registros(caminho):
+    """Lê os registros íntegros do diário; retorna ([(operação, valor)], fim).
+
+    A leitura para no primeiro registro truncado ou com CRC inválido (uma
+    escrita interrompida por queda); `fim` é o deslocamento até onde o
+    arquivo é válido.
+    """
+    try:
+        with open(caminho, "rb") as arquivo:
+            conteudo = memoryview(arquivo.read())
+    except FileNotFoundError:
+        return [], 0
+    registros = []
+    posicao = 0
+    while posicao + REGISTRO.size <= len(conteudo):
+        comprimento, crc, operacao, tipo = REGISTRO.unpack_from(conteudo, posicao)
+        inicio = posicao + REGISTRO.size
+        corpo = conteudo[inicio:inicio + comprimento]
+        if len(corpo) < comprimento or zlib.crc32(corpo, zlib.crc32(bytes((operacao, tipo)))) != crc:
+            break
+        registros.append((operacao, _decodificar(tipo, corpo)))
+        posicao = inicio + comprimento
+    return registros, posicao
+
+
+def reaplicar(arvore, registros):
+    """Refaz as mutações registradas numa árvore sem diário anexado.
+
+    As chaves do diário já estão normalizadas, então a função de chave é
+    desligada durante a reaplicação.
+    """
+    funcao_chave, arvore._funcao_chave = arvore._funcao_chave, None
+    try:
+        for operacao, valor in registros:
+            if operacao == INSERIR:
+                arvore.inserir(valor)
+            elif operacao == REMOVER:
+                arvore.remover(valor)
+            elif operacao == PUT:
+                arvore.put(*valor)
+            elif operacao == INSERIR_MUITOS:
+                arvore.inserir_muitos(valor)
+            elif operacao == REMOVER_MUITOS:
+                arvore.remover_muitos(valor)
+            elif operacao == REMOVER_INTERVALO:
+                arvore.remover_intervalo(*valor)
+            elif operacao == CONTAGEM:
+                arvore._definir_contagem(*valor)
+            else:
+                raise ValueError(f"operação de diário desconhecida: {operacao}")
+    finally:
+        arvore._funcao_chave = funcao_chave
+
+
+def recuperar(tipo_arvore, pasta, key=None, a_cada=1, intervalo_ms=None):
+    """Abre (ou cria) uma árvore durável em `pasta`.
+
+    Carrega o último checkpoint, reaplica o diário, descarta uma cauda
+    corrompida e anexa um diário novo para as próximas mutações.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    snapshot = os.path.join(pasta, SNAPSHOT)
+    if os.path.exists(snapshot):
+        arvore = tipo_arvore.carregar(snapshot, key=key)
+    else:
+        arvore = tipo_arvore(key=key)
+    caminho = os.path.join(pasta, DIARIO)
+    registros, fim = ler_registros(caminho)
+    reaplicar(arvore, registros)
+    if os.path.exists(caminho) and os.path.getsize(caminho) != fim:
+        os.truncate(caminho, fim)
+    arvore._diario = Diario(pasta, a_cada=a_cada, intervalo_ms=intervalo_ms)
+    return arvore
+
+
+class Diario:
+    """Diário de uma pasta durável, com commit em grupo.
+
+    Os registros acumulam num buffer e são gravados com um único `fsync`
+    a cada `a_cada` operações e/ou quando `intervalo_ms` tiver passado
+    desde o último (None desliga o critério). O prazo é conferido a cada
+    registro e, para uma árvore que fica ociosa, por um temporizador
+    (uma thread `threading.Timer` por grupo pendente) que sincroniza no
+    prazo; `sincronizar()` força a gravação a qualquer momento. Em caso
+    de queda, perdem-se no máximo as operações do grupo ainda não
+    sincronizado, que com `intervalo_ms` têm menos de `intervalo_ms`.
+    """
+
+    def __init__(self, pasta, a_cada=1, intervalo_ms=None):
+        if a_cada is not None and a_cada < 1:
+            raise ValueError("a_cada deve ser pelo menos 1")
+        self.pasta = pasta
+        self.caminho_snapshot = os.path.join(pasta, SNAPSHOT)
+        self._arquivo = open(os.path.join(pasta, DIARIO), "ab")
+        self._a_cada = a_cada
+        self._intervalo = None if intervalo_ms is None else intervalo_ms / 1000
+        self._buffer = bytearray()
+        self._pendentes = 0
+        self._ultimo_fsync = time.monotonic()
+        # O temporizador roda noutra thread: buffer e arquivo ficam sob a trava
+        self._trava = threading.Lock()
+        self._temporizador = None
+        self._erro = None  # falha de gravação no temporizador, relançada aqui
+
+    def registrar(self, operacao, valor):
+        tipo, corpo = _codificar(valor)
+        crc = zlib.crc32(corpo, zlib.crc32(bytes((operacao, tipo))))
+        with self._trava:
+            if self._erro is not None:
+                raise self._erro
+            self._buffer += REGISTRO.pack(len(corpo), crc, operacao, tipo)
+            self._buffer += corpo
+            self._pendentes += 1
+            if self._a_cada is not None and self._pendentes >= self._a_cada:
+                self._sincronizar()
+            elif self._intervalo is not None:
+                restante = self._ultimo_fsync + self._intervalo - time.monotonic()
+                if restante <= 0:
+                    self._sincronizar()
+                elif self._temporizador is None:
+                    self._agendar(restante)
+
+    def _agendar(self, espera):
+        self._temporizador = threading.Timer(espera, self._no_prazo)
+        self._temporizador.daemon = True
+        self._temporizador.start()
+
+    def _no_prazo(self):
+        with self._trava:
+            self._temporizador = None
+            if not self._buffer or self._arquivo.closed:
+                return
+            restante = self._ultimo_fsync + self._intervalo - time.monotonic()
+            if restante > 0:  # houve um fsync depois do agendamento
+                self._agendar(restante)
+                return
+            try:
+                self._sincronizar()
+            except OSError as excecao:
+                self._erro = excecao
+
+    def sincronizar(self):
+        """Grava o grupo pendente e faz o `fsync`"""
+        with self._trava:
+            if self._erro is not None:
+                raise self._erro
+            self._sincronizar()
+
+    def _sincronizar(self):
+        if self._buffer:
+            self._arquivo.write(self._buffer)
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+            self._buffer.clear()
+        self._pendentes = 0
+        self._ultimo_fsync = time.monotonic()
+
+    def truncar(self):
+        """Esvazia o diário depois de um checkpoint"""
+        with self._trava:
+            self._buffer.clear()
+            self._pendentes = 0
+            self._arquivo.flush()
+            self._arquivo.truncate(0)
+            os.fsync(self._arquivo.fileno())
+
+    def fechar(self):
+        self.sincronizar()
+        with self._trava:
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+                self._temporizador = None
+            self._arquivo.close()
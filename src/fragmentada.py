@@ -0,0 +1,315 @@
+"""Árvore fragmentada por faixas de chave entre processos.
+
+Cada fragmento é uma árvore (AVL ou Rubro-Negra) mantida por um processo
+trabalhador e cobre uma faixa contígua de chaves; os limites entre as
+faixas ficam no processo principal, que encaminha cada operação ao
+fragmento certo. Lotes são repartidos e enviados a todos os fragmentos
+antes de esperar as respostas, então os processos trabalham em paralelo.
+"""
+
+import multiprocessing
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+from .arvore_rn import ArvoreRubroNegra
+
+BLOCO = 4096  # valores por mensagem ao transmitir intervalos
+
+
+def _trabalhador(conexao, tipo_arvore):
+    """Laço de um processo trabalhador: executa os pedidos sobre sua árvore.
+
+    Cada pedido recebe uma resposta (resultado, tamanho da árvore), ou
+    (exceção, None) se ele falhar. Intervalos são enviados em blocos de
+    até BLOCO valores, terminados por None; uma falha no meio termina a
+    transmissão com a própria exceção no lugar do None.
+    """
+    arvore = tipo_arvore()
+    while True:
+        operacao, args = conexao.recv()
+        if operacao == "fechar":
+            conexao.close()
+            return
+        try:
+            if operacao == "intervalo":
+                try:
+                    valores = arvore.iterar(*args)
+                    while True:
+                        bloco = list(islice(valores, BLOCO))
+                        if not bloco:
+                            break
+                        conexao.send(bloco)
+                except Exception as erro:
+                    conexao.send(erro)
+                else:
+                    conexao.send(None)
+                continue
+            if operacao == "ceder":
+                # Entrega os valores >= chave e fica com os menores
+                esq, presente, dir = arvore.split(args[0])
+                if presente:
+                    dir.inserir(args[0])
+                arvore = esq
+                resultado = dir.em_ordem()
+            elif operacao == "receber":
+                arvore.uniao(tipo_arvore.from_sorted(args[0]))
+                resultado = None
+            elif operacao == "buscar":
+                no = arvore.buscar(args[0])
+                resultado = None if no is None else no.valor
+            else:
+                resultado = getattr(arvore, operacao)(*args)
+        except Exception as erro:
+            conexao.send((erro, None))
+        else:
+            conexao.send((resultado, arvore.obter_tamanho()))
+
+
+class ArvoreFragmentada:
+    """Conjunto ordenado dividido em faixas de chave, uma por processo.
+
+    `processos` trabalhadores são iniciados; `limites` (opcional, ordenado)
+    define as faixas iniciais, e sem ele tudo começa num só fragmento.
+    Depois de cada mutação, um fragmento com pelo menos
+    `2 * minimo_fragmento` valores é dividido ao meio enquanto houver
+    processo ocioso; sem processo ocioso, um fragmento com mais que o dobro
+    da média libera um processo juntando os dois vizinhos menores.
+
+    `buscar` retorna o valor armazenado (ou None), já que os nós ficam em
+    outro processo. Use como gerenciador de contexto ou chame `fechar()`.
+    """
+
+    def __init__(self, processos=4, tipo_arvore=ArvoreRubroNegra, limites=None,
+                 minimo_fragmento=4096):
+        self._tipo_arvore = tipo_arvore
+        self._minimo = minimo_fragmento
+        self._conexoes = []
+        self._processos = []
+        for _ in range(processos):
+            nossa, deles = multiprocessing.Pipe()
+            processo = multiprocessing.Process(target=_trabalhador, args=(deles, tipo_arvore),
+                                               daemon=True)
+            processo.start()
+            deles.close()
+            self._conexoes.append(nossa)
+            self._processos.append(processo)
+        limites = sorted(set(limites)) if limites else []
+        if len(limites) >= processos:
+            raise ValueError("limites demais para a quantidade de processos")
+        self._limites = limites
+        # Fragmentos ativos em ordem de chave (índices de processo) e tamanhos
+        self._fragmentos = list(range(len(limites) + 1))
+        self._tamanhos = [0] * len(self._fragmentos)
+        self._ociosos = list(range(processos - 1, len(limites), -1))
+        self._transmitindo = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def fechar(self):
+        """Encerra os processos trabalhadores"""
+        for conexao in self._conexoes:
+            if not conexao.closed:
+                conexao.send(("fechar", ()))
+                conexao.close()
+        for processo in self._processos:
+            processo.join()
+
+    # --- Comunicação com os trabalhadores ---
+    def _enviar(self, i, operacao, *args):
+        if self._transmitindo:
+            raise RuntimeError("árvore modificada durante a iteração")
+        self._conexoes[self._fragmentos[i]].send((operacao, args))
+
+    def _receber(self, i):
+        resultado, tamanho = self._conexoes[self._fragmentos[i]].recv()
+        if tamanho is None:
+            raise resultado
+        self._tamanhos[i] = tamanho
+        return resultado
+
+    def _pedir(self, i, operacao, *args):
+        self._enviar(i, operacao, *args)
+        return self._receber(i)
+
+    def _distribuir(self, operacao, partes):
+        """Envia cada parte não vazia ao seu fragmento e só então colhe as respostas.
+
+        Todas as respostas são lidas antes de repassar a primeira falha, para
+        que nenhum canal fique com uma resposta pendente.
+        """
+        enviados = []
+        for i, parte in enumerate(partes):
+            if parte:
+                self._enviar(i, operacao, parte)
+                enviados.append(i)
+        resultados = []
+        erro = None
+        for i in enviados:
+            try:
+                resultados.append(self._receber(i))
+            except Exception as excecao:
+                if erro is None:
+                    erro = excecao
+        if erro is not None:
+            raise erro
+        return resultados
+
+    def _fragmento(self, valor):
+        return bisect_right(self._limites, valor)
+
+    def _repartir(self, valores):
+        """Ordena o lote e o corta nas fronteiras dos fragmentos"""
+        lote = sorted(valores)
+        cortes = [0] + [bisect_left(lote, limite) for limite in self._limites] + [len(lote)]
+        return [lote[cortes[i]:cortes[i + 1]] for i in range(len(self._fragmentos))]
+
+    # --- Rebalanceamento ---
+    def _precisa_rebalancear(self, i):
+        tamanho = self._tamanhos[i]
+        if tamanho < 2 * self._minimo:
+            return False
+        if self._ociosos:
+            return True
+        return tamanho > 2 * sum(self._tamanhos) / len(self._fragmentos)
+
+    def _dividir_fragmento(self, i):
+        """Move a metade superior do fragmento i para um processo ocioso"""
+        chave = self._pedir(i, "k_esimo", self._tamanhos[i] // 2)
+        valores = self._pedir(i, "ceder", chave)
+        self._fragmentos.insert(i + 1, self._ociosos.pop())
+        self._tamanhos.insert(i + 1, 0)
+        self._limites.insert(i, chave)
+        self._pedir(i + 1, "receber", valores)
+
+    def _juntar_fragmentos(self, i):
+        """Move o fragmento i + 1 inteiro para o i e libera seu processo"""
+        valores = self._pedir(i + 1, "ceder", self._limites[i])
+        self._pedir(i, "receber", valores)
+        self._ociosos.append(self._fragmentos.pop(i + 1))
+        del self._tamanhos[i + 1]
+        del self._limites[i]
+
+    def _rebalancear(self):
+        for _ in range(4 * len(self._conexoes)):
+            maior = max(range(len(self._fragmentos)), key=self._tamanhos.__getitem__)
+            if not self._precisa_rebalancear(maior):
+                return
+            if not self._ociosos:
+                # Junta o par vizinho de menor soma, desde que não envolva o maior
+                pares = [j for j in range(len(self._fragmentos) - 1) if maior not in (j, j + 1)]
+                if not pares:
+                    return
+                j = min(pares, key=lambda j: self._tamanhos[j] + self._tamanhos[j + 1])
+                media = sum(self._tamanhos) / len(self._fragmentos)
+                if self._tamanhos[j] + self._tamanhos[j + 1] > media:
+                    return
+                self._juntar_fragmentos(j)
+                if j < maior:
+                    maior -= 1
+            self._dividir_fragmento(maior)
+
+    # --- Operações individuais ---
+    def inserir(self, valor):
+        i = self._fragmento(valor)
+        self._pedir(i, "inserir", valor)
+        if self._precisa_rebalancear(i):
+            self._rebalancear()
+
+    def remover(self, valor):
+        return self._pedir(self._fragmento(valor), "remover", valor)
+
+    def buscar(self, valor):
+        return self._pedir(self._fragmento(valor), "buscar", valor)
+
+    # --- Operações em lote (os fragmentos trabalham em paralelo) ---
+    def inserir_muitos(self, valores):
+        """Insere um lote; retorna quantos valores eram novos"""
+        novos = sum(self._distribuir("inserir_muitos", self._repartir(valores)))
+        self._rebalancear()
+        return novos
+
+    def remover_muitos(self, valores):
+        """Remove um lote; retorna quantos valores estavam presentes"""
+        return sum(self._distribuir("remover_muitos", self._repartir(valores)))
+
+    def buscar_muitos(self, valores):
+        """Retorna uma máscara de presença na ordem do lote"""
+        lote = list(valores)
+        indices = [[] for _ in self._fragmentos]
+        for posicao, valor in enumerate(lote):
+            indices[self._fragmento(valor)].append(posicao)
+        partes = [[lote[p] for p in posicoes] for posicoes in indices]
+        mascara = [False] * len(lote)
+        respostas = iter(self._distribuir("buscar_muitos", partes))
+        for posicoes in indices:
+            if posicoes:
+                for posicao, presente in zip(posicoes, next(respostas)):
+                    mascara[posicao] = presente
+        return mascara
+
+    # --- Percursos ---
+    def iterar(self, desde=None, ate=None):
+        """Gera em ordem os valores em [desde, ate] (limites opcionais).
+
+        Os fragmentos que cruzam a faixa começam a transmitir ao mesmo
+        tempo, em blocos; como as faixas são disjuntas e ordenadas, a
+        intercalação das k sequências se reduz a lê-las uma após a outra.
+        Enquanto o gerador estiver aberto, outras operações levantam
+        RuntimeError; fechá-lo antes do fim descarta o restante.
+        """
+        primeiro = 0 if desde is None else self._fragmento(desde)
+        ultimo = len(self._fragmentos) - 1 if ate is None else self._fragmento(ate)
+        conexoes = [self._conexoes[p] for p in self._fragmentos[primeiro:ultimo + 1]]
+        return self._transmitir(conexoes, desde, ate)
+
+    def _transmitir(self, conexoes, desde, ate):
+        for conexao in conexoes:
+            conexao.send(("intervalo", (desde, ate)))
+        self._transmitindo = True
+        pendentes = list(conexoes)
+        erro = None
+        try:
+            while pendentes:
+                bloco = pendentes[0].recv()
+                if bloco is None:
+                    pendentes.pop(0)
+                elif isinstance(bloco, BaseException):
+                    pendentes.pop(0)
+                    erro = bloco
+                    break
+                else:
+                    yield from bloco
+        finally:
+            # Esvazia o que sobrou para manter os canais sincronizados
+            for conexao in pendentes:
+                while True:
+                    bloco = conexao.recv()
+                    if bloco is None or isinstance(bloco, BaseException):
+                        break
+            self._transmitindo = False
+        if erro is not None:
+            raise erro  # a falha de um trabalhador, depois de esvaziar os demais
+
+    def __iter__(self):
+        return self.iterar()
+
+    def em_ordem(self):
+        return list(self)
+
+    def intervalo(self, lo, hi):
+        """Gera, em ordem, os valores em [lo, hi]"""
+        return self.iterar(desde=lo, ate=hi)
+
+    # --- Tamanho ---
+    def obter_tamanho(self):
+        return sum(self._tamanhos)
+
+    def esta_vazia(self):
+        return self.obter_tamanho() == 0
+
+    def quantidade_fragmentos(self):
+        return len(self._fragmentos)
@@ -0,0 +1,188 @@
+"""Instrumentação opcional das árvores: contadores e gancho por operação.
+
+Desligada, não custa nada nos caminhos quentes: as operações medidas, as
+descidas e as rotações são substituídas por versões com contagem apenas na
+instância instrumentada (atributos de instância que encobrem os métodos da
+classe). As comparações são contadas na própria descida, pela chave
+embrulhada num objeto que conta cada `<`.
+Só as recolorações e as iterações da fixação rubro-negra são contadas
+dentro dos laços, atrás de um teste `is not None` por iteração.
+"""
+
+OPERACOES = ("inserir", "remover", "buscar", "put", "get", "pop")
+# Descidas contadas: da Rubro-Negra (chave na posição 0 ou 1) e do motor AVL
+DESCIDAS_RN = {"_buscar_no": 1, "_inserir_no": 0}
+DESCIDAS_AVL = {"buscar": 1, "_inserir": 1, "_remover": 1}
+DESCIDAS = tuple(DESCIDAS_RN) + tuple(DESCIDAS_AVL)
+
+
+class Metricas:
+    """Contadores acumulados de uma árvore instrumentada"""
+
+    CONTADORES = ("operacoes", "comparacoes", "caminho_total", "caminho_maximo",
+                  "rotacoes", "rotacoes_simples", "rotacoes_duplas",
+                  "recoloracoes", "iteracoes_fixacao")
+    __slots__ = CONTADORES + ("campos", "gancho")
+
+    def __init__(self, campos, gancho=None):
+        self.campos = campos  # contadores de rebalanceamento próprios da árvore
+        self.gancho = gancho
+        for nome in self.CONTADORES:
+            setattr(self, nome, 0)
+
+    def _instantaneo(self):
+        return tuple(getattr(self, nome) for nome in self.CONTADORES)
+
+
+class _Comparada:
+    """Chave das descidas medidas: conta as comparações feitas com ela.
+
+    As descidas comparam `chave < no.valor` a cada nível (um nó visitado)
+    e `candidato.valor < chave` uma vez no fim; essa última chega aqui
+    refletida, como `__gt__`, quando o valor guardado não sabe comparar
+    com a chave embrulhada (o caso dos tipos embutidos).
+    """
+
+    __slots__ = ("chave", "metricas")
+
+    def __init__(self, chave, metricas):
+        self.chave = chave
+        self.metricas = metricas
+
+    def __lt__(self, outro):
+        metricas = self.metricas
+        metricas.comparacoes += 1
+        metricas.caminho_total += 1
+        return self.chave < outro
+
+    def __gt__(self, outro):
+        self.metricas.comparacoes += 1
+        return outro < self.chave
+
+
+def medir_operacoes(arvore, metricas):
+    """Encobre as operações individuais da árvore com versões medidas.
+
+    As comparações e o caminho são contados na própria operação, pelas
+    descidas encobertas por `contar_comparacoes`; cada operação só lê
+    quanto os contadores avançaram. Acertos do cache não descem e não
+    contam comparações; as descidas extras das subclasses (a busca antes
+    da remoção no multiconjunto, por exemplo) contam.
+    """
+    def medida(nome, original):
+        def operacao(chave, *args):
+            comparacoes = metricas.comparacoes
+            caminho = metricas.caminho_total
+            antes = metricas._instantaneo() if metricas.gancho is not None else None
+            resultado = original(chave, *args)
+            metricas.operacoes += 1
+            caminho = metricas.caminho_total - caminho
+            if caminho > metricas.caminho_maximo:
+                metricas.caminho_maximo = caminho
+            if antes is not None:
+                depois = metricas._instantaneo()
+                dados = {campo: depois[i] - antes[i]
+                         for i, campo in enumerate(Metricas.CONTADORES)
+                         if campo in metricas.campos}
+                dados["comparacoes"] = metricas.comparacoes - comparacoes
+                dados["caminho"] = caminho
+                metricas.gancho(nome, dados)
+            return resultado
+        operacao.__name__ = nome
+        return operacao
+
+    for nome in OPERACOES:
+        setattr(arvore, nome, medida(nome, getattr(type(arvore), nome).__get__(arvore)))
+
+
+def contar_comparacoes(alvo, metricas, descidas):
+    """Encobre as descidas de `alvo` (árvore ou motor) para contar comparações.
+
+    `descidas` mapeia o nome de cada método que desce pela árvore à
+    posição da chave nos argumentos; ela entra embrulhada em `_Comparada`.
+    A fábrica de nós `_No` também é encoberta, para que o nó criado numa
+    inserção guarde a chave original, não o embrulho.
+    """
+    for nome, posicao in descidas.items():
+        original = getattr(type(alvo), nome).__get__(alvo)
+        if posicao == 0:
+            def descida(chave, *args, original=original):
+                return original(_Comparada(chave, metricas), *args)
+        else:
+            def descida(raiz, chave, *args, original=original):
+                return original(raiz, _Comparada(chave, metricas), *args)
+        descida.__name__ = nome
+        setattr(alvo, nome, descida)
+
+    criar_no = alvo._No
+
+    def _No(valor, *args, **opcoes):
+        if type(valor) is _Comparada:
+            valor = valor.chave
+        return criar_no(valor, *args, **opcoes)
+    _No.anterior = alvo.__dict__.get("_No")  # a AVL agregada põe a sua na instância
+    alvo._No = _No
+
+
+def contar_rotacoes(alvo, metricas, rebalancear=False):
+    """Encobre as rotações de `alvo` (árvore ou motor) com contagem.
+
+    Com `rebalancear`, também encobre `_rebalancear` para separar as
+    rotações simples das duplas (AVL).
+    """
+    for nome in ("rotacao_esquerda", "rotacao_direita"):
+        original = getattr(type(alvo), nome).__get__(alvo)
+
+        def rotacao(no, original=original):
+            metricas.rotacoes += 1
+            return original(no)
+        setattr(alvo, nome, rotacao)
+
+    if rebalancear:
+        original_rebalancear = type(alvo)._rebalancear.__get__(alvo)
+
+        def _rebalancear(no):
+            antes = metricas.rotacoes
+            sub = original_rebalancear(no)
+            rotacoes = metricas.rotacoes - antes
+            if rotacoes == 1:
+                metricas.rotacoes_simples += 1
+            elif rotacoes == 2:
+                metricas.rotacoes_duplas += 1
+            return sub
+        alvo._rebalancear = _rebalancear
+
+
+def remover_medicoes(arvore, *motores):
+    """Desfaz as funções acima, voltando aos métodos da classe.
+
+    O cache, se ligado, deve ter sido descoberto antes (veja `cache.descobrir`):
+    ele encobre algumas das mesmas descidas.
+    """
+    for nome in OPERACOES:
+        arvore.__dict__.pop(nome, None)
+    for alvo in (arvore,) + motores:
+        for nome in ("rotacao_esquerda", "rotacao_direita", "_rebalancear") + DESCIDAS:
+            alvo.__dict__.pop(nome, None)
+        criar_no = alvo.__dict__.get("_No")
+        if hasattr(criar_no, "anterior"):
+            if criar_no.anterior is None:
+                del alvo._No
+            else:
+                alvo._No = criar_no.anterior
+
+
+def estatisticas(metricas, tamanho, altura):
+    """Monta o dicionário de `estatisticas()` de uma árvore"""
+    resultado = {"instrumentada": metricas is not None, "tamanho": tamanho, "altura": altura}
+    if metricas is not None:
+        operacoes = metricas.operacoes
+        resultado.update({
+            "operacoes": operacoes,
+            "comparacoes": metricas.comparacoes,
+            "comparacoes_por_operacao": metricas.comparacoes / operacoes if operacoes else 0.0,
+            "caminho_medio": metricas.caminho_total / operacoes if operacoes else 0.0,
+            "caminho_maximo": metricas.caminho_maximo,
+        })
+        resultado.update({campo: getattr(metricas, campo) for campo in metricas.campos})
+    return resultado
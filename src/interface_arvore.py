@@ -0,0 +1,69 @@
+"""Protocolo comum das árvores de busca: conjuntos ordenados sem duplicatas.
+
+Cada árvore implementa os métodos abstratos de `InterfaceArvore`; os demais
+têm aqui uma implementação padrão em termos deles, que as árvores podem
+substituir por uma mais rápida. Código que só usa o protocolo (a CLI, o
+modo em lote, a árvore adaptativa) funciona com qualquer uma delas.
+"""
+
+from abc import ABC, abstractmethod
+
+
+class InterfaceArvore(ABC):
+    """Conjunto ordenado com inserção, remoção, busca e percurso em ordem"""
+
+    __slots__ = ()
+
+    @abstractmethod
+    def inserir(self, valor):
+        """Insere `valor`; não faz nada se ele já existir"""
+
+    @abstractmethod
+    def remover(self, valor):
+        """Remove `valor`; retorna se ele estava presente"""
+
+    @abstractmethod
+    def buscar(self, valor):
+        """Retorna um objeto verdadeiro (o nó, em geral) se `valor` existir, senão None"""
+
+    @abstractmethod
+    def iterar(self, desde=None, ate=None, reverso=False):
+        """Gera os valores em ordem (ou reversa), opcionalmente restritos a [desde, ate].
+
+        Levanta RuntimeError se a árvore for modificada durante a iteração.
+        """
+
+    @abstractmethod
+    def obter_tamanho(self):
+        """Quantidade de valores"""
+
+    @abstractmethod
+    def imprimir(self, profundidade=None, saida=None):
+        """Desenha a árvore em texto (veja `visualizacao`)"""
+
+    @classmethod
+    def from_sorted(cls, valores):
+        """Constrói a árvore com os valores dados; as árvores fazem isso em O(n)"""
+        arvore = cls()
+        for valor in valores:
+            arvore.inserir(valor)
+        return arvore
+
+    def em_ordem(self):
+        return list(self.iterar())
+
+    def __iter__(self):
+        return self.iterar()
+
+    def __reversed__(self):
+        return self.iterar(reverso=True)
+
+    def __contains__(self, valor):
+        return self.buscar(valor) is not None
+
+    def esta_vazia(self):
+        return self.obter_tamanho() == 0
+
+    def intervalo(self, lo, hi):
+        """Gera, em ordem, os valores em [lo, hi]"""
+        return self.iterar(desde=lo, ate=hi)
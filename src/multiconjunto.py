@@ -0,0 +1,175 @@
+"""Modo multiconjunto: cada nó conta as ocorrências do seu valor.
+
+A contagem fica no campo `dado` do nó (o mesmo do modo mapa), então a
+memória continua proporcional às chaves distintas. Inserir uma chave
+presente só incrementa a contagem, sem alocar nó; remover decrementa e
+só desliga o nó quando ela chega a zero. As consultas por posição
+(`k_esimo`, `posicao`, `mediana`...) e `obter_tamanho` contam chaves
+distintas; `total` conta as ocorrências.
+"""
+
+from itertools import chain, groupby, repeat
+
+from . import diario
+
+
+def _agrupar(valores):
+    """Lista de [valor, ocorrências] em ordem, sem copiar a entrada se ela já vier ordenada"""
+    grupos = []
+    it = iter(valores)
+    for valor in it:
+        if grupos and not (grupos[-1][0] < valor):
+            if not (valor < grupos[-1][0]):
+                grupos[-1][1] += 1
+                continue
+            # Fora de ordem: ordena o que foi lido junto com o restante
+            todos = [v for v, n in grupos for _ in range(n)]
+            todos.append(valor)
+            todos.extend(it)
+            todos.sort()
+            return [[v, sum(1 for _ in repeticoes)] for v, repeticoes in groupby(todos)]
+        grupos.append([valor, 1])
+    return grupos
+
+
+def _sem_semantica(nome):
+    def metodo(self, *args, **opcoes):
+        raise TypeError(f"{type(self).__name__} não suporta {nome}(): "
+                        "no multiconjunto o campo dos dados guarda as contagens")
+    metodo.__name__ = nome
+    return metodo
+
+
+class Multiconjunto:
+    """Mistura para as árvores AVL e Rubro-Negra (veja `ArvoreAVLMulticonjunto`).
+
+    Requer da árvore `_inserir_no(valor)` -> (nó, se foi inserido) e
+    `_listar_nos()`. O modo mapa (`put`, `pop`) e a álgebra de conjuntos
+    não se aplicam e levantam TypeError: as contagens ocupam o campo dos
+    dados. O diário registra a contagem resultante (`diario.CONTAGEM`), não
+    o incremento, para que reaplicá-lo sobre um checkpoint mais novo não
+    conte as ocorrências duas vezes. Mudar só a contagem de uma chave
+    também invalida os iteradores abertos.
+    """
+
+    def __init__(self, key=None):
+        super().__init__(key=key)
+        self._total = 0  # ocorrências; None até ser recontado (veja `total`)
+
+    def _construir(self, valores):
+        grupos = _agrupar(valores)
+        super()._construir(valor for valor, _ in grupos)
+        for no, (_, n) in zip(self._listar_nos(), grupos):
+            no.dado = n
+        self._total = sum(n for _, n in grupos)
+
+    def _restaurar(self, *args):
+        super()._restaurar(*args)
+        self._total = None
+
+    def _definir_raiz(self, raiz, fazer_checkpoint=True):
+        # split, join e remover_intervalo trocam sub-árvores inteiras
+        super()._definir_raiz(raiz, fazer_checkpoint)
+        self._total = None
+
+    def inserir(self, valor):
+        """Acrescenta uma ocorrência de `valor`"""
+        no, inserido = self._inserir_no(valor)
+        if inserido:
+            no.dado = 1
+        else:
+            no.dado += 1
+            self._modificacoes += 1  # iteradores abertos levariam a contagem antiga
+        if self._total is not None:
+            self._total += 1
+        if self._diario is not None:
+            self._diario.registrar(diario.CONTAGEM, (valor, no.dado))
+
+    def remover(self, valor):
+        """Retira uma ocorrência de `valor`; retorna se ele estava presente"""
+        no = super().buscar(valor)
+        if no is None:
+            return False
+        if no.dado > 1:
+            no.dado -= 1
+            self._modificacoes += 1
+            if self._diario is not None:
+                self._diario.registrar(diario.CONTAGEM, (valor, no.dado))
+        else:
+            super().remover(valor)
+        if self._total is not None:
+            self._total -= 1
+        return True
+
+    def _definir_contagem(self, valor, n):
+        """Deixa `valor` com `n` ocorrências (veja `diario.reaplicar`)"""
+        no, inserido = self._inserir_no(valor)
+        if self._total is not None:
+            self._total += n - (0 if inserido else no.dado)
+        if not inserido:
+            self._modificacoes += 1
+        no.dado = n
+
+    def contagem(self, valor):
+        """Quantas ocorrências de `valor` há (0 se ausente)"""
+        no = super().buscar(valor)
+        return 0 if no is None else no.dado
+
+    def total(self):
+        """Quantidade de ocorrências, contando as repetições"""
+        if self._total is None:
+            self._total = sum(no.dado for no in self._listar_nos())
+        return self._total
+
+    def contagens(self, desde=None, ate=None, reverso=False):
+        """Gera pares (valor, contagem) em ordem, com os limites de `iterar`"""
+        return self.items(desde, ate, reverso)
+
+    def elementos(self, desde=None, ate=None, reverso=False):
+        """Gera os valores em ordem repetindo cada um pela sua contagem"""
+        return chain.from_iterable(repeat(valor, n) for valor, n in self.items(desde, ate, reverso))
+
+    def inserir_muitos(self, valores):
+        """Insere um lote, valor a valor; retorna quantas chaves eram novas.
+
+        A reconstrução em lote das árvores descartaria as contagens.
+        """
+        antes = self._tamanho
+        for valor in sorted(valores):
+            self.inserir(valor)
+        return self._tamanho - antes
+
+    def remover_muitos(self, valores):
+        """Retira uma ocorrência de cada valor do lote; retorna quantas havia"""
+        return sum(self.remover(valor) for valor in sorted(valores))
+
+    def estatisticas(self):
+        resultado = super().estatisticas()
+        resultado["total"] = self.total()
+        return resultado
+
+    # --- split e join levam a contagem da chave do meio ---
+    def split(self, chave):
+        """Divide em (menores que chave, ocorrências da chave, maiores) em O(log n).
+
+        No lugar do bool das árvores comuns vem a contagem (0 se ausente),
+        que `join` aceita de volta.
+        """
+        n = self.contagem(chave)
+        esquerda, _, direita = super().split(chave)
+        return esquerda, n, direita
+
+    @classmethod
+    def join(cls, esquerda, chave, direita, contagem=1):
+        """Une esquerda < chave < direita, com `contagem` ocorrências da chave"""
+        if contagem < 1:
+            raise ValueError("join exige contagem >= 1")
+        nova = super().join(esquerda, chave, direita)
+        nova._definir_contagem(chave, contagem)
+        return nova
+
+    put = _sem_semantica("put")
+    pop = _sem_semantica("pop")
+    uniao = _sem_semantica("uniao")
+    intersecao = _sem_semantica("intersecao")
+    diferenca = _sem_semantica("diferenca")
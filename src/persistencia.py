@@ -0,0 +1,173 @@
+"""Formato binário de snapshot compartilhado pelas árvores.
+
+Layout (little-endian):
+
+- cabeçalho de 24 bytes: mágico, versão, tipo de árvore, tipo de chave,
+  flags, quantidade de nós e CRC32 do corpo;
+- corpo: seções prefixadas por um comprimento de 8 bytes e alinhadas a 8
+  bytes, nesta ordem: forma (um byte por nó, em ordem), chaves (uma ou
+  duas seções, conforme o tipo) e, se houver, os dados do modo mapa.
+
+O significado do byte de forma é definido por cada árvore; com ele a
+forma exata é refeita em O(n), sem rebalanceamento.
+"""
+
+import mmap
+import os
+import pickle
+import struct
+import sys
+import zlib
+from array import array
+from contextlib import contextmanager
+
+MAGICO = b"ARVS"
+VERSAO = 1
+CABECALHO = struct.Struct("<4sHBBB3xQI")
+COMPRIMENTO = struct.Struct("<Q")
+
+# Tipos de árvore
+ARVORE_AVL = ord("A")
+ARVORE_RN = ord("R")
+
+# Tipos de chave
+INTEIRO = ord("q")   # int de 64 bits
+REAL = ord("d")      # float
+TEXTO = ord("s")     # str em UTF-8
+OBJETO = ord("p")    # qualquer outro tipo ordenável (pickle)
+
+TEM_DADOS = 1
+
+_MIN_INT64 = -(1 << 63)
+_MAX_INT64 = (1 << 63) - 1
+
+
+def _tipo_chave(chaves):
+    """Escolhe a codificação mais compacta que representa todas as chaves"""
+    tipos = {type(c) for c in chaves}
+    if tipos <= {int} and all(_MIN_INT64 <= c <= _MAX_INT64 for c in chaves):
+        return INTEIRO
+    if tipos == {float}:
+        return REAL
+    if tipos == {str}:
+        return TEXTO
+    return OBJETO
+
+
+def _numeros_le(codigo, chaves):
+    numeros = array(codigo, chaves)
+    if sys.byteorder != "little":
+        numeros.byteswap()
+    return numeros
+
+
+def _codificar_chaves(chaves):
+    """Retorna (tipo de chave, lista de seções) para as chaves em ordem"""
+    tipo = _tipo_chave(chaves)
+    if tipo == INTEIRO:
+        return tipo, [_numeros_le("q", chaves)]
+    if tipo == REAL:
+        return tipo, [_numeros_le("d", chaves)]
+    if tipo == TEXTO:
+        codificadas = [c.encode("utf-8") for c in chaves]
+        return tipo, [_numeros_le("I", [len(c) for c in codificadas]), b"".join(codificadas)]
+    return tipo, [pickle.dumps(chaves, pickle.HIGHEST_PROTOCOL)]
+
+
+def salvar_snapshot(caminho, tipo_arvore, nos, forma):
+    """Grava os nós (lista em ordem) e seus bytes de forma em `caminho`.
+
+    O arquivo é escrito ao lado e renomeado no fim, então um snapshot
+    anterior nunca fica pela metade.
+    """
+    tipo_chave, secoes = _codificar_chaves([no.valor for no in nos])
+    secoes.insert(0, forma)
+    flags = 0
+    dados = [no.dado for no in nos]
+    if any(dado is not None for dado in dados):
+        flags |= TEM_DADOS
+        secoes.append(pickle.dumps(dados, pickle.HIGHEST_PROTOCOL))
+
+    temporario = f"{caminho}.tmp"
+    crc = 0
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(bytes(CABECALHO.size))
+        for secao in secoes:
+            conteudo = memoryview(secao).cast("B")
+            for parte in (COMPRIMENTO.pack(len(conteudo)), conteudo, bytes(-len(conteudo) % 8)):
+                arquivo.write(parte)
+                crc = zlib.crc32(parte, crc)
+        arquivo.seek(0)
+        arquivo.write(CABECALHO.pack(MAGICO, VERSAO, tipo_arvore, tipo_chave, flags, len(nos), crc))
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(temporario, caminho)
+
+
+def _textos(comprimentos, blob):
+    """Decodifica as chaves de texto sob demanda, uma por vez"""
+    inicio = 0
+    for comprimento in comprimentos:
+        fim = inicio + comprimento
+        yield str(blob[inicio:fim], "utf-8")
+        inicio = fim
+
+
+@contextmanager
+def abrir_snapshot(caminho, tipo_arvore):
+    """Mapeia o snapshot em memória e fornece (n, forma, chaves, dados).
+
+    `forma` e as chaves numéricas são vistas diretas sobre o arquivo
+    mapeado; as chaves de texto são decodificadas à medida que são lidas.
+    `dados` é None se o snapshot não tiver dados. As vistas só valem
+    dentro do bloco `with`. Levanta ValueError se o arquivo for inválido.
+    """
+    with open(caminho, "rb") as arquivo:
+        mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+    vistas = [memoryview(mapa)]
+    try:
+        base = vistas[0]
+        if len(base) < CABECALHO.size:
+            raise ValueError("snapshot inválido: arquivo truncado")
+        magico, versao, tipo, tipo_chave, flags, n, crc = CABECALHO.unpack_from(base)
+        if magico != MAGICO:
+            raise ValueError("snapshot inválido: assinatura desconhecida")
+        if versao != VERSAO:
+            raise ValueError(f"snapshot inválido: versão {versao} não suportada")
+        if tipo != tipo_arvore:
+            raise ValueError("snapshot inválido: gravado por outro tipo de árvore")
+        if zlib.crc32(base[CABECALHO.size:]) != crc:
+            raise ValueError("snapshot inválido: checksum não confere")
+
+        secoes = []
+        posicao = CABECALHO.size
+        while posicao < len(base):
+            (comprimento,) = COMPRIMENTO.unpack_from(base, posicao)
+            posicao += COMPRIMENTO.size
+            vistas.append(base[posicao:posicao + comprimento])
+            secoes.append(vistas[-1])
+            posicao += comprimento + (-comprimento % 8)
+        forma = secoes[0]
+
+        def numeros(secao, codigo):
+            if sys.byteorder != "little":
+                valores = array(codigo, secao.tobytes())
+                valores.byteswap()
+                return valores
+            vistas.append(secao.cast(codigo))
+            return vistas[-1]
+
+        if tipo_chave == INTEIRO:
+            chaves = numeros(secoes[1], "q")
+        elif tipo_chave == REAL:
+            chaves = numeros(secoes[1], "d")
+        elif tipo_chave == TEXTO:
+            chaves = _textos(numeros(secoes[1], "I"), secoes[2])
+        else:
+            chaves = pickle.loads(secoes[1])
+        dados = pickle.loads(secoes[-1]) if flags & TEM_DADOS else None
+        yield n, forma, chaves, dados
+    finally:
+        for vista in reversed(vistas):
+            vista.release()
+        mapa.close()
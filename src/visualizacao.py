@@ -0,0 +1,244 @@
+"""Desenho e exportação das árvores sem recursão e com saída em blocos.
+
+As funções percorrem a árvore com uma pilha explícita e geram pedaços de
+texto; `escrever` os acumula e grava em blocos, então nem a profundidade
+nem o tamanho da árvore pesam na pilha de chamadas ou na memória. Cada
+árvore informa como ler um nó: `filhos(no)` retorna (esquerda, direita),
+`vazio` é o filho ausente (None ou o sentinela) e `tamanho(no)`, opcional,
+conta os nós de uma sub-árvore omitida pelo limite de profundidade.
+"""
+
+import json
+import sys
+from itertools import islice
+
+PECAS_POR_BLOCO = 4096  # pedaços de texto acumulados antes de gravar
+_codificar = json.JSONEncoder(ensure_ascii=False, default=str).encode
+
+
+def escrever(pecas, saida=None):
+    """Grava os pedaços de texto em `saida` (arquivo ou caminho; padrão stdout)"""
+    if saida is None:
+        saida = sys.stdout
+    if isinstance(saida, (str, bytes)) or hasattr(saida, "__fspath__"):
+        with open(saida, "w", encoding="utf-8") as arquivo:
+            escrever(pecas, arquivo)
+        return
+    pecas = iter(pecas)
+    while True:
+        bloco = "".join(islice(pecas, PECAS_POR_BLOCO))
+        if not bloco:
+            break
+        saida.write(bloco)
+    saida.flush()
+
+
+def em_terminal(saida):
+    """Se `saida` é um terminal (para decidir sobre cores ANSI)"""
+    if saida is None:
+        saida = sys.stdout
+    isatty = getattr(saida, "isatty", None)
+    return isatty is not None and isatty()
+
+
+def _omitidos(no, tamanho):
+    if tamanho is None:
+        return ""
+    n = tamanho(no) - 1
+    return f" ({n} nó)" if n == 1 else f" ({n} nós)"
+
+
+def localizar(raiz, vazio, filhos, valor_de, chave, acima=0):
+    """Nó com `chave` (ou o último do caminho de busca), `acima` níveis acima"""
+    caminho = []
+    no = raiz
+    while no is not vazio:
+        caminho.append(no)
+        valor = valor_de(no)
+        if chave < valor:
+            no = filhos(no)[0]
+        elif valor < chave:
+            no = filhos(no)[1]
+        else:
+            break
+    if not caminho:
+        return vazio
+    return caminho[max(0, len(caminho) - 1 - acima)]
+
+
+def linhas(raiz, vazio, filhos, rotulo, profundidade=None, tamanho=None,
+           prefixo="", is_esq=True):
+    """Gera o desenho em texto, uma linha por nó, direita acima da esquerda.
+
+    Com `profundidade`, os nós abaixo desse nível (a raiz é o nível 0)
+    viram uma única linha "…" por sub-árvore omitida.
+    """
+    if raiz is vazio:
+        return
+    pilha = [(raiz, prefixo, is_esq, 0)]
+    while pilha:
+        no, prefixo, is_esq, nivel = pilha.pop()
+        yield prefixo + ("└── " if is_esq else "┌── ") + rotulo(no) + "\n"
+        esq, dir = filhos(no)
+        if esq is vazio and dir is vazio:
+            continue
+        novo_prefixo = prefixo + ("    " if is_esq else "│   ")
+        if profundidade is not None and nivel >= profundidade:
+            yield novo_prefixo + "└── …" + _omitidos(no, tamanho) + "\n"
+            continue
+        # A direita sai primeiro: empilha a esquerda antes
+        if esq is not vazio:
+            pilha.append((esq, novo_prefixo, True, nivel + 1))
+        if dir is not vazio:
+            pilha.append((dir, novo_prefixo, False, nivel + 1))
+
+
+def linhas_ramos(raiz, filhos, rotulo, profundidade=None):
+    """Gera o desenho de uma árvore de aridade qualquer, de cima para baixo.
+
+    `filhos(no)` retorna a lista de filhos (vazia ou None nas folhas). Com
+    `profundidade`, os filhos abaixo desse nível viram uma linha "…".
+    """
+    pilha = [(raiz, "", "", 0)]
+    while pilha:
+        no, prefixo, prefixo_filhos, nivel = pilha.pop()
+        yield prefixo + rotulo(no) + "\n"
+        descendentes = filhos(no)
+        if not descendentes:
+            continue
+        if profundidade is not None and nivel >= profundidade:
+            yield prefixo_filhos + "└── …\n"
+            continue
+        # Empilhados do último ao primeiro para saírem em ordem
+        ultimo = len(descendentes) - 1
+        for k in range(ultimo, -1, -1):
+            if k == ultimo:
+                pilha.append((descendentes[k], prefixo_filhos + "└── ",
+                              prefixo_filhos + "    ", nivel + 1))
+            else:
+                pilha.append((descendentes[k], prefixo_filhos + "├── ",
+                              prefixo_filhos + "│   ", nivel + 1))
+
+
+def dot(raiz, vazio, filhos, valor_de, atributos=None, profundidade=None, tamanho=None):
+    """Gera a árvore no formato DOT do Graphviz.
+
+    Os nós são numerados em pré-ordem; as arestas saem pelo canto inferior
+    esquerdo (sw) ou direito (se) do pai, o que preserva o lado de um filho
+    único. `atributos(no)`, opcional, acrescenta atributos DOT ao nó.
+    """
+    yield "digraph arvore {\n  node [shape=circle];\n"
+    if raiz is not vazio:
+        proximo = 1
+        pilha = [(raiz, 0, 0)]
+        while pilha:
+            no, ident, nivel = pilha.pop()
+            rotulo = _codificar(str(valor_de(no)))
+            extra = "" if atributos is None else ", " + atributos(no)
+            yield f"  n{ident} [label={rotulo}{extra}];\n"
+            esq, dir = filhos(no)
+            if esq is vazio and dir is vazio:
+                continue
+            if profundidade is not None and nivel >= profundidade:
+                yield (f"  n{ident}o [label=\"…{_omitidos(no, tamanho)}\", shape=plaintext];\n"
+                       f"  n{ident} -> n{ident}o [style=dashed];\n")
+                continue
+            for filho, porta in ((dir, "se"), (esq, "sw")):
+                if filho is not vazio:
+                    yield f"  n{ident}:{porta} -> n{proximo};\n"
+                    pilha.append((filho, proximo, nivel + 1))
+                    proximo += 1
+    yield "}\n"
+
+
+def json_aninhado(raiz, vazio, filhos, valor_de, campos=None, profundidade=None,
+                  tamanho=None):
+    """Gera a árvore como JSON aninhado, em pedaços.
+
+    Cada nó vira {"valor": ..., <campos>, "esquerda": ..., "direita": ...},
+    com null para filhos ausentes; `campos(no)`, opcional, retorna um
+    dicionário de campos extras. Sub-árvores abaixo de `profundidade`
+    viram {"omitidos": n} (ou {"omitidos": null} sem `tamanho`).
+    Valores que o JSON não representa são gravados como texto.
+    """
+    partes = []
+    pilha = [(raiz, 0)]
+    while pilha:
+        item = pilha.pop()
+        if item.__class__ is str:
+            partes.append(item)
+            continue
+        no, nivel = item
+        if no is vazio:
+            partes.append("null")
+        elif profundidade is not None and nivel > profundidade:
+            partes.append(_codificar({"omitidos": None if tamanho is None else tamanho(no)}))
+        else:
+            objeto = {"valor": valor_de(no)}
+            if campos is not None:
+                objeto.update(campos(no))
+            partes.append(_codificar(objeto)[:-1] + ', "esquerda": ')
+            esq, dir = filhos(no)
+            pilha += ("}", (dir, nivel + 1), ', "direita": ', (esq, nivel + 1))
+        if len(partes) >= PECAS_POR_BLOCO:
+            yield "".join(partes)
+            partes.clear()
+    yield "".join(partes)
+
+
+def dot_ramos(raiz, filhos, rotulo, profundidade=None):
+    """Gera em DOT uma árvore de aridade qualquer, com nós do tipo registro.
+
+    `rotulo(no)` retorna os campos do registro (já separados por "|").
+    """
+    yield "digraph arvore {\n  node [shape=record];\n"
+    proximo = 1
+    pilha = [(raiz, 0, 0)]
+    while pilha:
+        no, ident, nivel = pilha.pop()
+        yield f"  n{ident} [label={_codificar(rotulo(no))}];\n"
+        descendentes = filhos(no)
+        if not descendentes:
+            continue
+        if profundidade is not None and nivel >= profundidade:
+            yield (f"  n{ident}o [label=\"…\", shape=plaintext];\n"
+                   f"  n{ident} -> n{ident}o [style=dashed];\n")
+            continue
+        for filho in descendentes:
+            yield f"  n{ident} -> n{proximo};\n"
+            pilha.append((filho, proximo, nivel + 1))
+            proximo += 1
+    yield "}\n"
+
+
+def json_ramos(raiz, filhos, campos, profundidade=None):
+    """Gera como JSON aninhado uma árvore de aridade qualquer, em pedaços.
+
+    Cada nó vira o dicionário `campos(no)` e, se tiver filhos, ganha a
+    lista "filhos"; abaixo de `profundidade` ela vira {"omitidos": null}.
+    """
+    partes = []
+    pilha = [(raiz, 0)]
+    while pilha:
+        item = pilha.pop()
+        if item.__class__ is str:
+            partes.append(item)
+        else:
+            no, nivel = item
+            texto = _codificar(campos(no))
+            descendentes = filhos(no)
+            if not descendentes:
+                partes.append(texto)
+            elif profundidade is not None and nivel >= profundidade:
+                partes.append(texto[:-1] + ', "filhos": {"omitidos": null}}')
+            else:
+                partes.append(texto[:-1] + ', "filhos": [')
+                pilha.append("]}")
+                for k in range(len(descendentes) - 1, -1, -1):
+                    pilha.append((descendentes[k], nivel + 1))
+                    if k:
+                        pilha.append(", ")
+        if len(partes) >= PECAS_POR_BLOCO:
+            yield "".join(partes)
+            partes.clear()
+    yield "".join(partes)
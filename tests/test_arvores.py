@@ -3,20 +3,62 @@
 Este módulo contém testes pytest para validar:
 1. Funcionalidade básica da Árvore Rubro-Negra
 2. Funcionalidade básica da Árvore AVL 
-3. Comparação de desempenho entre as implementações
+3. Comparação de desempenho entre as implementações (as medições ficam em
+   `python -m benchmarks.suite`)
 """
 
+import asyncio
+import io
+import json
+import multiprocessing
 import os
+import random
 import sys
+import threading
+import time
 import pytest
+from collections import Counter
 from typing import List, Type, Any
 
 # Adiciona diretório raiz ao path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
-from src.arvore_rn import ArvoreRubroNegra
-from src.arvore_avl import ArvoreAVL
+from src.arvore_rn import ArvoreRubroNegra, ArvoreRubroNegraMulticonjunto
+from src.arvore_rn_compacta import ArvoreRubroNegraCompacta, VERMELHO
+from src.arvore_avl import (ArvoreAVL, NoAVL, ArvoreAVLPersistente, ArvoreAVL_Principal,
+                            ArvoreAVLMulticonjunto)
+from src.arvore_b import ArvoreB
+from src.arvore_intervalos import ArvoreIntervalos
+from src.adaptativa import ArvoreAdaptativa
+from src.agregacao import (ArvoreAVLAgregada, ArvoreRubroNegraAgregada, Monoide,
+                           SOMA, MINIMO, MAXIMO, CONTAGEM)
+from src.interface_arvore import InterfaceArvore
+from src.concorrente import ArvoreConcorrente, TravaLeituraEscrita
+from src.fragmentada import ArvoreFragmentada
+from src.cliente import Conexao, ErroServidor, PoolConexoes
+from main import executar_script
+from servidor import ServidorArvore
+
+class LimiteRecusado:
+    """Limite que o processo principal consegue comparar, mas a árvore não"""
+
+    def __init__(self, valor):
+        self.valor = valor
+
+    def __lt__(self, outro):
+        return self.valor < outro
+
+    def __gt__(self, outro):
+        raise TypeError("comparação recusada")
+
+class InteiroRecusado(int):
+    """Inteiro que o processo principal ordena, mas um trabalhador não"""
+
+    def __lt__(self, outro):
+        if multiprocessing.parent_process() is not None:
+            raise TypeError("comparação recusada")
+        return int.__lt__(self, outro)
 
 def criar_arvore_teste(tipo_arvore: Type[Any], valores: List[int]):
     """Função auxiliar para criar e popular uma árvore com valores"""
@@ -25,15 +67,93 @@ def criar_arvore_teste(tipo_arvore: Type[Any], valores: List[int]):
         arvore.inserir(valor)
     return arvore
 
+def verificar_rubro_negra(arvore, no):
+    """Confere cores e tamanhos de uma sub-árvore; retorna a altura negra"""
+    if no is arvore.NIL:
+        return 1
+    if no.cor == 'VERMELHO':
+        assert no.esquerda.cor == 'PRETO' and no.direita.cor == 'PRETO'
+    for filho in (no.esquerda, no.direita):
+        if filho is not arvore.NIL:
+            assert filho.pai is no
+    he = verificar_rubro_negra(arvore, no.esquerda)
+    hd = verificar_rubro_negra(arvore, no.direita)
+    assert he == hd
+    assert no.tamanho == no.esquerda.tamanho + no.direita.tamanho + 1
+    return he + (1 if no.cor == 'PRETO' else 0)
+
+def verificar_avl(no):
+    """Confere alturas, balanceamento e tamanhos; retorna a altura real"""
+    if no is None:
+        return 0
+    he = verificar_avl(no.esquerda)
+    hd = verificar_avl(no.direita)
+    assert no.altura == 1 + max(he, hd)
+    assert abs(he - hd) <= 1
+    tamanho_esq = no.esquerda.tamanho if no.esquerda else 0
+    tamanho_dir = no.direita.tamanho if no.direita else 0
+    assert no.tamanho == tamanho_esq + tamanho_dir + 1
+    return no.altura
+
+def verificar_estrutura(arvore):
+    """Confere os invariantes de qualquer uma das duas árvores"""
+    if isinstance(arvore, ArvoreAVL):
+        verificar_avl(arvore.root)
+    else:
+        assert arvore.raiz.cor == 'PRETO'
+        verificar_rubro_negra(arvore, arvore.raiz)
+
+def verificar_maximos(arvore, no):
+    """Confere o maior fim guardado em cada nó da árvore de intervalos"""
+    maximo = no.valor[1]
+    for filho in (no.esquerda, no.direita):
+        if filho is not arvore.NIL:
+            maximo = max(maximo, verificar_maximos(arvore, filho))
+    assert no.maximo == maximo
+    return maximo
+
+def verificar_agregados(arvore):
+    """Confere o agregado guardado em cada nó de uma árvore agregada"""
+    raiz, nil = arvore._raiz_e_nulo()
+    monoide = arvore.monoide
+
+    def conferir(no):
+        if no is nil:
+            return monoide.identidade
+        agregado = monoide.combinar(monoide.combinar(conferir(no.esquerda),
+                                                     monoide.medir(no.valor, no.dado)),
+                                    conferir(no.direita))
+        assert no.agregado == agregado
+        return agregado
+    conferir(raiz)
+
+def forma_da_arvore(arvore):
+    """Tupla aninhada (valor, cor, altura, esquerda, direita) da árvore inteira"""
+    nil = getattr(arvore, 'NIL', None)
+
+    def descrever(no):
+        if no is nil:
+            return None
+        return (no.valor, getattr(no, 'cor', None), getattr(no, 'altura', None),
+                descrever(no.esquerda), descrever(no.direita))
+    return descrever(arvore.root if isinstance(arvore, ArvoreAVL) else arvore.raiz)
+
+def _busca_sem_cache(arvore, valor):
+    """Desce pela árvore com os métodos da classe, ignorando o cache"""
+    if isinstance(arvore, ArvoreAVL):
+        return ArvoreAVL_Principal.buscar(arvore._avl, arvore.root, valor)
+    no = ArvoreRubroNegra._buscar_no(arvore, arvore.raiz, valor)
+    return None if no is arvore.NIL else no
+
 @pytest.fixture
 def valores_teste() -> List[int]:
     """Fixture com conjunto de valores para teste"""
     return [50, 30, 70, 20, 40, 60, 80, 10, 25, 35]
 
-@pytest.fixture
-def arvore_rn(valores_teste) -> ArvoreRubroNegra:
+@pytest.fixture(params=[ArvoreRubroNegra, ArvoreRubroNegraCompacta])
+def arvore_rn(request, valores_teste) -> ArvoreRubroNegra:
     """Fixture que fornece uma árvore rubro-negra populada para testes"""
-    return criar_arvore_teste(ArvoreRubroNegra, valores_teste)
+    return criar_arvore_teste(request.param, valores_teste)
 
 class TesteArvoreRubroNegra:
     """Testes específicos para a implementação Rubro-Negra"""
@@ -72,6 +192,188 @@ class TesteArvoreRubroNegra:
         arvore_rn.remover(50)
         assert arvore_rn.obter_tamanho() == len(valores_teste) - 1
 
+    def test_operacoes_aleatorias_mantem_invariantes(self):
+        """Testa cores, altura negra e tamanhos após operações aleatórias"""
+        rng = random.Random(7)
+        arvore = ArvoreRubroNegra()
+        referencia = set()
+        for _ in range(2000):
+            valor = rng.randrange(300)
+            if rng.random() < 0.6:
+                arvore.inserir(valor)
+                referencia.add(valor)
+            else:
+                assert arvore.remover(valor) == (valor in referencia)
+                referencia.discard(valor)
+        assert arvore.raiz.cor == 'PRETO'
+        verificar_rubro_negra(arvore, arvore.raiz)
+        assert arvore.raiz.tamanho == arvore.obter_tamanho() == len(referencia)
+        assert arvore.em_ordem() == sorted(referencia)
+
+    @pytest.mark.parametrize("n", [0, 1, 2, 3, 7, 8, 100, 1023, 1024])
+    def test_from_sorted(self, n):
+        """Testa a construção em O(n) a partir de valores ordenados"""
+        arvore = ArvoreRubroNegra.from_sorted(v * 2 for v in range(n))
+        assert arvore.obter_tamanho() == n
+        assert arvore.em_ordem() == [v * 2 for v in range(n)]
+        assert arvore.raiz.cor == 'PRETO'
+        verificar_rubro_negra(arvore, arvore.raiz)
+        arvore.inserir(3)
+        arvore.remover(0)
+        verificar_rubro_negra(arvore, arvore.raiz)
+
+    def test_from_sorted_entrada_desordenada(self):
+        """Testa que entradas fora de ordem ou repetidas são normalizadas"""
+        arvore = ArvoreRubroNegra.from_sorted(iter([5, 1, 3, 3, 9, 1]))
+        assert arvore.em_ordem() == [1, 3, 5, 9]
+        verificar_rubro_negra(arvore, arvore.raiz)
+
+class TesteArvoreRubroNegraCompacta:
+    """Testes específicos da variante com nós em arrays"""
+
+    def _verificar(self, arvore, no):
+        """Confere cores, ponteiros de pai e altura negra pelos índices"""
+        if no == 0:
+            return 1
+        esq, dir = arvore._esq[no], arvore._dir[no]
+        if arvore._cor[no] == VERMELHO:
+            assert arvore._cor[esq] != VERMELHO and arvore._cor[dir] != VERMELHO
+        for filho in (esq, dir):
+            if filho:
+                assert arvore._pai[filho] == no
+        he = self._verificar(arvore, esq)
+        assert he == self._verificar(arvore, dir)
+        return he + (arvore._cor[no] != VERMELHO)
+
+    def test_operacoes_aleatorias_mantem_invariantes(self):
+        rng = random.Random(11)
+        arvore = ArvoreRubroNegraCompacta()
+        referencia = set()
+        for _ in range(3000):
+            valor = rng.randrange(300)
+            if rng.random() < 0.6:
+                arvore.inserir(valor)
+                referencia.add(valor)
+            else:
+                assert arvore.remover(valor) == (valor in referencia)
+                referencia.discard(valor)
+            assert arvore._pai[0] == 0 and arvore._cor[0] != VERMELHO
+        self._verificar(arvore, arvore.raiz)
+        assert arvore.em_ordem() == sorted(referencia)
+        assert list(reversed(arvore)) == sorted(referencia, reverse=True)
+        assert list(arvore.iterar(desde=100, ate=150)) == sorted(v for v in referencia if 100 <= v <= 150)
+
+    def test_lista_livre_reaproveita_slots(self):
+        arvore = criar_arvore_teste(ArvoreRubroNegraCompacta, range(100))
+        slots = len(arvore._valores)
+        for valor in range(50):
+            arvore.remover(valor)
+        for valor in range(1000, 1050):
+            arvore.inserir(valor)
+        assert len(arvore._valores) == slots
+        assert arvore.obter_tamanho() == 100
+        self._verificar(arvore, arvore.raiz)
+
+    def test_desenho_igual_ao_da_rubro_negra(self):
+        valores = random.Random(5).sample(range(1000), 200)
+        desenhos = []
+        for tipo_arvore in (ArvoreRubroNegraCompacta, ArvoreRubroNegra):
+            saida = io.StringIO()
+            criar_arvore_teste(tipo_arvore, valores).imprimir(saida=saida)
+            desenhos.append(saida.getvalue())
+        assert desenhos[0] == desenhos[1]
+        saida = io.StringIO()
+        criar_arvore_teste(ArvoreRubroNegraCompacta, valores).imprimir(profundidade=1, saida=saida)
+        assert saida.getvalue().count("└── …\n") == 2
+
+class TesteArvoreB:
+    """Testes específicos da árvore B+"""
+
+    def _verificar(self, arvore):
+        """Confere ordem, separadores, ocupação e folhas no mesmo nível"""
+        niveis = set()
+
+        def verificar(no, lo, hi, nivel):
+            chaves = no.chaves
+            assert all(a < b for a, b in zip(chaves, chaves[1:]))
+            assert all((lo is None or lo <= c) and (hi is None or c < hi) for c in chaves)
+            raiz = no is arvore.raiz
+            if no.filhos is None:
+                niveis.add(nivel)
+                assert len(chaves) <= arvore.ordem
+                assert raiz or len(chaves) >= arvore.ordem // 2
+                return len(chaves)
+            assert len(no.filhos) == len(chaves) + 1 <= arvore.ordem
+            assert len(no.filhos) >= (2 if raiz else (arvore.ordem + 1) // 2)
+            limites = [lo] + chaves + [hi]
+            return sum(verificar(filho, limites[i], limites[i + 1], nivel + 1)
+                       for i, filho in enumerate(no.filhos))
+
+        assert verificar(arvore.raiz, None, None, 1) == arvore.obter_tamanho()
+        assert niveis == ({1} if arvore.esta_vazia() else {arvore.altura()})
+
+    @pytest.mark.parametrize("ordem", [3, 4, 5, 8, 64])
+    def test_operacoes_aleatorias_mantem_invariantes(self, ordem):
+        rng = random.Random(ordem)
+        arvore = ArvoreB(ordem)
+        referencia = set()
+        for _ in range(4000):
+            valor = rng.randrange(600)
+            if rng.random() < 0.55:
+                arvore.inserir(valor)
+                referencia.add(valor)
+            else:
+                assert arvore.remover(valor) == (valor in referencia)
+                referencia.discard(valor)
+            assert (arvore.buscar(valor) is not None) == (valor in referencia)
+        self._verificar(arvore)
+        assert arvore.em_ordem() == sorted(referencia)
+        assert list(arvore.iterar(desde=101, ate=299, reverso=True)) == \
+               sorted((v for v in referencia if 101 <= v <= 299), reverse=True)
+        for valor in list(referencia):
+            arvore.remover(valor)
+        self._verificar(arvore)
+        assert arvore.esta_vazia() and arvore.altura() == 0 and arvore.em_ordem() == []
+
+    @pytest.mark.parametrize("n", [0, 1, 2, 3, 4, 5, 100, 1023, 1024])
+    def test_from_sorted(self, n):
+        arvore = ArvoreB.from_sorted((v * 2 for v in range(n)), ordem=4)
+        assert arvore.obter_tamanho() == n
+        assert arvore.em_ordem() == [v * 2 for v in range(n)]
+        self._verificar(arvore)
+        arvore.inserir(3)
+        arvore.remover(0)
+        self._verificar(arvore)
+        assert ArvoreB.from_sorted(iter([5, 1, 3, 3, 9, 1])).em_ordem() == [1, 3, 5, 9]
+
+    def test_ordem_invalida(self):
+        with pytest.raises(ValueError):
+            ArvoreB(2)
+
+    def test_desenho_e_exportacoes(self):
+        arvore = ArvoreB.from_sorted(range(100), ordem=4)
+        saida = io.StringIO()
+        arvore.imprimir(saida=saida)
+        linhas = saida.getvalue().splitlines()
+        assert linhas[0].startswith("[") and len(linhas) > 25
+        saida = io.StringIO()
+        arvore.imprimir(chave=50, saida=saida)
+        assert saida.getvalue().strip().split()[0] == "[48" and "50" in saida.getvalue()
+        saida = io.StringIO()
+        arvore.exportar_json(saida)
+        raiz = json.loads(saida.getvalue())
+        valores, pilha = [], [raiz]
+        while pilha:
+            no = pilha.pop()
+            if "filhos" in no:
+                pilha.extend(reversed(no["filhos"]))
+            else:
+                valores += no["chaves"]
+        assert valores == list(range(100))
+        saida = io.StringIO()
+        arvore.exportar_dot(saida)
+        assert saida.getvalue().count(" -> ") == saida.getvalue().count("[label=") - 1
+
 class TesteArvoreAVL:
     """Testes específicos para a implementação AVL"""
 
@@ -140,6 +442,133 @@ class TesteArvoreAVL:
         return (self._verificar_balanceamento(no.esquerda, avl_principal) and 
                 self._verificar_balanceamento(no.direita, avl_principal))
 
+    def test_operacoes_aleatorias_mantem_invariantes(self):
+        """Testa alturas, balanceamento e ordem após operações aleatórias"""
+        rng = random.Random(42)
+        arvore = ArvoreAVL()
+        referencia = set()
+        for _ in range(2000):
+            valor = rng.randrange(300)
+            if rng.random() < 0.6:
+                arvore.inserir(valor)
+                referencia.add(valor)
+            else:
+                assert arvore.remover(valor) == (valor in referencia)
+                referencia.discard(valor)
+        verificar_avl(arvore.root)
+        assert arvore.obter_tamanho() == len(referencia)
+        assert arvore.em_ordem() == sorted(referencia)
+
+    @staticmethod
+    def _forma(no):
+        """Pré-ordem de (valor, altura): fixa a forma exata da árvore"""
+        forma, pilha = [], [no]
+        while pilha:
+            no = pilha.pop()
+            if no is not None:
+                forma.append((no.valor, no.altura))
+                pilha.append(no.direita)
+                pilha.append(no.esquerda)
+        return forma
+
+    def test_forma_igual_a_versao_recursiva(self):
+        """A inserção e a remoção iterativas dão as mesmas formas da versão recursiva original"""
+        def altura(no):
+            return no.altura if no is not None else 0
+
+        def rotacionar(no, para_direita):
+            pai = no.esquerda if para_direita else no.direita
+            if para_direita:
+                no.esquerda, pai.direita = pai.direita, no
+            else:
+                no.direita, pai.esquerda = pai.esquerda, no
+            for atual in (no, pai):
+                atual.altura = 1 + max(altura(atual.esquerda), altura(atual.direita))
+            return pai
+
+        def balancear(no, fb_filho):
+            no.altura = 1 + max(altura(no.esquerda), altura(no.direita))
+            fb = altura(no.esquerda) - altura(no.direita)
+            if fb > 1:
+                if fb_filho(no.esquerda, True):
+                    no.esquerda = rotacionar(no.esquerda, False)
+                return rotacionar(no, True)
+            if fb < -1:
+                if fb_filho(no.direita, False):
+                    no.direita = rotacionar(no.direita, True)
+                return rotacionar(no, False)
+            return no
+
+        def inserir(no, valor):
+            if no is None:
+                return NoAVL(valor)
+            if valor < no.valor:
+                no.esquerda = inserir(no.esquerda, valor)
+            elif no.valor < valor:
+                no.direita = inserir(no.direita, valor)
+            else:
+                return no
+            # Dupla rotação quando o valor entrou do lado de dentro
+            return balancear(no, lambda filho, esq: (valor > filho.valor) if esq else (valor < filho.valor))
+
+        def remover(no, valor):
+            if no is None:
+                return None
+            if valor < no.valor:
+                no.esquerda = remover(no.esquerda, valor)
+            elif no.valor < valor:
+                no.direita = remover(no.direita, valor)
+            else:
+                if no.esquerda is None or no.direita is None:
+                    return no.esquerda or no.direita
+                sucessor = no.direita
+                while sucessor.esquerda is not None:
+                    sucessor = sucessor.esquerda
+                no.valor = sucessor.valor
+                no.direita = remover(no.direita, sucessor.valor)
+            fb = lambda filho: altura(filho.esquerda) - altura(filho.direita)
+            return balancear(no, lambda filho, esq: fb(filho) < 0 if esq else fb(filho) > 0)
+
+        rng = random.Random(2024)
+        for _ in range(20):
+            arvore, referencia = ArvoreAVL(), None
+            for _ in range(300):
+                valor = rng.randrange(150)
+                if rng.random() < 0.6:
+                    arvore.inserir(valor)
+                    referencia = inserir(referencia, valor)
+                else:
+                    arvore.remover(valor)
+                    referencia = remover(referencia, valor)
+                assert self._forma(arvore.root) == self._forma(referencia)
+
+    def test_insercao_sequencial_grande(self):
+        """Testa inserção e remoção sequenciais sem estourar a pilha"""
+        arvore = criar_arvore_teste(ArvoreAVL, range(20000))
+        assert verificar_avl(arvore.root) <= 15
+        for valor in range(0, 20000, 2):
+            assert arvore.remover(valor)
+        verificar_avl(arvore.root)
+        assert arvore.buscar(1) is not None
+        assert arvore.buscar(2) is None
+
+    @pytest.mark.parametrize("n", [0, 1, 2, 3, 7, 8, 100, 1023, 1024])
+    def test_from_sorted(self, n):
+        """Testa a construção em O(n) a partir de valores ordenados"""
+        arvore = ArvoreAVL.from_sorted(v * 2 for v in range(n))
+        assert arvore.obter_tamanho() == n
+        assert arvore.em_ordem() == [v * 2 for v in range(n)]
+        verificar_avl(arvore.root)
+        arvore.inserir(3)
+        arvore.remover(0)
+        verificar_avl(arvore.root)
+
+    def test_from_sorted_entrada_desordenada(self):
+        """Testa que entradas fora de ordem ou repetidas são normalizadas"""
+        arvore = ArvoreAVL.from_sorted(iter([5, 1, 3, 3, 9, 1]))
+        assert arvore.em_ordem() == [1, 3, 5, 9]
+        verificar_avl(arvore.root)
+
     def test_casos_especiais(self, arvore_avl, valores_teste):
         """Testa casos especiais de manipulação da árvore"""
         # Tenta inserir elemento duplicado
@@ -153,5 +582,1332 @@ class TesteArvoreAVL:
         arvore_vazia.remover(10)
         assert arvore_vazia.obter_tamanho() == tamanho_vazia
 
+    def test_cache_invalida_o_sucessor_copiado(self):
+        arvore = ArvoreAVL.from_sorted(range(15))
+        arvore.ativar_cache()
+        for valor in range(15):
+            arvore.buscar(valor)
+        raiz = arvore.root
+        sucessor = raiz.valor + 1
+        arvore.remover(raiz.valor)  # dois filhos: o sucessor é copiado para a raiz
+        assert arvore.buscar(sucessor) is raiz
+
+
+@pytest.mark.parametrize("tipo_arvore", [ArvoreAVL, ArvoreRubroNegra])
+class TesteEstatisticasOrdem:
+    """Testes de k-ésimo, posição, mediana e percentil em ambas as árvores"""
+
+    def test_k_esimo_e_posicao(self, tipo_arvore, valores_teste):
+        arvore = criar_arvore_teste(tipo_arvore, valores_teste)
+        ordenados = sorted(valores_teste)
+        for i, valor in enumerate(ordenados):
+            assert arvore.k_esimo(i) == valor
+            assert arvore.posicao(valor) == i
+        assert arvore.k_esimo(-1) == ordenados[-1]
+        assert arvore.posicao(0) == 0
+        assert arvore.posicao(1000) == len(ordenados)
+        assert arvore.posicao(36) == ordenados.index(40)
+        with pytest.raises(IndexError):
+            arvore.k_esimo(len(ordenados))
+
+    def test_apos_remocoes(self, tipo_arvore):
+        arvore = criar_arvore_teste(tipo_arvore, range(100))
+        for valor in range(0, 100, 3):
+            arvore.remover(valor)
+        restantes = [v for v in range(100) if v % 3]
+        assert [arvore.k_esimo(i) for i in range(len(restantes))] == restantes
+        assert arvore.posicao(50) == restantes.index(50)
+
+    def test_mediana_e_percentil(self, tipo_arvore):
+        arvore = criar_arvore_teste(tipo_arvore, range(1, 101))
+        assert arvore.mediana() == 50
+        assert arvore.percentil(0) == 1
+        assert arvore.percentil(90) == 90
+        assert arvore.percentil(100) == 100
+        with pytest.raises(ValueError):
+            arvore.percentil(101)
+        with pytest.raises(IndexError):
+            tipo_arvore().mediana()
+
+@pytest.mark.parametrize("tipo_arvore", [ArvoreAVL, ArvoreRubroNegra, ArvoreB,
+                                         ArvoreAdaptativa])
+class TesteIteradores:
+    """Testes dos iteradores preguiçosos em ambas as árvores"""
+
+    def test_iter_e_reversed(self, tipo_arvore, valores_teste):
+        arvore = criar_arvore_teste(tipo_arvore, valores_teste)
+        assert list(arvore) == sorted(valores_teste)
+        assert list(reversed(arvore)) == sorted(valores_teste, reverse=True)
+        assert list(tipo_arvore()) == []
+
+    def test_iterar_com_limites(self, tipo_arvore, valores_teste):
+        arvore = criar_arvore_teste(tipo_arvore, valores_teste)
+        assert list(arvore.iterar(desde=25, ate=60)) == [25, 30, 35, 40, 50, 60]
+        assert list(arvore.iterar(desde=26, ate=59)) == [30, 35, 40, 50]
+        assert list(arvore.iterar(desde=75)) == [80]
+        assert list(arvore.iterar(ate=15)) == [10]
+        assert list(arvore.iterar(desde=25, ate=60, reverso=True)) == [60, 50, 40, 35, 30, 25]
+        assert list(arvore.iterar(desde=90)) == []
+
+    def test_modificacao_durante_iteracao(self, tipo_arvore, valores_teste):
+        arvore = criar_arvore_teste(tipo_arvore, valores_teste)
+        iterador = iter(arvore)
+        next(iterador)
+        arvore.inserir(1)
+        with pytest.raises(RuntimeError):
+            next(iterador)
+        # Operações sem efeito não invalidam o iterador
+        iterador = iter(arvore)
+        next(iterador)
+        arvore.inserir(50)
+        arvore.remover(999)
+        assert next(iterador) == 10
+
+    def test_arvore_degenerada_grande(self, tipo_arvore):
+        arvore = tipo_arvore.from_sorted(range(50000))
+        assert sum(1 for _ in arvore) == 50000
+        assert next(reversed(arvore)) == 49999
+
+@pytest.mark.parametrize("tipo_arvore", [ArvoreAVL, ArvoreRubroNegra])
+class TesteVizinhosEIntervalos:
+    """Testes de piso, teto, sucessor, antecessor e intervalos"""
+
+    def test_vizinhos(self, tipo_arvore, valores_teste):
+        arvore = criar_arvore_teste(tipo_arvore, valores_teste)
+        assert arvore.piso(36) == 35 and arvore.piso(35) == 35
+        assert arvore.teto(36) == 40 and arvore.teto(35) == 35
+        assert arvore.sucessor(35) == 40 and arvore.sucessor(36) == 40
+        assert arvore.antecessor(35) == 30 and arvore.antecessor(36) == 35
+        assert arvore.piso(5) is None and arvore.teto(81) is None
+        assert arvore.sucessor(80) is None and arvore.antecessor(10) is None
+        assert arvore.sucessor(0) == 10 and arvore.antecessor(100) == 80
+        vazia = tipo_arvore()
+        assert vazia.piso(1) is None and vazia.sucessor(1) is None
+
+    def test_intervalo_e_contagem(self, tipo_arvore):
+        rng = random.Random(3)
+        valores = rng.sample(range(1000), 300)
+        arvore = criar_arvore_teste(tipo_arvore, valores)
+        for _ in range(50):
+            lo, hi = sorted(rng.sample(range(-10, 1010), 2))
+            esperado = sorted(v for v in valores if lo <= v <= hi)
+            assert list(arvore.intervalo(lo, hi)) == esperado
+            assert arvore.contar_intervalo(lo, hi) == len(esperado)
+        assert arvore.contar_intervalo(500, 100) == 0
+        assert list(arvore.intervalo(500, 100)) == []
+
+@pytest.mark.parametrize("tipo_arvore", [ArvoreAVL, ArvoreRubroNegra])
+class TesteOperacoesEmLote:
+    """Testes de inserir_muitos, remover_muitos e buscar_muitos"""
+
+    @pytest.mark.parametrize("tamanho_lote", [5, 50, 500])
+    def test_inserir_e_remover_muitos(self, tipo_arvore, tamanho_lote):
+        rng = random.Random(tamanho_lote)
+        arvore = criar_arvore_teste(tipo_arvore, range(0, 200, 2))
+        referencia = set(range(0, 200, 2))
+        lote = [rng.randrange(400) for _ in range(tamanho_lote)]
+        assert arvore.inserir_muitos(lote) == len(set(lote) - referencia)
+        referencia |= set(lote)
+        assert arvore.em_ordem() == sorted(referencia)
+        assert arvore.obter_tamanho() == len(referencia)
+        verificar_estrutura(arvore)
+
+        lote = [rng.randrange(400) for _ in range(tamanho_lote)]
+        assert arvore.remover_muitos(iter(lote)) == len(set(lote) & referencia)
+        referencia -= set(lote)
+        assert arvore.em_ordem() == sorted(referencia)
+        assert [arvore.k_esimo(i) for i in range(len(referencia))] == sorted(referencia)
+        verificar_estrutura(arvore)
+        arvore.inserir(-1)
+        assert arvore.buscar(-1) is not None
+
+    def test_buscar_muitos(self, tipo_arvore, valores_teste):
+        arvore = criar_arvore_teste(tipo_arvore, valores_teste)
+        consultas = [80, 5, 50, 50, 81, 10, -3]
+        assert arvore.buscar_muitos(consultas) == [v in valores_teste for v in consultas]
+        assert arvore.buscar_muitos([]) == []
+        assert tipo_arvore().buscar_muitos([1, 2]) == [False, False]
+
+    def test_lotes_em_arvore_vazia(self, tipo_arvore):
+        arvore = tipo_arvore()
+        assert arvore.inserir_muitos(range(1000, 0, -1)) == 1000
+        assert arvore.em_ordem() == list(range(1, 1001))
+        assert arvore.remover_muitos(range(2000)) == 1000
+        assert arvore.esta_vazia()
+        assert arvore.remover_muitos([1]) == 0
+
+@pytest.mark.parametrize("tipo_arvore", [ArvoreAVL, ArvoreRubroNegra])
+class TesteAlgebraConjuntos:
+    """Testes de split, join e operações de conjunto"""
+
+    @pytest.mark.parametrize("semente", range(5))
+    def test_uniao_intersecao_diferenca(self, tipo_arvore, semente):
+        rng = random.Random(semente)
+        a = set(rng.sample(range(500), rng.randrange(200)))
+        b = set(rng.sample(range(500), rng.randrange(200)))
+        for operacao, esperado in (('uniao', a | b), ('intersecao', a & b), ('diferenca', a - b)):
+            arvore = tipo_arvore.from_sorted(sorted(a))
+            outra = tipo_arvore.from_sorted(sorted(b))
+            getattr(arvore, operacao)(outra)
+            assert arvore.em_ordem() == sorted(esperado)
+            assert arvore.obter_tamanho() == len(esperado)
+            assert outra.esta_vazia()
+            verificar_estrutura(arvore)
+
+    def test_uniao_de_faixas_disjuntas(self, tipo_arvore):
+        arvore = tipo_arvore.from_sorted(range(100, 200))
+        arvore.uniao(tipo_arvore.from_sorted(range(5)))
+        assert arvore.em_ordem() == list(range(5)) + list(range(100, 200))
+        verificar_estrutura(arvore)
+
+    def test_split_e_join(self, tipo_arvore, valores_teste):
+        arvore = criar_arvore_teste(tipo_arvore, valores_teste)
+        menores, presente, maiores = arvore.split(50)
+        assert presente and arvore.esta_vazia()
+        assert menores.em_ordem() == [v for v in sorted(valores_teste) if v < 50]
+        assert maiores.em_ordem() == [v for v in sorted(valores_teste) if v > 50]
+        verificar_estrutura(menores)
+        verificar_estrutura(maiores)
+
+        unida = tipo_arvore.join(menores, 50, maiores)
+        assert unida.em_ordem() == sorted(valores_teste)
+        assert menores.esta_vazia() and maiores.esta_vazia()
+        verificar_estrutura(unida)
+
+        _, presente, _ = unida.split(55)
+        assert not presente
+        with pytest.raises(ValueError):
+            tipo_arvore.join(criar_arvore_teste(tipo_arvore, [1, 9]), 5, criar_arvore_teste(tipo_arvore, [7]))
+
+    def test_remover_intervalo(self, tipo_arvore):
+        arvore = tipo_arvore.from_sorted(range(300))
+        assert arvore.remover_intervalo(50, 249) == 200
+        assert arvore.em_ordem() == list(range(50)) + list(range(250, 300))
+        assert arvore.k_esimo(50) == 250
+        verificar_estrutura(arvore)
+        assert arvore.remover_intervalo(1000, 2000) == 0
+
+@pytest.mark.parametrize("tipo_arvore", [ArvoreAVL, ArvoreRubroNegra])
+class TesteModoMapa:
+    """Testes de put, get, pop e items"""
+
+    def test_put_get_pop(self, tipo_arvore):
+        mapa = tipo_arvore()
+        for chave in [50, 30, 70, 20, 40, 60, 80]:
+            mapa.put(chave, str(chave))
+        mapa.put(30, "trinta")
+        assert mapa.obter_tamanho() == 7
+        assert mapa.get(30) == "trinta"
+        assert mapa.get(35) is None and mapa.get(35, "x") == "x"
+        # 50 tem dois filhos: os dados dos demais nós não podem se misturar
+        assert mapa.pop(50) == "50"
+        assert mapa.pop(99, None) is None
+        with pytest.raises(KeyError):
+            mapa.pop(99)
+        assert list(mapa.items()) == [(20, "20"), (30, "trinta"), (40, "40"),
+                                      (60, "60"), (70, "70"), (80, "80")]
+        assert list(mapa.items(desde=35, ate=70, reverso=True)) == [(70, "70"), (60, "60"), (40, "40")]
+        verificar_estrutura(mapa)
+
+    def test_funcao_chave(self, tipo_arvore):
+        mapa = tipo_arvore(key=str.casefold)
+        mapa.put("Banana", 1)
+        mapa.put("abacate", 2)
+        mapa.put("BANANA", 3)
+        assert list(mapa.items()) == [("abacate", 2), ("banana", 3)]
+        assert mapa.get("bAnAnA") == 3
+        menores, _, _ = mapa.split("b")
+        assert menores.get("ABACATE") == 2
+
+    def test_dados_sobrevivem_a_lotes_e_algebra(self, tipo_arvore):
+        mapa = tipo_arvore()
+        for chave in range(0, 40, 4):
+            mapa.put(chave, -chave)
+        mapa.inserir_muitos(range(0, 40, 2))  # reconstrói por mesclagem
+        mapa.remover_muitos(list(range(2, 40, 4)) + list(range(100, 110)))  # idem
+        assert list(mapa.items()) == [(c, -c) for c in range(0, 40, 4)]
+        outra = tipo_arvore()
+        outra.put(100, "cem")
+        mapa.uniao(outra)
+        assert mapa.get(100) == "cem" and mapa.get(8) == -8
+        verificar_estrutura(mapa)
+
+    @pytest.mark.parametrize("tamanho_outra", [3, 50, 500])
+    def test_uniao_fica_com_o_dado_de_outra(self, tipo_arvore, tamanho_outra):
+        # Vale nos dois ramos: `outra` menor (divide esta) ou maior (divide `outra`)
+        mapa, outra = tipo_arvore(), tipo_arvore()
+        for chave in range(0, 100, 2):
+            mapa.put(chave, "esta")
+        for chave in range(0, 3 * tamanho_outra, 3):
+            outra.put(chave, "outra")
+        esperado = dict(mapa.items())
+        esperado.update(outra.items())
+        mapa.uniao(outra)
+        assert list(mapa.items()) == sorted(esperado.items())
+        verificar_estrutura(mapa)
+        comum = tipo_arvore()
+        comum.put(6, "comum")
+        mapa.intersecao(comum)  # a interseção mantém os dados desta árvore
+        assert list(mapa.items()) == [(6, "outra")]
+
+@pytest.mark.parametrize("tipo_arvore", [ArvoreAVL, ArvoreRubroNegra])
+class TesteSnapshot:
+    """Testes de salvar e carregar"""
+
+    @pytest.mark.parametrize("chaves", [
+        [],
+        list(range(0, 300, 3)),
+        [0.5, -2.25, 1e10, 3.0],
+        ["maçã", "banana", "", "abacaxi"],
+        [(1, "a"), (0, "b"), (1, "c")],
+        [2 ** 70, -(2 ** 70), 5],
+    ])
+    def test_mesma_forma(self, tipo_arvore, chaves, tmp_path):
+        arvore = criar_arvore_teste(tipo_arvore, chaves)
+        for valor in chaves[::4]:
+            arvore.remover(valor)
+        caminho = tmp_path / "arvore.snap"
+        arvore.salvar(caminho)
+        restaurada = tipo_arvore.carregar(caminho)
+        assert forma_da_arvore(restaurada) == forma_da_arvore(arvore)
+        assert restaurada.obter_tamanho() == arvore.obter_tamanho()
+        verificar_estrutura(restaurada)
+        restaurada.inserir(chaves[0] if chaves else 1)
+        verificar_estrutura(restaurada)
+
+    def test_dados_e_funcao_chave(self, tipo_arvore, tmp_path):
+        mapa = tipo_arvore(key=str.lower)
+        mapa.put("B", {"x": 1})
+        mapa.put("a", None)
+        mapa.put("C", [3])
+        mapa.salvar(tmp_path / "mapa.snap")
+        restaurado = tipo_arvore.carregar(tmp_path / "mapa.snap", key=str.lower)
+        assert list(restaurado.items()) == [("a", None), ("b", {"x": 1}), ("c", [3])]
+        assert restaurado.get("C") == [3]
+
+    def test_arquivo_invalido(self, tipo_arvore, tmp_path):
+        caminho = tmp_path / "arvore.snap"
+        criar_arvore_teste(tipo_arvore, range(50)).salvar(caminho)
+        conteudo = bytearray(caminho.read_bytes())
+        conteudo[-9] ^= 0xFF
+        caminho.write_bytes(bytes(conteudo))
+        with pytest.raises(ValueError):
+            tipo_arvore.carregar(caminho)
+        outro_tipo = ArvoreRubroNegra if tipo_arvore is ArvoreAVL else ArvoreAVL
+        criar_arvore_teste(outro_tipo, range(5)).salvar(caminho)
+        with pytest.raises(ValueError):
+            tipo_arvore.carregar(caminho)
+
+@pytest.mark.parametrize("tipo_arvore", [ArvoreAVL, ArvoreRubroNegra])
+class TesteDiario:
+    """Testes do diário de mutações, do commit em grupo e dos checkpoints"""
+
+    def test_recupera_apos_queda(self, tipo_arvore, tmp_path):
+        arvore = tipo_arvore.recuperar(tmp_path, key=str.lower)
+        for chave in ["b", "A", "c", "d"]:
+            arvore.inserir(chave)
+        arvore.remover("c")
+        arvore.put("E", 5)
+        arvore.pop("d")
+        arvore.inserir_muitos(["x", "y", "z", "w", "v"])  # reconstrução
+        arvore.remover_intervalo("w", "x")
+        # Sem fechar o diário: com a_cada=1 tudo já foi sincronizado
+        recuperada = tipo_arvore.recuperar(tmp_path, key=str.lower)
+        assert list(recuperada.items()) == list(arvore.items())
+        assert recuperada.get("e") == 5
+        verificar_estrutura(recuperada)
+
+    def test_commit_em_grupo(self, tipo_arvore, tmp_path):
+        arvore = tipo_arvore.recuperar(tmp_path, a_cada=3)
+        log = tmp_path / "diario.log"
+        arvore.inserir(1)
+        arvore.inserir(2)
+        assert log.stat().st_size == 0
+        arvore.inserir(3)
+        assert log.stat().st_size > 0
+        arvore.inserir(4)
+        arvore.sincronizar()
+        assert tipo_arvore.recuperar(tmp_path).em_ordem() == [1, 2, 3, 4]
+
+    def test_prazo_sincroniza_arvore_ociosa(self, tipo_arvore, tmp_path):
+        arvore = tipo_arvore.recuperar(tmp_path, a_cada=None, intervalo_ms=20)
+        log = tmp_path / "diario.log"
+        arvore.inserir(1)
+        arvore.inserir(2)
+        arvore.inserir(3)
+        tamanho = log.stat().st_size
+        # Sem nenhuma escrita nova, o temporizador grava o grupo no prazo
+        for _ in range(200):
+            if log.stat().st_size > tamanho:
+                break
+            time.sleep(0.01)
+        assert log.stat().st_size > tamanho
+        assert tipo_arvore.recuperar(tmp_path).em_ordem() == [1, 2, 3]
+        arvore.fechar_diario()
+
+    def test_checkpoint_e_cauda_corrompida(self, tipo_arvore, tmp_path):
+        arvore = tipo_arvore.recuperar(tmp_path)
+        arvore.inserir_muitos(range(100))
+        arvore.checkpoint()
+        log = tmp_path / "diario.log"
+        assert log.stat().st_size == 0
+        arvore.remover(50)
+        # Operações estruturais viram checkpoint
+        arvore.diferenca(tipo_arvore.from_sorted(range(10)))
+        assert log.stat().st_size == 0
+        arvore.inserir(500)
+        arvore.fechar_diario()
+        tamanho = log.stat().st_size
+        with open(log, "ab") as arquivo:
+            arquivo.write(b"\x20\x00\x00\x00registro pela metade")
+        recuperada = tipo_arvore.recuperar(tmp_path)
+        assert recuperada.em_ordem() == [v for v in range(10, 100) if v != 50] + [500]
+        assert log.stat().st_size == tamanho
+
+@pytest.mark.parametrize("tipo_arvore", [ArvoreAVL, ArvoreRubroNegra])
+class TesteConcorrente:
+    """Testes da fachada de leitores/escritor"""
+
+    def test_estresse(self, tipo_arvore):
+        arvore = ArvoreConcorrente(tipo_arvore.from_sorted(range(0, 2000, 2)))
+        erros = []
+
+        def escritor(semente):
+            rng = random.Random(semente)
+            for _ in range(2000):
+                chave = rng.randrange(2000)
+                if rng.random() < 0.5:
+                    arvore.inserir(chave)
+                else:
+                    arvore.remover(chave)
+
+        def leitor(semente):
+            rng = random.Random(semente)
+            try:
+                for _ in range(200):
+                    arvore.buscar(rng.randrange(2000))
+                    arvore.contar_intervalo(100, 900)
+                    valores = list(arvore)
+                    assert valores == sorted(set(valores))
+                    with arvore.leitura() as interna:
+                        assert len(interna.em_ordem()) == interna.obter_tamanho()
+            except Exception as erro:
+                erros.append(erro)
+
+        threads = [threading.Thread(target=escritor, args=(i,)) for i in range(4)]
+        threads += [threading.Thread(target=leitor, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not erros
+        with arvore.leitura() as interna:
+            verificar_estrutura(interna)
+
+    def test_instantaneos_com_a_avl_persistente(self, tipo_arvore):
+        with pytest.raises(TypeError):
+            ArvoreConcorrente(tipo_arvore()).versao()
+        arvore = ArvoreConcorrente(ArvoreAVLPersistente.from_sorted(range(1000)))
+        iterador = iter(arvore)
+        assert next(iterador) == 0
+        versao = arvore.versao()
+
+        def escritor():
+            for valor in range(0, 1000, 2):
+                arvore.remover(valor)
+            arvore.inserir(-1)
+
+        # A iteração não segura trava nenhuma: o escritor termina antes dela
+        thread = threading.Thread(target=escritor)
+        thread.start()
+        thread.join(5)
+        assert not thread.is_alive()
+        assert list(iterador) == list(range(1, 1000))
+        assert versao.obter_tamanho() == 1000 and versao.buscar(0) is not None
+        assert arvore.em_ordem() == [-1] + list(range(1, 1000, 2))
+
+    def test_intervalo_com_escritor_no_meio(self, tipo_arvore):
+        arvore = ArvoreConcorrente(tipo_arvore.from_sorted(range(100)))
+        valores = arvore.intervalo(10, 60)
+        assert next(valores) == 10
+        assert arvore._trava._leitores == 0  # o instantâneo não segura a trava
+
+        def escritor():
+            arvore.remover(30)
+            arvore.inserir(1000)
+        thread = threading.Thread(target=escritor)
+        thread.start()
+        thread.join(5)
+        assert not thread.is_alive()
+        assert list(valores) == list(range(11, 61))
+        assert 30 not in arvore.intervalo(10, 60)
+
+    def test_leitura_sem_trava_na_avl_persistente(self, tipo_arvore):
+        arvore = ArvoreConcorrente(ArvoreAVLPersistente.from_sorted(range(10)))
+        arvore.inserir(20)
+        with arvore.escrita():
+            # Com a trava de escrita presa, as consultas leem a última versão
+            assert arvore.buscar(20) is not None and arvore.obter_tamanho() == 11
+            assert arvore.mediana() == 5 and list(arvore.intervalo(8, 30)) == [8, 9, 20]
+        assert arvore.versao().obter_tamanho() == 11
+
+    def test_prioridade_do_escritor(self, tipo_arvore):
+        trava = TravaLeituraEscrita()
+        ordem = []
+        trava.adquirir_leitura()
+
+        def escritor():
+            with trava.escrita():
+                ordem.append("escritor")
+
+        def leitor():
+            with trava.leitura():
+                ordem.append("leitor")
+
+        thread_escritor = threading.Thread(target=escritor)
+        thread_escritor.start()
+        while not trava._escritores_esperando:
+            pass
+        # Com um escritor esperando, um leitor novo não pode passar à frente
+        thread_leitor = threading.Thread(target=leitor)
+        thread_leitor.start()
+        thread_leitor.join(0.05)
+        assert ordem == []
+        trava.liberar_leitura()
+        thread_escritor.join()
+        thread_leitor.join()
+        assert ordem == ["escritor", "leitor"]
+
+class TesteAVLPersistente:
+    """Testes da AVL por cópia de caminho e das versões"""
+
+    def test_versoes_nao_mudam(self):
+        rng = random.Random(7)
+        arvore = ArvoreAVLPersistente()
+        referencia = set()
+        versoes = []
+        for i in range(3000):
+            valor = rng.randrange(500)
+            if rng.random() < 0.6:
+                arvore.inserir(valor)
+                referencia.add(valor)
+            else:
+                assert arvore.remover(valor) == (valor in referencia)
+                referencia.discard(valor)
+            if i % 100 == 0:
+                versoes.append((arvore.versao(), sorted(referencia)))
+        for versao, esperado in versoes:
+            assert versao.em_ordem() == esperado
+            assert versao.obter_tamanho() == len(esperado)
+            verificar_avl(versao.root)
+
+    def test_compartilha_subarvores(self):
+        arvore = ArvoreAVLPersistente.from_sorted(range(1 << 12))
+        antes = arvore.versao()
+
+        def nos(raiz):
+            pilha, ids = [raiz], set()
+            while pilha:
+                no = pilha.pop()
+                if no is not None:
+                    ids.add(id(no))
+                    pilha += [no.esquerda, no.direita]
+            return ids
+
+        originais = nos(antes.root)
+        arvore.inserir(1000.5)
+        arvore.remover(3000)
+        assert len(nos(arvore.root) - originais) <= 3 * 2 * antes.root.altura
+        assert 1000.5 not in antes.em_ordem() and antes.buscar(3000) is not None
+
+    def test_restaurar_e_iterador_estavel(self):
+        arvore = ArvoreAVLPersistente.from_sorted(range(10))
+        inicial = arvore.versao()
+        iterador = iter(arvore)
+        assert next(iterador) == 0
+        for valor in range(10):
+            arvore.remover(valor)
+        assert arvore.esta_vazia()
+        assert list(iterador) == list(range(1, 10))
+        arvore.restaurar(inicial)
+        assert arvore.em_ordem() == list(range(10)) and arvore.mediana() == 4
+
+@pytest.mark.parametrize("tipo_arvore", [ArvoreAVL, ArvoreRubroNegra])
+class TesteFragmentada:
+    """Testes da árvore fragmentada entre processos"""
+
+    def test_operacoes_e_rebalanceamento(self, tipo_arvore):
+        rng = random.Random(3)
+        referencia = set()
+        with ArvoreFragmentada(processos=3, tipo_arvore=tipo_arvore, minimo_fragmento=64) as arvore:
+            for _ in range(4):
+                lote = [rng.randrange(10_000) for _ in range(500)]
+                arvore.inserir_muitos(lote)
+                referencia.update(lote)
+            assert arvore.quantidade_fragmentos() == 3
+            for _ in range(500):
+                valor = rng.randrange(10_000)
+                if rng.random() < 0.5:
+                    arvore.inserir(valor)
+                    referencia.add(valor)
+                else:
+                    assert arvore.remover(valor) == (valor in referencia)
+                    referencia.discard(valor)
+            assert arvore.em_ordem() == sorted(referencia)
+            assert list(arvore.intervalo(2500, 7500)) == [v for v in sorted(referencia) if 2500 <= v <= 7500]
+            consulta = [rng.randrange(10_000) for _ in range(300)]
+            assert arvore.buscar_muitos(consulta) == [v in referencia for v in consulta]
+            assert arvore.obter_tamanho() == len(referencia)
+
+    def test_junta_fragmentos_pequenos(self, tipo_arvore):
+        with ArvoreFragmentada(processos=3, tipo_arvore=tipo_arvore, limites=[10, 20],
+                               minimo_fragmento=64) as arvore:
+            arvore.inserir_muitos(range(20))
+            arvore.inserir_muitos(range(100, 2000))  # tudo no último fragmento
+            assert arvore.quantidade_fragmentos() == 3
+            assert max(arvore._tamanhos) < 1900
+            assert arvore.em_ordem() == list(range(20)) + list(range(100, 2000))
+            valores = arvore.iterar()
+            next(valores)
+            with pytest.raises(RuntimeError):
+                arvore.inserir(5)
+            valores.close()
+            arvore.inserir(5)
+            assert arvore.buscar(5) == 5
+
+    def test_falha_no_meio_da_transmissao(self, tipo_arvore):
+        with ArvoreFragmentada(processos=3, tipo_arvore=tipo_arvore, limites=[1000, 2000],
+                               minimo_fragmento=10_000) as arvore:
+            arvore.inserir_muitos(range(3000))
+            # O primeiro fragmento falha; os outros dois transmitem normalmente
+            with pytest.raises(TypeError, match="recusada"):
+                list(arvore.iterar(desde=LimiteRecusado(500)))
+            assert arvore.em_ordem() == list(range(3000))  # canais ainda em sincronia
+            arvore.inserir(5000)
+            assert arvore.obter_tamanho() == 3001
+
+    def test_falha_de_um_fragmento_no_lote(self, tipo_arvore):
+        with ArvoreFragmentada(processos=3, tipo_arvore=tipo_arvore, limites=[1000, 2000],
+                               minimo_fragmento=10_000) as arvore:
+            arvore.inserir_muitos(range(0, 3000, 2))
+            # Só o primeiro fragmento falha; os outros respondem depois dele
+            with pytest.raises(TypeError, match="recusada"):
+                arvore.inserir_muitos([InteiroRecusado(501), 1501, 2501])
+            assert arvore.buscar_muitos([1501, 2501]) == [True, True]  # canais em sincronia
+            assert arvore.remover_muitos([1501, 2501]) == 2
+            assert arvore.em_ordem() == list(range(0, 3000, 2))
+            assert arvore.obter_tamanho() == 1500
+
+@pytest.mark.parametrize("tipo_arvore", [ArvoreAVL, ArvoreRubroNegra])
+class TesteInstrumentacao:
+    """Testes dos contadores, do gancho e da instrumentação desligada"""
+
+    def test_contadores_e_gancho(self, tipo_arvore):
+        eventos = []
+        arvore = tipo_arvore()
+        arvore.instrumentar(gancho=lambda operacao, dados: eventos.append((operacao, dados)))
+        valores = list(range(200))
+        random.Random(5).shuffle(valores)
+        for valor in valores:
+            arvore.inserir(valor)
+        for valor in valores[:100]:
+            arvore.remover(valor)
+        arvore.buscar(150)
+        verificar_estrutura(arvore)
+        estatisticas = arvore.estatisticas()
+        assert estatisticas["operacoes"] == len(eventos) == 301
+        assert estatisticas["altura"] == arvore.altura() > 0
+        assert 1 <= estatisticas["comparacoes_por_operacao"] <= 2 * arvore.altura() + 1
+        assert estatisticas["caminho_maximo"] <= 2 * arvore.altura()
+        assert estatisticas["rotacoes"] == sum(dados["rotacoes"] for _, dados in eventos) > 0
+        if tipo_arvore is ArvoreAVL:
+            assert estatisticas["rotacoes"] == (estatisticas["rotacoes_simples"]
+                                                + 2 * estatisticas["rotacoes_duplas"])
+        else:
+            assert estatisticas["recoloracoes"] > 0
+            assert estatisticas["iteracoes_fixacao"] > 0
+        assert eventos[-1][0] == "buscar" and eventos[-1][1]["comparacoes"] > 0
+
+    def test_comparacoes_da_descida(self, tipo_arvore):
+        # Árvore perfeita de altura 3: um `<` por nível e a igualdade no fim
+        eventos = []
+        arvore = tipo_arvore.from_sorted(range(1, 8))
+        arvore.instrumentar(gancho=lambda operacao, dados: eventos.append(dados))
+        arvore.buscar(0)
+        arvore.buscar(4)
+        arvore.remover(7)
+        assert [(dados["comparacoes"], dados["caminho"]) for dados in eventos] == [
+            (3, 3), (4, 3), (4, 3)]
+        assert arvore.altura() == 3
+        arvore.inserir_muitos(range(8, 20))
+        assert arvore.altura() > 3  # a altura guardada não sobrevive à mutação
+
+    def test_conta_na_descida_por_baixo_do_cache(self, tipo_arvore):
+        comparacoes = []
+        arvore = tipo_arvore.from_sorted(range(1, 8))
+        arvore.instrumentar(gancho=lambda operacao, dados: comparacoes.append(dados["comparacoes"]))
+        cache = arvore.ativar_cache()
+        arvore.buscar(4)
+        arvore.buscar(4)  # acerto do cache: não desce
+        arvore.inserir(8)
+        assert comparacoes[:2] == [4, 0] and comparacoes[2] >= 3
+        assert type(arvore.buscar(8).valor) is int and cache.acertos == 1
+        arvore.desinstrumentar()
+        assert arvore.buscar(4) is not None and cache.acertos == 2
+        arvore.instrumentar()
+        arvore.remover(4)  # invalida a chave também no cache
+        assert arvore.buscar(4) is None and arvore.estatisticas()["comparacoes"] > 0
+
+    def test_desligada_e_mapa(self, tipo_arvore, tmp_path):
+        arvore = tipo_arvore.recuperar(tmp_path, key=str.lower)
+        arvore.instrumentar()
+        arvore.put("Chave", 1)
+        arvore.inserir("b")
+        assert arvore.get("CHAVE") == 1
+        assert type(arvore.buscar("chave").valor) is str  # o embrulho da chave não fica no nó
+        assert arvore.estatisticas()["operacoes"] == 4
+        arvore.desinstrumentar()
+        assert "inserir" not in vars(arvore)
+        assert arvore.estatisticas() == {"instrumentada": False, "tamanho": 2,
+                                         "altura": arvore.altura()}
+        recuperada = tipo_arvore.recuperar(tmp_path, key=str.lower)
+        assert list(recuperada.items()) == [("b", None), ("chave", 1)]
+
+@pytest.mark.parametrize("tipo_arvore", [ArvoreAVL, ArvoreRubroNegra])
+class TesteVisualizacao:
+    """Testes do desenho em texto e das exportações DOT e JSON"""
+
+    def test_desenho_completo_e_truncado(self, tipo_arvore):
+        arvore = tipo_arvore.from_sorted(range(1000))
+        saida = io.StringIO()
+        arvore.imprimir(saida=saida)
+        linhas = saida.getvalue().splitlines()
+        assert len(linhas) == 1000
+        assert "\033" not in saida.getvalue()  # sem cores fora do terminal
+        assert sorted(int(l.split("── ")[1].split()[0]) for l in linhas) == list(range(1000))
+        saida = io.StringIO()
+        arvore.imprimir(profundidade=2, saida=saida)
+        truncadas = saida.getvalue().splitlines()
+        omitidos = [int(l.split("(")[-1].split()[0]) for l in truncadas if "…" in l]
+        assert len(truncadas) == 7 + len(omitidos) and sum(omitidos) == 1000 - 7
+
+    def test_subarvore_em_volta_da_chave(self, tipo_arvore):
+        arvore = tipo_arvore.from_sorted(range(0, 2000, 2))
+        saida = io.StringIO()
+        arvore.imprimir(chave=500, saida=saida)
+        linhas = saida.getvalue().splitlines()
+        assert linhas[0].startswith("└── 500")
+        saida = io.StringIO()
+        arvore.imprimir(chave=501, acima=1, profundidade=1, saida=saida)  # ausente
+        topo = int(saida.getvalue().split()[1])
+        assert arvore.buscar(topo) is not None and abs(topo - 501) < 100
+        saida = io.StringIO()
+        tipo_arvore().imprimir(chave=1, saida=saida)
+        assert saida.getvalue() == ""
+
+    def test_exportacoes(self, tipo_arvore, tmp_path):
+        arvore = tipo_arvore(key=str.lower)
+        for i in range(300):
+            arvore.put(f"c{i:03}", i)
+        arvore.put('aspas"\\', None)
+        arvore.exportar_json(tmp_path / "arvore.json")
+        raiz = json.loads((tmp_path / "arvore.json").read_text(encoding="utf-8"))
+        valores, dados = [], []
+        pilha, no = [], raiz
+        while pilha or no is not None:  # em ordem
+            while no is not None:
+                pilha.append(no)
+                no = no["esquerda"]
+            no = pilha.pop()
+            valores.append(no["valor"])
+            dados.append(no.get("dado"))
+            no = no["direita"]
+        assert valores == list(arvore)
+        assert dados == [None] + list(range(300))
+        saida = io.StringIO()
+        arvore.exportar_dot(saida)
+        texto = saida.getvalue()
+        assert texto.startswith("digraph arvore {") and texto.endswith("}\n")
+        assert texto.count("[label=") == 301 and texto.count(" -> ") == 300
+        assert '[label="aspas\\"\\\\"' in texto
+        saida = io.StringIO()
+        arvore.exportar_json(saida, profundidade=0)
+        raiz = json.loads(saida.getvalue())
+        assert raiz["esquerda"]["omitidos"] + raiz["direita"]["omitidos"] == 300
+
+@pytest.mark.parametrize("tipo_arvore", [ArvoreAVL, ArvoreRubroNegra, ArvoreB])
+class TesteModoLote:
+    """Testes do modo em lote do main.py"""
+
+    def test_comandos_e_erros(self, tipo_arvore):
+        entrada = io.StringIO("# registro\nI 5\ni 3\nI 9\n\nB 3\nB 4\n"
+                              "RANGE 0 10\nR 3\nRANGE 4 9\nRANGE 10 20\nX 1\nI abc\n")
+        saida, erros = io.StringIO(), io.StringIO()
+        contagens = executar_script(tipo_arvore(), entrada, saida, erros)
+        assert saida.getvalue() == "1\n0\n3 5 9\n5 9\n\n"
+        assert contagens == {"I": 3, "R": 1, "B": 2, "RANGE": 3, "erros": 2}
+        assert erros.getvalue().splitlines() == ["linha 12: comando inválido: X 1",
+                                                 "linha 13: comando inválido: I abc"]
+
+    def test_intervalo_longo_em_blocos(self, tipo_arvore):
+        n = 10_000  # mais que um bloco de valores e que uma descarga
+        entrada = io.StringIO("".join(f"I {i}\n" for i in range(n)) + f"RANGE 0 {n}\n")
+        saida = io.StringIO()
+        executar_script(tipo_arvore(), entrada, saida)
+        assert saida.getvalue() == " ".join(map(str, range(n))) + "\n"
+
+@pytest.mark.parametrize("tipo_arvore", [ArvoreAVL, ArvoreRubroNegra])
+class TesteCache:
+    """Testes do cache de buscas"""
+
+    def test_acertos_faltas_e_chaves_ausentes(self, tipo_arvore):
+        arvore = tipo_arvore.from_sorted(range(10))
+        cache = arvore.ativar_cache(4)
+        assert arvore.buscar(3).valor == 3 and arvore.buscar(3).valor == 3
+        assert arvore.buscar(20) is None and arvore.buscar(20) is None
+        assert (cache.acertos, cache.faltas) == (2, 2)
+        arvore.inserir(20)
+        assert arvore.buscar(20).valor == 20
+        assert arvore.estatisticas()["cache"]["acertos"] == 2
+        arvore.desativar_cache()
+        assert "cache" not in arvore.estatisticas() and arvore.buscar(20).valor == 20
+
+    @pytest.mark.parametrize("politica", ["lru", "tinylfu"])
+    def test_invalidacao_precisa(self, tipo_arvore, politica):
+        rng = random.Random(5)
+        arvore = tipo_arvore()
+        cache = arvore.ativar_cache(16, politica)
+        for _ in range(6000):
+            valor = rng.randrange(200)
+            sorteio = rng.random()
+            if sorteio < 0.25:
+                arvore.inserir(valor)
+            elif sorteio < 0.45:
+                arvore.remover(valor)
+            elif sorteio < 0.47:
+                arvore.put(valor, sorteio)
+            elif sorteio < 0.49:
+                arvore.pop(valor, None)
+            elif sorteio < 0.5:
+                arvore.remover_intervalo(valor, valor + 5)
+            else:
+                # Sempre o nó que está na árvore, nunca um desligado
+                assert arvore.buscar(valor) is _busca_sem_cache(arvore, valor)
+        assert cache.acertos > 0
+
+    def test_operacoes_estruturais_esvaziam_o_cache(self, tipo_arvore):
+        arvore = tipo_arvore.from_sorted(range(0, 40, 2))
+        cache = arvore.ativar_cache()
+        for valor in range(40):
+            arvore.buscar(valor)
+        arvore.inserir_muitos(range(1, 40, 2))
+        assert len(cache.politica) == 0
+        assert all(arvore.buscar(v) is _busca_sem_cache(arvore, v) for v in range(40))
+        esquerda, _, direita = arvore.split(20)
+        assert len(cache.politica) == 0 and arvore.buscar(5) is None
+
+    def test_tinylfu_resiste_a_varredura(self, tipo_arvore):
+        arvore = tipo_arvore.from_sorted(range(1000))
+        cache = arvore.ativar_cache(8, "tinylfu")
+        for _ in range(5):
+            for valor in range(8):
+                arvore.buscar(valor)
+        for valor in range(100, 160):  # varredura de chaves frias, menor que a amostra
+            arvore.buscar(valor)
+        acertos = cache.acertos
+        for valor in range(8):
+            arvore.buscar(valor)
+        assert cache.acertos - acertos == 8
+
+    def test_convive_com_a_instrumentacao(self, tipo_arvore):
+        arvore = tipo_arvore.from_sorted(range(10))
+        cache = arvore.ativar_cache()
+        arvore.instrumentar()
+        arvore.buscar(4)
+        arvore.buscar(4)
+        assert arvore.estatisticas()["operacoes"] == 2
+        arvore.desinstrumentar()
+        arvore.buscar(4)
+        assert cache.acertos == 2
+
+@pytest.mark.parametrize("tipo_arvore", [ArvoreAVLMulticonjunto, ArvoreRubroNegraMulticonjunto])
+class TesteMulticonjunto:
+    """Testes do modo multiconjunto"""
+
+    def test_contagens_contra_counter(self, tipo_arvore):
+        rng = random.Random(11)
+        arvore = tipo_arvore()
+        referencia = Counter()
+        for _ in range(5000):
+            valor = rng.randrange(60)
+            if rng.random() < 0.6:
+                arvore.inserir(valor)
+                referencia[valor] += 1
+            else:
+                assert arvore.remover(valor) == (referencia[valor] > 0)
+                referencia[valor] -= referencia[valor] > 0
+        referencia = +referencia
+        assert arvore.total() == sum(referencia.values())
+        assert arvore.obter_tamanho() == len(referencia)
+        assert all(arvore.contagem(v) == referencia[v] for v in range(61))
+        assert list(arvore.elementos()) == sorted(referencia.elements())
+        assert list(arvore.contagens(10, 30, reverso=True)) == \
+               sorted(((v, n) for v, n in referencia.items() if 10 <= v <= 30), reverse=True)
+        verificar_estrutura(arvore)
+
+    def test_repeticao_nao_aloca_no(self, tipo_arvore):
+        arvore = tipo_arvore()
+        arvore.inserir(7)
+        no = arvore.buscar(7)
+        for _ in range(3):
+            arvore.inserir(7)
+        assert arvore.buscar(7) is no and no.dado == 4
+        assert arvore.remover(7) and arvore.buscar(7) is no and arvore.contagem(7) == 3
+        for _ in range(3):
+            arvore.remover(7)
+        assert arvore.buscar(7) is None and arvore.total() == 0 and not arvore.remover(7)
+
+    def test_construcao_intervalos_e_lotes(self, tipo_arvore):
+        arvore = tipo_arvore.from_sorted([3, 1, 3, 2, 3, 5, 5])
+        assert list(arvore.contagens()) == [(1, 1), (2, 1), (3, 3), (5, 2)]
+        assert arvore.total() == 7 and arvore.estatisticas()["total"] == 7
+        arvore.remover_intervalo(3, 4)
+        assert arvore.total() == 4 and list(arvore.elementos()) == [1, 2, 5, 5]
+        assert arvore.inserir_muitos([5, 6, 6]) == 1 and arvore.contagem(6) == 2
+        assert arvore.remover_muitos([6, 6, 6, 9]) == 2 and arvore.total() == 5
+        with pytest.raises(TypeError, match="uniao"):
+            arvore.uniao(tipo_arvore())
+        with pytest.raises(TypeError, match="put"):
+            arvore.put(1, 2)
+
+    def test_split_e_join_guardam_a_contagem(self, tipo_arvore):
+        arvore = tipo_arvore.from_sorted([1, 1, 2, 3, 3, 3, 5])
+        esquerda, n, direita = arvore.split(3)
+        assert n == 3 and list(esquerda.contagens()) == [(1, 2), (2, 1)]
+        unida = tipo_arvore.join(esquerda, 3, direita, n)
+        assert list(unida.contagens()) == [(1, 2), (2, 1), (3, 3), (5, 1)]
+        unida.inserir(3)
+        assert unida.contagem(3) == 4 and unida.total() == 8
+        verificar_estrutura(unida)
+        nova = tipo_arvore.join(tipo_arvore(), 9, tipo_arvore())
+        assert list(nova.contagens()) == [(9, 1)] and nova.total() == 1
+        nova.inserir(9)
+        assert nova.contagem(9) == 2
+
+    def test_mudar_contagem_invalida_iteradores(self, tipo_arvore):
+        arvore = tipo_arvore.from_sorted([1, 1, 2])
+        for mudar in (lambda: arvore.remover(1), lambda: arvore.inserir(2)):
+            valores = arvore.elementos()
+            next(valores)
+            mudar()
+            with pytest.raises(RuntimeError):
+                list(valores)
+        assert list(arvore.elementos()) == [1, 2, 2]
+
+    def test_construcao_ordenada_e_fora_de_ordem(self, tipo_arvore):
+        ordenada = tipo_arvore.from_sorted(iter([1, 1, 2, 4, 4, 4]))
+        assert list(ordenada.contagens()) == [(1, 2), (2, 1), (4, 3)] and ordenada.total() == 6
+        misturada = tipo_arvore.from_sorted(iter([1, 1, 4, 2, 4, 1]))
+        assert list(misturada.contagens()) == [(1, 3), (2, 1), (4, 2)] and misturada.total() == 6
+        verificar_estrutura(misturada)
+
+    def test_diario_e_snapshot_guardam_contagens(self, tipo_arvore, tmp_path):
+        arvore = tipo_arvore.recuperar(str(tmp_path))
+        for valor in (4, 4, 4, 8):
+            arvore.inserir(valor)
+        arvore.remover(4)
+        arvore.checkpoint()
+        arvore.inserir(8)
+        arvore.fechar_diario()
+        recuperada = tipo_arvore.recuperar(str(tmp_path))
+        assert list(recuperada.contagens()) == [(4, 2), (8, 2)] and recuperada.total() == 4
+        recuperada.fechar_diario()
+
+    def test_queda_entre_snapshot_e_truncamento(self, tipo_arvore, tmp_path):
+        arvore = tipo_arvore.recuperar(str(tmp_path))
+        for valor in (1, 1, 1, 1, 2):
+            arvore.inserir(valor)
+        arvore.remover(1)
+        # O checkpoint grava o snapshot e cai antes de truncar o diário
+        arvore.salvar(str(tmp_path / "snapshot.bin"))
+        arvore.fechar_diario()
+        recuperada = tipo_arvore.recuperar(str(tmp_path))
+        assert list(recuperada.contagens()) == [(1, 3), (2, 1)] and recuperada.total() == 4
+        recuperada.fechar_diario()
+
+class TesteInterface:
+    """Testes do protocolo comum e da árvore adaptativa"""
+
+    @pytest.mark.parametrize("tipo_arvore", [ArvoreAVL, ArvoreRubroNegra, ArvoreRubroNegraCompacta,
+                                             ArvoreB, ArvoreAVLPersistente, ArvoreAdaptativa])
+    def test_arvores_seguem_o_protocolo(self, tipo_arvore):
+        arvore = tipo_arvore.from_sorted([1, 3, 5])
+        assert isinstance(arvore, InterfaceArvore)
+        assert 3 in arvore and 4 not in arvore
+        assert list(arvore) == [1, 3, 5] and list(reversed(arvore)) == [5, 3, 1]
+        assert list(arvore.intervalo(2, 5)) == [3, 5]
+
+    def test_protocolo_incompleto_nao_instancia(self):
+        class SoInsere(InterfaceArvore):
+            def inserir(self, valor):
+                pass
+
+        with pytest.raises(TypeError):
+            SoInsere()
+
+    def test_padroes_do_protocolo(self):
+        class ListaOrdenada(InterfaceArvore):
+            def __init__(self):
+                self.valores = []
+
+            def inserir(self, valor):
+                if valor not in self.valores:
+                    self.valores = sorted(self.valores + [valor])
+
+            def remover(self, valor):
+                presente = valor in self.valores
+                if presente:
+                    self.valores.remove(valor)
+                return presente
+
+            def buscar(self, valor):
+                return valor if valor in self.valores else None
+
+            def iterar(self, desde=None, ate=None, reverso=False):
+                valores = [v for v in self.valores
+                           if (desde is None or desde <= v) and (ate is None or v <= ate)]
+                return iter(valores[::-1] if reverso else valores)
+
+            def obter_tamanho(self):
+                return len(self.valores)
+
+            def imprimir(self, profundidade=None, saida=None):
+                pass
+
+        lista = ListaOrdenada.from_sorted([2, 4, 6])
+        assert lista.em_ordem() == [2, 4, 6] and not lista.esta_vazia()
+        assert 4 in lista and list(reversed(lista)) == [6, 4, 2]
+
+    def test_adaptativa_migra_conforme_a_carga(self):
+        arvore = ArvoreAdaptativa.from_sorted(range(0, 200, 2), janela=64, intervalo=8)
+        referencia = set(range(0, 200, 2))
+        assert arvore.motor is ArvoreRubroNegra
+        rng = random.Random(7)
+
+        def fase(escritas):
+            for _ in range(5000):
+                valor = rng.randrange(200)
+                if rng.random() >= escritas:
+                    assert (arvore.buscar(valor) is not None) == (valor in referencia)
+                elif rng.random() < 0.5:
+                    arvore.inserir(valor)
+                    referencia.add(valor)
+                else:
+                    assert arvore.remover(valor) == (valor in referencia)
+                    referencia.discard(valor)
+        fase(0.02)
+        assert arvore.motor is ArvoreAVL and arvore.migracoes == 1
+        fase(0.9)
+        assert arvore.motor is ArvoreRubroNegra and arvore.migracoes == 2
+        assert arvore.em_ordem() == sorted(referencia)
+        estatisticas = arvore.estatisticas()
+        assert estatisticas["motor"] == "ArvoreRubroNegra" and estatisticas["migracoes"] == 2
+        assert estatisticas["tamanho"] == len(referencia)
+
+    def test_adaptativa_apura_escritas_em_lote(self):
+        arvore = ArvoreAdaptativa.from_sorted(range(0, 200, 2), janela=100, intervalo=1)
+        arvore.inserir(-1)  # a primeira escrita abre a amostra
+        for valor in range(1, 60, 2):
+            arvore.inserir(valor)
+        for valor in range(0, 20, 2):
+            arvore.inserir(valor)  # repetidos custam como buscas
+        for valor in range(100, 140, 2):
+            assert arvore.remover(valor)
+        for valor in range(40):
+            arvore.buscar(valor)  # a última fecha a amostra
+        assert arvore.estatisticas()["mistura"] == {"buscas": 0.5, "insercoes": 0.3,
+                                                    "remocoes": 0.2}
+        assert arvore.buscar == arvore._arvore.buscar  # fora da amostra, sem invólucro
+
+    def test_adaptativa_nao_migra_com_iterador_aberto(self):
+        arvore = ArvoreAdaptativa.from_sorted(range(100), janela=16, intervalo=1)
+        iterador = iter(arvore)
+        assert next(iterador) == 0
+        for _ in range(1000):
+            arvore.buscar(50)
+            arvore.inserir(50)  # sem efeito: conta como busca
+        assert arvore.motor is ArvoreRubroNegra
+        with pytest.raises(RuntimeError):
+            arvore.migrar(ArvoreAVL)
+        assert list(iterador) == list(range(1, 100))
+        for _ in range(16):
+            arvore.buscar(50)
+            arvore.inserir(50)
+        assert arvore.motor is ArvoreAVL
+        assert arvore.buscar(50) is not None and arvore.piso(50.5) == 50
+
+    def test_adaptativa_repassa_consultas(self):
+        arvore = ArvoreAdaptativa.from_sorted(range(0, 20, 2))
+        assert arvore.piso(5) == 4 and arvore.k_esimo(0) == 0 and arvore.altura() > 0
+        with pytest.raises(AttributeError):
+            arvore.inserir_chave
+
+class TesteIntervalos:
+    """Testes da árvore de intervalos"""
+
+    @staticmethod
+    def conferir(arvore):
+        verificar_estrutura(arvore)
+        if arvore.raiz is not arvore.NIL:
+            verificar_maximos(arvore, arvore.raiz)
+
+    @staticmethod
+    def intervalo_aleatorio(rng):
+        inicio = rng.randrange(500)
+        return (inicio, inicio + rng.randrange(40))
+
+    def test_maximos_e_consultas_contra_forca_bruta(self):
+        rng = random.Random(23)
+        arvore = ArvoreIntervalos()
+        referencia = set()
+        for passo in range(3000):
+            intervalo = self.intervalo_aleatorio(rng)
+            if rng.random() < 0.6:
+                arvore.inserir(intervalo)
+                referencia.add(intervalo)
+            else:
+                if referencia and rng.random() < 0.8:
+                    intervalo = rng.choice(sorted(referencia))
+                assert arvore.remover(intervalo) == (intervalo in referencia)
+                referencia.discard(intervalo)
+            if passo % 100 == 0:
+                self.conferir(arvore)
+                a, b = sorted((rng.randrange(560), rng.randrange(560)))
+                esperados = sorted(v for v in referencia if v[0] <= b and a <= v[1])
+                assert list(arvore.sobrepostos(a, b)) == esperados
+                assert list(arvore.contendo(a)) == sorted(v for v in referencia if v[0] <= a <= v[1])
+                encontrado = arvore.algum_sobreposto(a, b)
+                assert encontrado in esperados if esperados else encontrado is None
+        self.conferir(arvore)
+
+    def test_maximos_em_lotes_divisao_e_juncao(self, tmp_path):
+        rng = random.Random(5)
+        arvore = ArvoreIntervalos.from_sorted(self.intervalo_aleatorio(rng) for _ in range(400))
+        self.conferir(arvore)
+        arvore.inserir_muitos([self.intervalo_aleatorio(rng) for _ in range(800)])
+        self.conferir(arvore)
+        menores, _, maiores = arvore.split((250, 10_000))
+        self.conferir(menores)
+        self.conferir(maiores)
+        unida = ArvoreIntervalos.join(menores, (250, 10_000), maiores)
+        self.conferir(unida)
+        assert unida.estatisticas()["maior_fim"] == 10_000
+        assert list(unida.contendo(9_000)) == [(250, 10_000)]
+        unida.uniao(ArvoreIntervalos.from_sorted([(600, 700), (-5, 0)]))
+        unida.remover_intervalo((100, 0), (200, 0))
+        self.conferir(unida)
+        caminho = str(tmp_path / "intervalos.snap")
+        unida.salvar(caminho)
+        carregada = ArvoreIntervalos.carregar(caminho)
+        self.conferir(carregada)
+        assert carregada.em_ordem() == unida.em_ordem()
+
+    def test_intervalos_repetidos_e_invalidos(self):
+        arvore = ArvoreIntervalos()
+        for identificador in range(3):
+            arvore.inserir((1, 5, identificador))  # campos extras distinguem iguais
+        arvore.put((2, 3), "dado")
+        assert list(arvore.contendo(3)) == [(1, 5, 0), (1, 5, 1), (1, 5, 2), (2, 3)]
+        assert arvore.get((2, 3)) == "dado"
+        with pytest.raises(ValueError):
+            arvore.inserir((4, 1))
+        with pytest.raises(ValueError):
+            ArvoreIntervalos.from_sorted([(0, 1), (3, 2)])
+        assert arvore.obter_tamanho() == 4 and list(arvore.sobrepostos(6, 9)) == []
+
+    def test_consulta_preguicosa_detecta_modificacao(self):
+        arvore = ArvoreIntervalos.from_sorted((i, i + 10) for i in range(100))
+        consulta = arvore.sobrepostos(20, 30)
+        assert next(consulta) == (10, 20)
+        arvore.inserir((15, 16))
+        with pytest.raises(RuntimeError):
+            next(consulta)
+
+# Concatenação: associativa mas não comutativa, confere a ordem das combinações
+CONCATENACAO = Monoide(lambda a, b: a + b, "", medir=lambda valor, dado: f"{valor}:{dado},")
+
+@pytest.mark.parametrize("tipo_arvore", [ArvoreAVLAgregada, ArvoreRubroNegraAgregada])
+class TesteAgregacao:
+    """Testes dos agregados de intervalo"""
+
+    @staticmethod
+    def esperado(monoide, referencia, lo, hi):
+        resultado = monoide.identidade
+        for chave in sorted(referencia):
+            if (lo is None or lo <= chave) and (hi is None or chave <= hi):
+                resultado = monoide.combinar(resultado, monoide.medir(chave, referencia[chave]))
+        return resultado
+
+    @pytest.mark.parametrize("monoide", [SOMA, MINIMO, MAXIMO, CONTAGEM, CONCATENACAO])
+    def test_agregados_contra_forca_bruta(self, tipo_arvore, monoide):
+        rng = random.Random(31)
+        arvore = tipo_arvore(monoide=monoide)
+        referencia = {}
+        for passo in range(2000):
+            chave = rng.randrange(300)
+            if rng.random() < 0.6:
+                dado = rng.randrange(-500, 500)
+                arvore.put(chave, dado)
+                referencia[chave] = dado
+            else:
+                assert arvore.remover(chave) == (referencia.pop(chave, None) is not None)
+            if passo % 100 == 0:
+                verificar_agregados(arvore)
+                lo, hi = sorted((rng.randrange(-5, 305), rng.randrange(-5, 305)))
+                for limites in ((lo, hi), (None, hi), (lo, None), (None, None), (hi + 1, hi)):
+                    assert arvore.agregado(*limites) == self.esperado(monoide, referencia, *limites)
+        verificar_estrutura(arvore)
+        verificar_agregados(arvore)
+
+    def test_agregados_em_lotes_divisao_e_juncao(self, tipo_arvore):
+        arvore = tipo_arvore.from_sorted(range(0, 400, 2), monoide=MAXIMO)
+        verificar_agregados(arvore)
+        assert arvore.agregado(10, 21) == 20 and arvore.agregado(401, 500) == MAXIMO.identidade
+        arvore.inserir_muitos(range(1, 800, 2))
+        menores, _, maiores = arvore.split(300)
+        assert menores.monoide is MAXIMO and maiores.monoide is MAXIMO
+        verificar_agregados(menores)
+        verificar_agregados(maiores)
+        unida = tipo_arvore.join(menores, 300, maiores)
+        verificar_agregados(unida)
+        unida.remover_intervalo(100, 700)
+        unida.uniao(tipo_arvore.from_sorted([5000], monoide=MAXIMO))
+        verificar_agregados(unida)
+        assert unida.agregado(None, 750) == 749 and unida.agregado(None, 700) == 99
+        assert unida.remover_muitos(range(1000)) == 150
+        verificar_agregados(unida)
+        assert unida.agregado() == 5000 and unida.estatisticas()["agregado"] == 5000
+
+    def test_chave_nova_entra_com_o_dado(self, tipo_arvore):
+        # A medida padrão cai na chave sem dado: o put não pode passar por ela
+        arvore = tipo_arvore(monoide=SOMA)
+        arvore.ativar_cache()
+        arvore.put("2024-01", 120)
+        arvore.put("2024-02", -30)
+        arvore.put("2024-01", 100)
+        assert arvore.agregado("2024-01", "2024-06") == 70 and arvore.agregado("2024-02") == -30
+        verificar_agregados(arvore)
+
+    def test_monoide_da_classe_vale_no_snapshot_e_no_diario(self, tipo_arvore, tmp_path):
+        class Minimos(tipo_arvore):
+            monoide = MINIMO
+        arvore = Minimos.recuperar(str(tmp_path))
+        for chave in range(50):
+            arvore.put(chave, 100 - chave)
+        arvore.checkpoint()
+        arvore.put(10, -3)
+        arvore.remover(49)
+        arvore.fechar_diario()
+        recuperada = Minimos.recuperar(str(tmp_path))
+        verificar_agregados(recuperada)
+        assert recuperada.agregado() == -3 and recuperada.agregado(11, None) == 52
+        recuperada.fechar_diario()
+
 if __name__ == '__main__':
     pytest.main(['-v', __file__])
+
+
+@pytest.mark.parametrize("tipo_arvore", [ArvoreAVL, ArvoreRubroNegra])
+class TesteServidor:
+    """Testes do servidor asyncio e do cliente com pipelining"""
+
+    def test_pipeline_lotes_e_erros(self, tipo_arvore):
+        async def cenario():
+            servidor = ServidorArvore(tipo_arvore())
+            porta = (await servidor.iniciar(porta=0)).sockets[0].getsockname()[1]
+            async with await Conexao.abrir(porta=porta) as conexao:
+                assert await conexao.inserir_muitos(range(0, 100, 2)) == 50
+                # Pedidos misturados em voo ao mesmo tempo voltam na ordem certa
+                respostas = await asyncio.gather(
+                    *(conexao.buscar(v) for v in range(10)), conexao.inserir(3),
+                    conexao.inserir(4), conexao.remover(6), conexao.remover(7), conexao.tamanho())
+                assert respostas == [v % 2 == 0 for v in range(10)] + [True, False, True, False, 50]
+                assert await conexao.buscar_muitos([3, 6, 8, 1000]) == [True, False, True, False]
+                assert await conexao.remover_muitos([0, 1, 2]) == 2
+                with pytest.raises(ErroServidor, match="comando inválido"):
+                    await conexao._pedir(b"I abc\n")
+                with pytest.raises(ErroServidor, match="comando inválido: RANGE 1 x"):
+                    await conexao._pedir(b"RANGE 1 x\n")
+                assert await conexao.ping() and await conexao.tamanho() == 48
+            await servidor.fechar()
+            return servidor
+
+        servidor = asyncio.run(cenario())
+        assert servidor.conexoes == 1 and servidor.requisicoes == 22
+        assert servidor.arvore.em_ordem()[:3] == [3, 4, 8]
+
+    def test_intervalo_transmitido_com_escritas_concorrentes(self, tipo_arvore, tmp_path):
+        n = 20_000  # vários blocos
+        caminho = str(tmp_path / "s")
+
+        async def cenario():
+            servidor = ServidorArvore(tipo_arvore.from_sorted(range(0, 2 * n, 2)))
+            await servidor.iniciar(unix=caminho)
+            async with PoolConexoes(2, unix=caminho) as pool:
+                async with pool.conexao() as leitora, pool.conexao() as escritora:
+                    recebidos = []
+                    async for valor in leitora.intervalo(100, 2 * n):
+                        recebidos.append(valor)
+                        if len(recebidos) % 1000 == 0:
+                            # Mexe atrás e à frente do que já foi transmitido
+                            await escritora.remover(valor + 2)
+                            await escritora.inserir(valor + 3)
+                            await escritora.remover(valor - 2)
+            await servidor.fechar()
+            return recebidos
+
+        recebidos = asyncio.run(cenario())
+        assert recebidos == sorted(set(recebidos)) and recebidos[0] == 100
+        assert set(range(100, 2 * n, 2)) - set(recebidos) <= {v + 2 for v in recebidos}
+
+    def test_pool_reaproveita_e_repoe_conexoes(self, tipo_arvore):
+        async def cenario():
+            servidor = ServidorArvore(tipo_arvore())
+            porta = (await servidor.iniciar(porta=0)).sockets[0].getsockname()[1]
+            pool = PoolConexoes(2, porta=porta)
+            primeira, segunda = await pool.adquirir(), await pool.adquirir()
+            terceira = asyncio.ensure_future(pool.adquirir())
+            await asyncio.sleep(0.01)
+            assert not terceira.done()  # o pool está cheio
+            pool.liberar(primeira)
+            assert await terceira is primeira
+            await segunda.fechar()
+            pool.liberar(segunda)
+            with pytest.raises(ConnectionError):
+                await segunda.ping()
+            async with pool.conexao() as nova:  # a vaga da que caiu abre outra
+                assert nova is not segunda and await nova.inserir(1)
+            await pool.fechar()
+            await servidor.fechar()
+            return servidor.conexoes
+
+        assert asyncio.run(cenario()) == 3
+
+    def test_pool_fechado_com_conexao_emprestada(self, tipo_arvore):
+        async def cenario():
+            servidor = ServidorArvore(tipo_arvore())
+            porta = (await servidor.iniciar(porta=0)).sockets[0].getsockname()[1]
+            pool = PoolConexoes(1, porta=porta)
+            conexao = await pool.adquirir()
+            esperando = asyncio.ensure_future(pool.adquirir())
+            await asyncio.sleep(0.01)
+            await pool.fechar()
+            with pytest.raises(RuntimeError, match="pool fechado"):
+                await esperando
+            pool.liberar(conexao)  # devolvida depois do fechamento
+            assert conexao.fechada
+            with pytest.raises(RuntimeError, match="pool fechado"):
+                await pool.adquirir()
+            await servidor.fechar()
+
+        asyncio.run(cenario())